@@ -0,0 +1,178 @@
+"""
+Benchmarks for the hot paths of `BaseArgs`: building the argparse spec, parsing commandlines, reading and
+writing args files in each registered format, and the `intlt` / `remap` validators (per value and batched).
+
+Synthetic `BaseArgs` subclasses with between 10 and 1,000 fields are generated on the fly, and file I/O is
+run with both small (short strings) and large (long strings and list-valued fields) payloads. For each case
+we report throughput, latency percentiles and peak (Python-allocated) memory, and can save the results as
+JSON and compare them against a previously saved baseline run.
+
+Usage (from the main repository directory):
+```
+python benchmarks/bench_hot_paths.py --output results.json
+python benchmarks/bench_hot_paths.py --baseline results.json --fail_threshold 1.25
+```
+"""
+
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse, dataclasses, json, platform, shutil, statistics, tempfile, time, tracemalloc
+from typing import List
+
+from multisource_args.args import BaseArgs, ARGS
+from multisource_args.argtype_utils import intlt, remap
+
+FIELD_COUNTS = (10, 100, 1000)
+PAYLOADS = {
+    'small': {'str_len': 8, 'list_len': 0},
+    'large': {'str_len': 1024, 'list_len': 256},
+}
+
+def make_args_cls(num_fields, payload):
+    """
+    Builds a `BaseArgs` dataclass with an output dir plus `num_fields - 1` fields cycling through the types
+    the default argparse spec supports.
+    """
+    str_len, list_len = PAYLOADS[payload]['str_len'], PAYLOADS[payload]['list_len']
+    fields = [('output_dir', str)]
+    for i in range(num_fields - 1):
+        kind = i % (5 if list_len else 4)
+        if kind == 0: fields.append((f"int_{i}", int, dataclasses.field(default=i)))
+        elif kind == 1: fields.append((f"float_{i}", float, dataclasses.field(default=i / 7)))
+        elif kind == 2: fields.append((f"str_{i}", str, dataclasses.field(default='x' * str_len)))
+        elif kind == 3: fields.append((f"do_{i}", bool, dataclasses.field(default=bool(i % 2))))
+        else:
+            # List fields can't be set from the commandline by the default spec, so large payload classes
+            # are only used for the file I/O cases.
+            default = list(range(list_len))
+            factory = lambda d=default: list(d)
+            fields.append((f"list_{i}", List[int], dataclasses.field(default_factory=factory)))
+
+    name = f"Synthetic{num_fields}{payload.title()}Args"
+    return dataclasses.make_dataclass(name, fields, bases=(BaseArgs,))
+
+def argv_for(args_cls, output_dir):
+    argv = ['--output_dir', output_dir]
+    for field in dataclasses.fields(args_cls)[1:]:
+        if field.type is bool: argv.append(f"--{field.name}" if field.default else f"--no_{field.name}")
+        elif field.type in (int, float, str): argv.extend([f"--{field.name}", str(field.default)])
+    return argv
+
+def measure(fn, min_time, min_reps, setup=None):
+    latencies = []
+    start = time.perf_counter()
+    while len(latencies) < min_reps or time.perf_counter() - start < min_time:
+        if setup is not None: setup()
+        st = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - st)
+
+    if setup is not None: setup()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+    return {
+        'reps': len(latencies), 'mean_s': statistics.mean(latencies), 'p50_s': pct(0.5), 'p90_s': pct(0.9),
+        'p99_s': pct(0.99), 'ops_per_s': len(latencies) / sum(latencies), 'peak_bytes': peak,
+    }
+
+def cases(workdir, field_counts, payloads):
+    """
+    Yields `(name, params, fn, setup)` for every benchmark case.
+    """
+    for payload in payloads:
+        for num_fields in field_counts:
+            args_cls = make_args_cls(num_fields, payload)
+            params = {'fields': num_fields, 'payload': payload}
+            args = args_cls(output_dir=workdir)
+
+            if payload == 'small':
+                # Commandline paths don't depend on the file payload.
+                yield 'build_argparse_spec', params, \
+                    lambda c=args_cls: c._build_argparse_spec(argparse.ArgumentParser()), None
+                yield 'compile_spec', params, lambda c=args_cls: c._compile_spec(), None
+
+                argv = argv_for(args_cls, workdir)
+                yield 'from_argv', params, \
+                    lambda c=args_cls, a=argv: c.from_argv(a, write_args_to_file=False), None
+                yield 'from_argv_uncached', params, \
+                    lambda c=args_cls, a=argv: c.from_argv(a, write_args_to_file=False), \
+                    lambda c=args_cls: c.invalidate_spec_cache()
+
+            for ext in list(args_cls.LOADERS_AND_DUMPERS):
+                filepath = os.path.join(workdir, f"{ARGS}_{num_fields}_{payload}.{ext}")
+                args.to_file(filepath)
+                file_params = {**params, 'format': ext}
+                yield 'to_file', file_params, lambda a=args, f=filepath: a.to_file(f), None
+                yield 'from_file', file_params, lambda c=args_cls, f=filepath: c.from_file(f), None
+
+    validators = {'intlt': (intlt((0, 1000)), [str(i) for i in range(1000)])}
+    for num_options in (3, 100):
+        options = {f"opt_{i}": i for i in range(num_options)}
+        validators[f"remap_{num_options}_by_key"] = (remap(options), list(options))
+        validators[f"remap_{num_options}_by_value"] = (remap(options), [str(v) for v in options.values()])
+
+    for name, (validator, inputs) in validators.items():
+        yield name, {'calls': len(inputs)}, lambda v=validator, xs=inputs: [v(x) for x in xs], None
+        yield f"{name}_batch", {'calls': len(inputs)}, \
+            lambda v=validator, xs=inputs: v.validate_batch(xs), None
+
+def case_key(result): return json.dumps([result['name'], result['params']], sort_keys=True)
+
+def compare(results, baseline, fail_threshold):
+    base = {case_key(r): r for r in baseline['results']}
+    regressions = []
+    print(f"\n{'case':<70} {'base p50':>10} {'new p50':>10} {'ratio':>7}")
+    for r in results:
+        b = base.get(case_key(r))
+        if b is None: continue
+        ratio = r['p50_s'] / b['p50_s'] if b['p50_s'] > 0 else float('inf')
+        flag = ' <-- REGRESSION' if ratio > fail_threshold else ''
+        print(f"{case_key(r):<70} {1e3 * b['p50_s']:9.3f}ms {1e3 * r['p50_s']:9.3f}ms {ratio:6.2f}x{flag}")
+        if flag: regressions.append(r)
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmarks for multisource_args hot paths.")
+    parser.add_argument('--output', type=str, default=None, help="Write JSON results here.")
+    parser.add_argument('--baseline', type=str, default=None, help="Compare against these JSON results.")
+    parser.add_argument('--fail_threshold', type=float, default=1.25,
+                        help="Exit non-zero if any case's p50 latency exceeds the baseline by this factor.")
+    parser.add_argument('--min_time', type=float, default=0.2, help="Minimum seconds spent per case.")
+    parser.add_argument('--min_reps', type=int, default=5, help="Minimum repetitions per case.")
+    parser.add_argument('--fields', type=int, nargs='+', default=list(FIELD_COUNTS))
+    parser.add_argument('--payloads', type=str, nargs='+', default=list(PAYLOADS), choices=list(PAYLOADS))
+    opts = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    results = []
+    try:
+        for name, params, fn, setup in cases(workdir, opts.fields, opts.payloads):
+            stats = measure(fn, opts.min_time, opts.min_reps, setup)
+            results.append({'name': name, 'params': params, **stats})
+            print(
+                f"{name:<22} {json.dumps(params):<52} {stats['ops_per_s']:10.1f} ops/s  "
+                f"p50 {1e3 * stats['p50_s']:8.3f}ms  p99 {1e3 * stats['p99_s']:8.3f}ms  "
+                f"peak {stats['peak_bytes'] / 1024:9.1f}KiB"
+            )
+    finally:
+        shutil.rmtree(workdir)
+
+    output = {
+        'meta': {
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    if opts.output is not None:
+        with open(opts.output, mode='w') as f: json.dump(output, f, indent=4)
+
+    if opts.baseline is not None:
+        with open(opts.baseline) as f: baseline = json.load(f)
+        if compare(results, baseline, opts.fail_threshold): sys.exit(1)
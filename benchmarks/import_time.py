@@ -0,0 +1,45 @@
+"""
+Measures the startup cost of importing `multisource_args.args`, which only imports format backends lazily,
+against the eager import of every backend it used to pay for up front.
+
+Usage: `python benchmarks/import_time.py [--repeats N]` (from the main repository directory).
+"""
+
+import argparse, os, statistics, subprocess, sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+CASES = {
+    'lazy (json only)': (
+        "from multisource_args.args import BaseArgs; BaseArgs.LOADERS_AND_DUMPERS['json']"
+    ),
+    'eager (json, pickle, yaml)': (
+        "import json, pickle, yaml; from multisource_args.args import BaseArgs; "
+        "[BaseArgs.LOADERS_AND_DUMPERS[ext] for ext in ('json', 'pkl', 'yaml')]"
+    ),
+}
+
+TIMER = "import time; _st = time.perf_counter(); {code}; print(time.perf_counter() - _st)"
+
+def time_import(code, repeats):
+    times = []
+    for _ in range(repeats):
+        out = subprocess.run(
+            [sys.executable, '-c', TIMER.format(code=code)], cwd=ROOT, capture_output=True, text=True,
+            check=True,
+        )
+        times.append(float(out.stdout.strip()))
+    return times
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeats', type=int, default=20, help="Fresh interpreters per case.")
+    args = parser.parse_args()
+
+    results = {name: time_import(code, args.repeats) for name, code in CASES.items()}
+    for name, times in results.items():
+        median, best = 1000 * statistics.median(times), 1000 * min(times)
+        print(f"{name:>28}: median {median:7.2f} ms, min {best:7.2f} ms")
+
+    lazy, eager = (statistics.median(t) for t in results.values())
+    print(f"{'startup saving':>28}: {1000 * (eager - lazy):7.2f} ms ({100 * (1 - lazy / eager):.0f}%)")
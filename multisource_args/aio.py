@@ -0,0 +1,90 @@
+"""
+asyncio-native loading and saving of args.
+
+All file I/O and decoding runs on a bounded thread pool through the very same sync code paths (`from_file` /
+`to_file`, and so `_fileio_helper`), so results are identical; the event loop is never blocked. The pool's
+size bounds overall concurrency across all callers (see `set_default_executor`), and `aload_many` additionally
+takes a per-call `limit`.
+
+Cancelling an awaiting coroutine stops waiting immediately; a read already running on a worker thread finishes
+in the background and is discarded, and writes are atomic (see `fileio`), so a cancelled `ato_file` leaves
+either the old file or the new one, never a partial one.
+"""
+
+import asyncio, functools, threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .bulk import LoadResult, find_args_files
+
+DEFAULT_MAX_WORKERS = 16
+
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+def get_default_executor():
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                _EXECUTOR = ThreadPoolExecutor(DEFAULT_MAX_WORKERS, thread_name_prefix='multisource_args')
+    return _EXECUTOR
+
+def set_default_executor(executor_or_max_workers):
+    """
+    Replaces the shared executor, either with a given `concurrent.futures.Executor` or with a new thread pool
+    of the given size. The previous default pool (if any) is shut down once its pending work completes.
+    """
+    global _EXECUTOR
+    executor = executor_or_max_workers
+    if isinstance(executor, int):
+        assert executor > 0, f"`max_workers` must be positive! Got {executor}"
+        executor = ThreadPoolExecutor(executor, thread_name_prefix='multisource_args')
+
+    with _EXECUTOR_LOCK:
+        old, _EXECUTOR = _EXECUTOR, executor
+    if old is not None and old is not executor: old.shutdown(wait=False)
+
+async def run_blocking(fn, *args, executor=None, **kwargs):
+    loop = asyncio.get_running_loop()
+    executor = get_default_executor() if executor is None else executor
+    return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+async def afrom_file(args_cls, filepath, filetype=None, executor=None):
+    return await run_blocking(args_cls.from_file, filepath, filetype, executor=executor)
+
+async def ato_file(args, filepath, filetype=None, fsync=None, executor=None):
+    return await run_blocking(args.to_file, filepath, filetype, fsync=fsync, executor=executor)
+
+def _load(args_cls, path):
+    try: return LoadResult(path, args_cls.from_file(path))
+    except Exception as e: return LoadResult(path, error=e)
+
+async def aload_many(args_cls, root_or_paths, limit=64, recursive=True, executor=None):
+    """
+    Async generator yielding a `bulk.LoadResult` for every args file of `args_cls` under `root_or_paths` (see
+    `bulk.find_args_files`) as each finishes loading, with at most `limit` loads in flight at once. As with
+    `bulk.load_many`, failures are reported per file rather than raised. Closing the generator (or cancelling
+    the task iterating it) cancels all outstanding loads.
+    """
+    assert limit > 0, f"`limit` must be positive! Got {limit}"
+
+    paths = await run_blocking(
+        lambda: list(find_args_files(
+            root_or_paths, args_cls.FILENAME, list(args_cls.LOADERS_AND_DUMPERS.keys()), recursive=recursive
+        )),
+        executor=executor
+    )
+
+    pending = set()
+    try:
+        for path in paths:
+            pending.add(asyncio.ensure_future(run_blocking(_load, args_cls, path, executor=executor)))
+            if len(pending) >= limit:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done: yield task.result()
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done: yield task.result()
+    finally:
+        for task in pending: task.cancel()
@@ -0,0 +1,280 @@
+"""
+Append-only packed archives holding many runs' args in a single file, for filesystems where small files and
+metadata operations are expensive.
+
+An archive is a short header followed by length-prefixed records, each `(kind, key length, payload length,
+crc32)` then the key (e.g., the run directory's relative path) and the payload (the args' `to_dict()`,
+encoded in the archive's payload format, JSON by default). Writing a key again appends a new record which
+supersedes the old one; deleting appends a tombstone. On open, only the record headers are scanned (through
+`mmap`) to build an in-memory `key -> offset` index, after which lookups are O(1) and read straight out of the
+mapping. `compact()` rewrites the archive with only its live records.
+```
+with ArgsArchive(ExampleArgs, '/path/to/runs.argpack') as archive:
+    archive.import_dirs('/path/to/all/runs')
+    args = archive['sweep_3/run_17']
+```
+Archives support a single writer (plus any number of readers, which see new records after `refresh()`).
+
+`argpack` is also registered as a regular `LOADERS_AND_DUMPERS` format, whose files are archives holding a
+single record, so `to_file` / `from_file` (and hence `load_many`, sweeps, ...) work with it as with any other.
+"""
+
+import logging, mmap, os, struct, zlib
+from pathlib import Path, PurePosixPath
+
+from . import fileio
+from .serializers import ARGPACK, JSON, REGISTRY, decode, encode
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'ARGPACK1'
+_HEADER = struct.Struct('<8s8s') # Magic, payload format (NUL padded).
+_RECORD = struct.Struct('<BIII') # Kind, key length, payload length, crc32 of key + payload.
+PUT, DELETE = 1, 2
+
+# The key `to_file` writes its single record under.
+DEFAULT_KEY = ''
+
+def _header(payload_format):
+    assert payload_format != ARGPACK and len(payload_format.encode()) <= 8, \
+        f"Invalid archive payload format {payload_format}!"
+    return _HEADER.pack(MAGIC, payload_format.encode())
+
+def _record(kind, key, payload=b''):
+    key = key.encode()
+    return _RECORD.pack(kind, len(key), len(payload), zlib.crc32(payload, zlib.crc32(key))) + key + payload
+
+def _read_header(buf):
+    assert len(buf) >= _HEADER.size, "Not an args archive: file is too short!"
+    magic, payload_format = _HEADER.unpack_from(buf, 0)
+    assert magic == MAGIC, f"Not an args archive: bad magic {magic!r}!"
+    return payload_format.rstrip(b'\0').decode()
+
+def _scan(buf, start, end):
+    """
+    Yields `(kind, key, payload_offset, payload_len, next_offset)` for each complete record in
+    `buf[start:end]`.
+    """
+    offset = start
+    while offset + _RECORD.size <= end:
+        kind, key_len, payload_len, _ = _RECORD.unpack_from(buf, offset)
+        key_offset = offset + _RECORD.size
+        next_offset = key_offset + key_len + payload_len
+        if kind not in (PUT, DELETE) or next_offset > end: return
+        try: key = bytes(buf[key_offset:key_offset + key_len]).decode()
+        except UnicodeDecodeError: return
+        yield kind, key, key_offset + key_len, payload_len, next_offset
+        offset = next_offset
+
+def _crc_ok(buf, payload_offset, payload_len, key):
+    crc = _RECORD.unpack_from(buf, payload_offset - len(key.encode()) - _RECORD.size)[3]
+    return crc == zlib.crc32(buf[payload_offset:payload_offset + payload_len], zlib.crc32(key.encode()))
+
+def load_single(f):
+    """
+    The `argpack` format's loader: returns the contents of the record under `DEFAULT_KEY` (or the sole live
+    record) of the archive read from file object `f`.
+    """
+    buf = f.read()
+    payload_format = _read_header(buf)
+    index = {}
+    for kind, key, offset, length, _ in _scan(buf, _HEADER.size, len(buf)):
+        if kind == PUT: index[key] = (offset, length)
+        else: index.pop(key, None)
+
+    if DEFAULT_KEY not in index:
+        assert len(index) == 1, f"Archive holds {len(index)} records; open it with `ArgsArchive` instead!"
+    key = DEFAULT_KEY if DEFAULT_KEY in index else next(iter(index))
+    offset, length = index[key]
+    assert _crc_ok(buf, offset, length, key), f"Archive record {key!r} is corrupt!"
+    return decode(REGISTRY, payload_format, buf[offset:offset + length])
+
+def dump_single(contents, f, payload_format=JSON):
+    """
+    The `argpack` format's dumper: writes an archive holding only `contents`, under `DEFAULT_KEY`.
+    """
+    f.write(_header(payload_format) + _record(PUT, DEFAULT_KEY, encode(REGISTRY, payload_format, contents)))
+
+class ArgsArchive:
+    """
+    An append-only packed archive of `args_cls` records; see the module docstring. `mode` is 'a' (read and
+    append, creating the archive with `payload_format` if needed) or 'r' (read only). Appends are fsync'ed per
+    `fsync` (see `fileio`): individually by `put` / `delete`, or once per call by `put_many`.
+    """
+
+    def __init__(self, args_cls, path, mode='a', payload_format=JSON, fsync=fileio.FSYNC_FILE):
+        assert mode in ('a', 'r'), f"Invalid mode {mode}! Must be 'a' or 'r'."
+        assert fsync in fileio.FSYNC_POLICIES, \
+            f"Invalid fsync policy {fsync}! Must be in {fileio.FSYNC_POLICIES}"
+
+        self.args_cls, self.path, self.mode, self.fsync = args_cls, Path(path), mode, fsync
+        self._f, self._mm = None, None
+
+        if mode == 'a' and (not self.path.exists() or self.path.stat().st_size == 0):
+            fileio.atomic_write(self.path, lambda f: f.write(_header(payload_format)), True, fsync)
+        self._open()
+
+    def _open(self):
+        self._f = open(self.path, mode='a+b' if self.mode == 'a' else 'rb')
+        self._index = {}
+        self._live_bytes = 0
+        self._end = _HEADER.size
+        self._remap()
+        self.payload_format = _read_header(self._mm)
+        self._scan_tail()
+
+    def _remap(self):
+        if self._mm is not None: self._mm.close()
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _scan_tail(self):
+        # Indexes records appended (by us or, for readers, by the writer) since the last scan. A trailing
+        # partial record, or a last record failing its checksum, is a torn append: skipped by readers (it may
+        # still be being written), and truncated by the writer (it must be left over from a crash).
+        records = list(_scan(self._mm, self._end, len(self._mm)))
+        if records and not _crc_ok(self._mm, records[-1][2], records[-1][3], records[-1][1]): records.pop()
+
+        for kind, key, offset, length, _ in records: self._apply(kind, key, offset, length)
+        if records: self._end = records[-1][4]
+
+        if self.mode == 'a' and self._end < len(self._mm):
+            logger.warning(f"Truncating {len(self._mm) - self._end} bytes of torn records from {self.path}")
+            self._mm.close()
+            self._mm = None
+            self._f.truncate(self._end)
+            self._remap()
+
+    def _apply(self, kind, key, offset, length):
+        old = self._index.pop(key, None)
+        if old is not None: self._live_bytes -= _RECORD.size + len(key.encode()) + old[1]
+        if kind == PUT:
+            self._index[key] = (offset, length)
+            self._live_bytes += _RECORD.size + len(key.encode()) + length
+
+    def refresh(self):
+        """
+        Picks up records appended by another process since this archive was opened (or last refreshed), and
+        reopens it if it has since been compacted.
+        """
+        if os.stat(self.path).st_ino != os.fstat(self._f.fileno()).st_ino:
+            self.close()
+            self._open()
+        elif os.fstat(self._f.fileno()).st_size > len(self._mm):
+            self._remap()
+            self._scan_tail()
+
+    def _append(self, records):
+        assert self.mode == 'a', f"Archive {self.path} is opened read only!"
+        self._f.write(b''.join(r for _, _, r in records))
+        self._f.flush()
+        if self.fsync != fileio.NO_FSYNC: os.fsync(self._f.fileno())
+
+        offset = self._end
+        for kind, key, record in records:
+            payload_offset = offset + _RECORD.size + len(key.encode())
+            self._apply(kind, key, payload_offset, len(record) - (payload_offset - offset))
+            offset += len(record)
+        self._end = offset
+
+    def put(self, key, args): self.put_many([(key, args)])
+
+    def put_many(self, keys_and_args):
+        """
+        Appends a record for each `(key, args)` pair with a single write (and fsync).
+        """
+        records = []
+        for key, args in keys_and_args:
+            assert isinstance(key, str), f"Archive keys must be strings! Got {key!r}"
+            payload = encode(REGISTRY, self.payload_format, args.to_dict())
+            records.append((PUT, key, _record(PUT, key, payload)))
+        if records: self._append(records)
+
+    def delete(self, key):
+        if key not in self: raise KeyError(key)
+        self._append([(DELETE, key, _record(DELETE, key))])
+
+    def get_contents(self, key):
+        offset, length = self._index[key]
+        if offset + length > len(self._mm): self._remap()
+        if not _crc_ok(self._mm, offset, length, key):
+            raise ValueError(f"Record {key!r} of archive {self.path} is corrupt!")
+        return decode(REGISTRY, self.payload_format, self._mm[offset:offset + length])
+
+    def __getitem__(self, key): return self.args_cls._from_contents(self.get_contents(key))
+
+    def get(self, key, default=None): return self[key] if key in self._index else default
+
+    def __contains__(self, key): return key in self._index
+    def __len__(self): return len(self._index)
+    def __iter__(self): return iter(list(self._index))
+    def keys(self): return list(self._index)
+
+    def items(self):
+        for key in self: yield key, self[key]
+
+    @property
+    def garbage_ratio(self):
+        """
+        The fraction of the archive's records section taken up by superseded records and tombstones.
+        """
+        total = self._end - _HEADER.size
+        return (total - self._live_bytes) / total if total else 0.0
+
+    def compact(self):
+        """
+        Atomically rewrites the archive with only its live records (copied as is, without re-encoding).
+        """
+        assert self.mode == 'a', f"Archive {self.path} is opened read only!"
+        self.refresh()
+
+        def write(f):
+            f.write(_header(self.payload_format))
+            for key, (offset, length) in self._index.items():
+                key_len = len(key.encode())
+                f.write(self._mm[offset - key_len - _RECORD.size:offset + length])
+
+        fileio.atomic_write(self.path, write, True, self.fsync)
+        self.close()
+        self._open()
+
+    def export_dirs(self, root, filetype=None, fsync=None, batch_size=256):
+        """
+        Writes each record to its own args file, `{root}/{key}/{FILENAME}.{ext}`, via `write_many`.
+        """
+        root, ext = Path(root), self.args_cls.DEFAULT_EXTENSION if filetype is None else filetype
+
+        def pairs():
+            for key, args in self.items():
+                parts = PurePosixPath(key).parts
+                assert '..' not in parts and not PurePosixPath(key).is_absolute(), \
+                    f"Can't export archive key {key!r} outside of {root}!"
+                run_dir = root.joinpath(*parts)
+                run_dir.mkdir(parents=True, exist_ok=True)
+                yield args, run_dir / f"{self.args_cls.FILENAME}.{ext}"
+
+        self.args_cls.write_many(pairs(), filetype=ext, fsync=fsync, batch_size=batch_size)
+
+    def import_dirs(self, root, workers=8, recursive=True, batch_size=256):
+        """
+        Appends a record for every args file under `root` (see `BaseArgs.load_many`), keyed by its directory's
+        path relative to `root` (in POSIX form). Returns the `LoadResult`s of any files which failed to load.
+        """
+        root, errors, batch = Path(root), [], []
+        for result in self.args_cls.load_many(root, workers=workers, recursive=recursive):
+            if not result.ok:
+                errors.append(result)
+                continue
+            batch.append((result.path.parent.relative_to(root).as_posix(), result.args))
+            if len(batch) >= batch_size:
+                self.put_many(batch)
+                batch = []
+        self.put_many(batch)
+        return errors
+
+    def close(self):
+        if self._mm is not None: self._mm.close()
+        if self._f is not None: self._f.close()
+        self._f, self._mm = None, None
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
@@ -1,26 +1,62 @@
-import argparse, dataclasses, json, os, pickle, yaml
+import argparse, dataclasses, logging, os, sys, threading, weakref
 from abc import ABC, abstractmethod
-from typing import Sequence
+from typing import Sequence, Tuple
 from dataclasses import dataclass, asdict
 from pathlib import Path, PosixPath
 
 from .argtype_utils import *
+# Feature modules (`bulk`, `delta`, `fingerprint`, `instrument`, `nested`, `sidecar`, `sources`, ...) are only
+# imported where used, so that importing `BaseArgs` stays cheap.
+from . import fileio, serializers
+from .serializers import ARGPACK, JSON, PKL, YAML, REGISTRY
 
-JSON, PKL, YAML = 'json', 'pkl', 'yaml'
 ARGS = 'args'
 
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class CompiledSpec:
+    """
+    The result of running a `BaseArgs` subclass's argparse spec once: the fully built (and reusable) parser,
+    the output dir arg & args filename it reported, and the dataclass fields it was built from.
+    """
+    parser:         argparse.ArgumentParser
+    main_dir_arg:   str
+    args_filename:  str
+    fields:         Tuple[dataclasses.Field, ...]
+
+# Keyed on the class itself (weakly, so locally defined subclasses can still be collected). Subclasses never
+# share an entry with their parents, as their fields (and possibly their spec) differ.
+_SPEC_CACHE = weakref.WeakKeyDictionary()
+_SPEC_CACHE_LOCK = threading.Lock()
+
 class BaseArgs:
     DESCRIPTION = "Base Descriptions (overwrite)"
     DEFAULT_EXTENSION = JSON
     FILENAME = ARGS
-
-    LOADERS_AND_DUMPERS = {
-        # Format:
-        # 'extension': (loader, dumper, uses_binary)
-        JSON: (json.load, lambda obj, f: json.dump(obj, f, indent=4), False),
-        PKL: (pickle.load, pickle.dump, True),
-        YAML: (lambda f: yaml.load(f, Loader=yaml.SafeLoader), yaml.dump, False),
-    }
+    # Optionally, an `index.ArgsIndex` which every `to_file` call (and thus `from_commandline`) records into.
+    INDEX = None
+    # Optionally, a `cache.ArgsFileCache` which memoizes `from_file` (and is invalidated by `to_file`).
+    FILE_CACHE = None
+    # Caches the base args files that delta args files (see `delta`) are resolved against. None uses the
+    # `delta.BaseCache` shared by all classes.
+    BASE_CACHE = None
+    # Caches the parsed file and environment layers of `from_sources` (see `sources`), keyed by content. None
+    # uses the `sources.LayerCache` shared by all classes.
+    LAYER_CACHE = None
+    # If set, lists of at least this many numbers are written to sidecar `.npy` files (see `sidecar`), and so
+    # load back as read-only `sidecar.MappedArray`s. None (the default) only does so for opted in fields.
+    SIDECAR_MIN_ITEMS = None
+
+    # Format:
+    # 'extension': (loader, dumper, uses_binary)
+    # By default, the shared `serializers.REGISTRY`, which only imports a format's backend on first use. Can
+    # be overwritten with a plain dictionary in this format.
+    LOADERS_AND_DUMPERS = REGISTRY
+
+    # How hard `to_file` works to make writes durable; one of `fileio.FSYNC_POLICIES`. Writes are always
+    # atomic regardless.
+    FSYNC = fileio.FSYNC_FILE
 
     @classmethod
     def _fileio_helper(cls, filepath, filetype=None):
@@ -41,14 +77,38 @@ class BaseArgs:
         loader, dumper, use_binary = cls.LOADERS_AND_DUMPERS[filetype]
 
         read_mode = 'rb' if use_binary else 'r'
-        write_mode = 'wb' if use_binary else 'w'
 
-        def read(cls, filepath):
-            with open(filepath, mode=read_mode) as f: contents = loader(f)
-            return cls(**contents) if isinstance(contents, dict) else contents
+        def read(cls, filepath, deps=None):
+            from . import delta, instrument
+            sp = instrument.NULL_SPAN
+            if instrument.ACTIVE:
+                sp = instrument.span('load', cls=cls.__name__, path=str(filepath), format=filetype)
+            with sp:
+                with open(filepath, mode=read_mode) as f:
+                    contents = loader(f)
+                    if sp: sp.bytes = os.fstat(f.fileno()).st_size
+                if deps is not None and delta.is_delta(contents):
+                    deps.append(delta.base_path(contents, filepath))
+                return cls._from_contents(contents, filepath)
+
+        def write(obj, filepath, batch, base=None):
+            from . import instrument, nested
+            if base is None: contents = nested.to_contents(obj, filepath, filetype, batch)
+            else:
+                from . import delta
+                contents = delta.make_delta(obj, base, filepath, filetype, batch)
+
+            def dump(f):
+                sp = instrument.NULL_SPAN
+                if instrument.ACTIVE:
+                    sp = instrument.span('dump', cls=type(obj).__name__, path=str(filepath), format=filetype)
+                with sp:
+                    dumper(contents, f)
+                    if sp:
+                        f.flush()
+                        sp.bytes = os.fstat(f.fileno()).st_size
 
-        def write(obj, filepath):
-            with open(filepath, mode=write_mode) as f: dumper(obj.to_dict(), f)
+            batch.add(filepath, dump, use_binary, on_commit=lambda: obj._on_write(filepath))
 
         return filepath, read, write
 
@@ -57,18 +117,161 @@ class BaseArgs:
         filepath, reader, _ = cls._fileio_helper(filepath, filetype)
 
         assert filepath.is_file(), f"`filepath` ({filepath}) must be a file!"
+        if cls.FILE_CACHE is not None:
+            if filetype is None: filetype = filepath.suffix[1:]
+            # A delta's cached args are only valid while its base is unchanged too.
+            deps = []
+            return cls.FILE_CACHE.get(cls, filepath, filetype, lambda: reader(cls, filepath, deps), deps)
+
         return reader(cls, filepath)
 
-    def to_file(self, filepath, filetype=None):
+    @classmethod
+    def _from_contents(cls, contents, filepath=None):
+        from . import delta, nested, sidecar
+        if delta.is_delta(contents): contents = delta.resolve(cls, contents, filepath)
+        if not isinstance(contents, dict): return contents
+
+        lazy = nested.build_nested(cls, contents, filepath) if nested.nested_fields(cls) else None
+        sidecar.load_refs(contents, filepath)
+        args = cls(**contents)
+        nested.defer(args, lazy)
+        return args
+
+    # Only called for attributes not found normally, i.e., nested args sections not yet loaded (see `nested`).
+    def __getattr__(self, name):
+        from . import nested
+        return nested.load_deferred(self, name)
+
+    @classmethod
+    def from_bytes(cls, data, filetype, filepath=None):
+        """
+        Parses the raw bytes of an args file of type `filetype`, exactly as `from_file` would parse the file
+        (at `filepath`, which relative delta bases are resolved against).
+        """
+        assert filetype in cls.LOADERS_AND_DUMPERS, \
+            f"Invalid filetype {filetype}! Must be in {cls.LOADERS_AND_DUMPERS.keys()}"
+        return cls._from_contents(serializers.decode(cls.LOADERS_AND_DUMPERS, filetype, data), filepath)
+
+    @classmethod
+    def load_many(cls, root_or_paths, workers=8, process_workers=0, recursive=True):
+        """
+        Finds all args files (`{FILENAME}.{ext}` for any registered extension) under `root_or_paths` and loads
+        them in parallel, yielding a `bulk.LoadResult` per file as each finishes. See `bulk.load_many`.
+        """
+        from . import bulk
+        return bulk.load_many(
+            cls, root_or_paths, workers=workers, process_workers=process_workers, recursive=recursive
+        )
+
+    @classmethod
+    async def afrom_file(cls, filepath, filetype=None, executor=None):
+        """
+        Async `from_file`, run on `executor` (default: the shared bounded pool of `aio`).
+        """
+        from . import aio # Imported lazily, as asyncio is slow to import.
+        return await aio.afrom_file(cls, filepath, filetype, executor=executor)
+
+    @classmethod
+    def aload_many(cls, root_or_paths, limit=64, recursive=True, executor=None):
+        """
+        Async generator version of `load_many`, with at most `limit` loads in flight. See `aio.aload_many`.
+        """
+        from . import aio
+        return aio.aload_many(cls, root_or_paths, limit=limit, recursive=recursive, executor=executor)
+
+    def to_file(self, filepath, filetype=None, fsync=None, batch=None, base=None):
+        """
+        Atomically writes these args to `filepath` (see `fileio`), fsync'ing per `fsync` (default `FSYNC`). If
+        `batch` (a `fileio.WriteBatch`) is given, the write is instead added to it and lands when it flushes.
+        If `base` (the path of another args file) is given, only the fields differing from it are written,
+        along with a reference to it (see `delta`).
+        """
         filepath, _, writer = self._fileio_helper(filepath, filetype)
 
         if filepath.exists():
             assert filepath.is_file(), f"Can't write args to {filepath}: path exists and is a non-file!"
-            print(f"Overwriting existing args at {filepath}")
+            logger.info(f"Overwriting existing args at {filepath}")
 
-        writer(self, filepath)
+        if batch is not None:
+            writer(self, filepath, batch, base)
+            return
 
-    def to_dict(self): return asdict(self)
+        with fileio.WriteBatch(fsync=self.FSYNC if fsync is None else fsync, batch_size=1) as batch:
+            writer(self, filepath, batch, base)
+
+    async def ato_file(self, filepath, filetype=None, fsync=None, executor=None):
+        """
+        Async `to_file`, run on `executor` (default: the shared bounded pool of `aio`).
+        """
+        from . import aio
+        return await aio.ato_file(self, filepath, filetype, fsync=fsync, executor=executor)
+
+    def _on_write(self, filepath):
+        if self.FILE_CACHE is not None: self.FILE_CACHE.invalidate(filepath)
+        # No base can be cached before `delta` is first used.
+        delta = sys.modules.get(f"{__package__}.delta")
+        if delta is not None: delta.base_cache(type(self)).invalidate(filepath)
+        if self.INDEX is not None: self.INDEX.record(filepath, self)
+
+    @classmethod
+    def write_many(cls, args_and_filepaths, filetype=None, fsync=None, batch_size=256, base=None):
+        """
+        Writes each `(args, filepath)` pair via `to_file` (as deltas against `base`, if given) within shared
+        `fileio.WriteBatch`es of `batch_size` files, so directory handles are reused and fsyncs are deferred
+        to once per batch.
+        """
+        with fileio.WriteBatch(fsync=cls.FSYNC if fsync is None else fsync, batch_size=batch_size) as batch:
+            for args, filepath in args_and_filepaths:
+                args.to_file(filepath, filetype, batch=batch, base=base)
+
+    def to_bytes(self, filetype=None):
+        """
+        Returns the raw bytes `to_file` would write for `filetype` (default `DEFAULT_EXTENSION`); the inverse
+        of `from_bytes`.
+        """
+        filetype = self.DEFAULT_EXTENSION if filetype is None else filetype
+        assert filetype in self.LOADERS_AND_DUMPERS, \
+            f"Invalid filetype {filetype}! Must be in {self.LOADERS_AND_DUMPERS.keys()}"
+        return serializers.encode(self.LOADERS_AND_DUMPERS, filetype, self.to_dict())
+
+    def broadcast(self, filetype=None):
+        """
+        Publishes these args into shared memory for worker processes; see `shm.ArgsBroadcast`.
+        """
+        from . import shm
+        return shm.ArgsBroadcast(self, filetype=filetype)
+
+    def watch(self, callback=None, filepath=None, interval=1.0, backend=None):
+        """
+        Starts (and returns) a `watch.ArgsWatcher` applying edits of `filepath` (by default, the args file in
+        this run's output dir) to these args in place, calling `callback(diff)` after each; see `watch`.
+        """
+        from . import watch
+        if filepath is None:
+            spec = self.compiled_spec()
+            filepath = Path(getattr(self, spec.main_dir_arg)) / spec.args_filename
+            if not filepath.suffix: filepath = filepath.with_suffix(f".{self.DEFAULT_EXTENSION}")
+        return watch.ArgsWatcher(self, filepath, callback, interval=interval, backend=backend).start()
+
+    def to_dict(self):
+        from . import sidecar
+        return sidecar.to_plain(asdict(self))
+
+    def fingerprint(self, include_output_dir=False):
+        """
+        Returns a canonical, format-independent SHA-256 hex digest of `to_dict()` (see `fingerprint`),
+        memoized per instance. By default the output dir arg is excluded, so that identical configurations in
+        different run directories share a fingerprint.
+        """
+        from .fingerprint import fingerprint_dict, memoized_fingerprint
+        spec = type(self).compiled_spec()
+
+        def compute():
+            contents = self.to_dict()
+            if not include_output_dir: contents.pop(spec.main_dir_arg, None)
+            return fingerprint_dict(contents)
+
+        return memoized_fingerprint(self, [f.name for f in spec.fields], include_output_dir, compute)
 
     @classmethod
     def _build_argparse_spec(cls, parser):
@@ -100,46 +303,68 @@ class BaseArgs:
         This function can still be overwritten on a class-by-class basis with a custom argparse spec.
         """
 
-        fields = dataclasses.fields(cls)
+        output_dir_arg = cls._add_field_args(parser)
+        assert output_dir_arg is not None, "Never found an output dir!"
+
+        return output_dir_arg, cls.FILENAME
+
+    @classmethod
+    def _add_field_args(cls, parser, prefix='', defaults=None):
+        """
+        Adds an argument per field of `cls` to `parser` (see `_build_argparse_spec`), recursing into nested
+        args fields with dotted names (`--{prefix}{name}`). Within a nested field, defaults are taken from the
+        instance `defaults` (the parent field's default). Returns the output dir arg, if one was found.
+        """
+        from . import nested
         output_dir_arg = None
-        for i, field in enumerate(fields):
+        for i, field in enumerate(dataclasses.fields(cls)):
             name, type_fn, default, metadata = field.name, field.type, field.default, field.metadata
 
+            sub_cls = nested.nested_type(field)
+            if sub_cls is not None:
+                sub_defaults = nested.field_default(field) if defaults is None else getattr(defaults, name)
+                sub_cls._add_field_args(parser, f"{prefix}{name}.", sub_defaults)
+                continue
+
             is_bool_arg = type_fn is bool
-            is_required = isinstance(default, dataclasses._MISSING_TYPE)
-            default_val = None if is_required else default
+            is_required = defaults is None and isinstance(default, dataclasses._MISSING_TYPE)
+            if defaults is not None: default_val = getattr(defaults, name)
+            else: default_val = None if is_required else default
             help_message = metadata.get('help_message', '')
             is_valid_output_dir_arg = (i == 0 and type_fn is str) or metadata.get('is_output_dir_arg', False)
-            if is_valid_output_dir_arg:
+            if is_valid_output_dir_arg and not prefix:
                 output_dir_arg = name
 
             if is_bool_arg:
                 assert name.startswith('do_'), \
                     f"Default argparse spec requires bool args to start with `do_`. {name} violates."
-                cls.add_bool_arg(parser, name, help_message, default_val, required=is_required)
+                cls.add_bool_arg(parser, name, help_message, default_val, required=is_required, prefix=prefix)
             else:
                 parser.add_argument(
-                    f"--{name}", type=type_fn, required=is_required, help=help_message, default=default_val
+                    f"--{prefix}{name}", type=type_fn, required=is_required, help=help_message,
+                    default=default_val
                 )
 
-        assert output_dir_arg is not None, "Never found an output dir!"
-
-        return output_dir_arg, cls.FILENAME
+        return output_dir_arg
 
     @staticmethod
-    def add_bool_arg(parser, arg, help_msg, default, required=False):
+    def add_bool_arg(parser, arg, help_msg, default, required=False, prefix=''):
         """
-        Adds a copy of `arg` and `no_{arg}` to the parser.
+        Adds a copy of `arg` and `no_{arg}` to the parser (as `{prefix}{arg}` and `{prefix}no_{arg}`).
         """
         assert arg.startswith("do_"), "Arg should be of the form do_*! Got %s" % arg
-        do_arg, no_do_arg = "--%s" % arg, "--no_%s" % arg
+        do_arg, no_do_arg = "--%s%s" % (prefix, arg), "--%sno_%s" % (prefix, arg)
         parser.add_argument(
-            do_arg, action='store_true', dest=arg, help=help_msg, default=default, required=required
+            do_arg, action='store_true', dest=prefix + arg, help=help_msg, default=default, required=required
         )
-        parser.add_argument(no_do_arg, action='store_false', dest=arg)
+        parser.add_argument(no_do_arg, action='store_false', dest=prefix + arg)
 
     @classmethod
-    def from_commandline(cls, write_args_to_file=True):
+    def _compile_spec(cls):
+        """
+        Builds the full commandline parser for this class (via `_build_argparse_spec`, so custom specs are
+        respected) and bundles it with the spec's outputs into a `CompiledSpec`.
+        """
         parser = argparse.ArgumentParser(description=cls.DESCRIPTION)
 
         main_dir_arg, args_filename = cls._build_argparse_spec(parser)
@@ -153,7 +378,83 @@ class BaseArgs:
             default=False
         )
 
-        args = parser.parse_args()
+        # So that per-field conversion can be timed when instrumentation is enabled.
+        from . import instrument
+        for action in parser._actions:
+            if action.type is not None: action.type = instrument.timed_type_fn(action.dest, action.type)
+
+        return CompiledSpec(parser, main_dir_arg, args_filename, tuple(dataclasses.fields(cls)))
+
+    @classmethod
+    def compiled_spec(cls):
+        """
+        Returns the `CompiledSpec` for this class, building it only on first use. If the spec is changed after
+        that point (e.g., `_build_argparse_spec` is monkeypatched), call `invalidate_spec_cache` to rebuild.
+        """
+        spec = _SPEC_CACHE.get(cls)
+        if spec is not None: return spec
+
+        with _SPEC_CACHE_LOCK:
+            spec = _SPEC_CACHE.get(cls)
+            if spec is None:
+                from . import instrument
+                with instrument.span('spec_build', cls=cls.__name__): spec = cls._compile_spec()
+                _SPEC_CACHE[cls] = spec
+        return spec
+
+    @classmethod
+    def invalidate_spec_cache(cls, include_subclasses=False):
+        """
+        Drops the cached `CompiledSpec` for this class (and, optionally, for all of its subclasses).
+        """
+        with _SPEC_CACHE_LOCK:
+            for k in list(_SPEC_CACHE.keys()):
+                if k is cls or (include_subclasses and issubclass(k, cls)): _SPEC_CACHE.pop(k, None)
+
+    @staticmethod
+    def instrumented(*sinks):
+        """
+        Enables instrumentation within a block; see `instrument.instrumented`.
+        """
+        from . import instrument
+        return instrument.instrumented(*sinks)
+
+    @classmethod
+    def from_sources(cls, files=(), env_prefix=None, argv=(), environ=None):
+        """
+        Layers defaults, config `files`, environment variables and commandline overrides, returning a
+        `sources.Resolved` of the args and where each field came from; see `sources.resolve`.
+        """
+        from . import instrument, sources
+        with instrument.span('from_sources', cls=cls.__name__):
+            return sources.resolve(cls, files=files, env_prefix=env_prefix, argv=argv, environ=environ)
+
+    @classmethod
+    def from_commandline(cls, write_args_to_file=True, dedup=False, dedup_root=None):
+        return cls.from_argv(None, write_args_to_file=write_args_to_file, dedup=dedup, dedup_root=dedup_root)
+
+    @classmethod
+    def from_argv(cls, argv, write_args_to_file=True, dedup=False, dedup_root=None):
+        """
+        Like `from_commandline`, but parses the passed sequence of strings (`sys.argv[1:]` if `argv` is None)
+        against the cached `CompiledSpec`, so repeated calls pay no parser construction cost.
+
+        If `dedup`, before creating a new run directory we look for an existing run with the same
+        `fingerprint()` (via `INDEX` if set, else among the run directories in `dedup_root`, which defaults to
+        the parent of the requested run directory). If one is found, its args are returned (and nothing is
+        written) instead.
+        """
+        from . import instrument
+        with instrument.span('from_argv', cls=cls.__name__):
+            return cls._from_argv(argv, write_args_to_file, dedup, dedup_root)
+
+    @classmethod
+    def _from_argv(cls, argv, write_args_to_file, dedup, dedup_root):
+        from . import instrument, nested
+        spec = cls.compiled_spec()
+        main_dir_arg, args_filename = spec.main_dir_arg, spec.args_filename
+
+        with instrument.span('parse', cls=cls.__name__): args = spec.parser.parse_args(argv)
         args_dict = vars(args)
 
         args_dir = Path(args_dict[main_dir_arg])
@@ -162,18 +463,28 @@ class BaseArgs:
 
         if args.do_load_from_dir:
             new_args = cls.from_file(args_filepath)
-            assert vars(new_args)[main_dir_arg] == args_dir, f"{main_dir_arg} doesn't match loaded file!"
+            loaded_dir = Path(vars(new_args)[main_dir_arg])
+            assert loaded_dir == args_dir, f"{main_dir_arg} doesn't match loaded file!"
 
             return new_args
 
         if 'do_load_from_dir' in args_dict: args_dict.pop('do_load_from_dir')
-        args_cls = cls(**args_dict)
+        args_cls = cls._from_contents(nested.unflatten(args_dict))
+
+        if dedup:
+            from .fingerprint import find_duplicate
+            existing = find_duplicate(args_cls, args_dir.parent if dedup_root is None else dedup_root)
+            if existing is not None:
+                logger.info(f"Reusing existing run {getattr(existing, main_dir_arg)} with identical args.")
+                return existing
 
         if write_args_to_file:
             if not args_dir.is_dir():
                 assert not args_dir.exists(), f"{args_dir} exists and is non-directory! Can't save within."
-                print(f"Making save dir: {args_dir}")
-                os.makedirs(args_dir)
+                logger.info(f"Making save dir: {args_dir}")
+                sp = instrument.NULL_SPAN
+                if instrument.ACTIVE: sp = instrument.span('makedirs', path=str(args_dir))
+                with sp: os.makedirs(args_dir)
 
             args_cls.to_file(args_filepath)
 
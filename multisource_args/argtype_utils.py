@@ -1,23 +1,150 @@
-import argparse
+"""
+Argument type converters / validators, usable as argparse `type=` callables.
 
-def intlt(bounds):
-    start, end = bounds if type(bounds) is tuple else (0, bounds)
-    def fntr(x):
+Each is a compiled `Validator` object: whatever can be precomputed (hash sets, reverse lookup tables) is built
+once up front, so per-value calls are cheap. Validators can also check many values at once via
+`validate_batch`, which returns every `Violation` rather than raising on the first (e.g., to vet a sweep of
+millions of points before writing any of it).
+"""
+
+import argparse, sys
+from abc import ABC, abstractmethod
+from typing import Any, NamedTuple
+
+__all__ = ['Violation', 'Validator', 'IntRange', 'Remap', 'intlt', 'remap']
+
+def numpy_for(values):
+    # Returns NumPy iff `values` is a NumPy array. One can only exist once NumPy is imported, so this never
+    # imports it (keeping it off the startup path of every job which imports `BaseArgs`). Also used by
+    # `sidecar`.
+    np = sys.modules.get('numpy')
+    return np if np is not None and isinstance(values, np.ndarray) else None
+
+class Violation(NamedTuple):
+    index:   int
+    value:   Any
+    message: str
+
+class Validator(ABC):
+    @abstractmethod
+    def __call__(self, x): pass # Returns the converted value or raises.
+
+    def _check(self, x):
+        try:
+            self(x)
+            return None
+        except (argparse.ArgumentTypeError, ValueError, TypeError) as e: return str(e)
+
+    def validate_batch(self, values):
+        """
+        Returns the list of `Violation`s among `values` (a sequence or NumPy array), in order, checking each
+        distinct value only once.
+        """
+        np = numpy_for(values)
+        if np is not None and values.dtype.kind != 'O':
+            values = values.ravel()
+            uniques, inverse = np.unique(values, return_inverse=True)
+            bad = {i: m for i, m in enumerate(self._check(u.item()) for u in uniques) if m is not None}
+            if not bad: return []
+            return [
+                Violation(i, values[i].item(), bad[u]) for i, u in enumerate(inverse.tolist()) if u in bad
+            ]
+
+        checked, violations = {}, []
+        for i, x in enumerate(values):
+            key = (type(x), x) # So that, e.g., `1`, `1.0` and `True` are checked separately.
+            try: message = checked[key] if key in checked else checked.setdefault(key, self._check(x))
+            except TypeError: message = self._check(x) # Unhashable.
+            if message is not None: violations.append(Violation(i, x, message))
+        return violations
+
+class IntRange(Validator):
+    """
+    Converts to `int`, which must lie in `[start, end)`.
+    """
+    def __init__(self, start, end):
+        self.start, self.end = start, end
+        self.__name__ = f"intlt({start}, {end})" # argparse uses this in error messages.
+
+    def __call__(self, x):
         x = int(x)
-        if x < start or x >= end: raise argparse.ArgumentTypeError("%d must be in [%d, %d)" % (x, start, end))
+        if x < self.start or x >= self.end:
+            raise argparse.ArgumentTypeError("%d must be in [%d, %d)" % (x, self.start, self.end))
         return x
-    return fntr
 
-def remap(options):
-    key_type = list(set(type(k) for k in options.keys()))[0]
-    value_type = list(set(type(k) for k in options.values()))[0]
-    def fntr(x):
+    def validate_batch(self, values):
+        # Checks are cheap, so unlike the general version this doesn't bother deduplicating.
+        np = numpy_for(values)
+        if np is not None and values.dtype.kind in 'iu':
+            values = values.ravel()
+            bad = np.flatnonzero((values < self.start) | (values >= self.end)).tolist()
+            return [Violation(i, values[i].item(), self._check(values[i].item())) for i in bad]
+        if np is not None and values.dtype.kind != 'O': return super().validate_batch(values)
+
+        violations, start, end = [], self.start, self.end
+        for i, x in enumerate(values):
+            try:
+                v = int(x)
+                if start <= v < end: continue
+            except (ValueError, TypeError): pass
+            violations.append(Violation(i, x, self._check(x)))
+        return violations
+
+class Remap(Validator):
+    """
+    Accepts either a value of `options` (converted to the values' type) or a key of `options` (converted to
+    the keys' type), which is mapped to its value; values take precedence. `options` is copied when compiled.
+    """
+    def __init__(self, options):
+        assert options, "`options` must be non-empty!"
+        self.options = dict(options)
+        self.key_type = type(next(iter(self.options.keys())))
+        self.value_type = type(next(iter(self.options.values())))
+        self.__name__ = 'remap'
+
+        try: self._values = frozenset(self.options.values())
+        except TypeError: self._values = tuple(self.options.values()) # Unhashable values.
+
+        # Reverse lookup from the string form of every key and value (which is what argparse passes) to its
+        # result, computed with the general path so it's exactly equivalent.
+        self._by_str = {}
+        for s in map(str, (*self.options.values(), *self.options.keys())):
+            if s in self._by_str: continue
+            try: self._by_str[s] = self._convert(s)
+            except argparse.ArgumentTypeError: pass
+
+    def _convert(self, x):
         try:
-            if value_type(x) in options.values(): return value_type(x)
-        except: pass
+            v = self.value_type(x)
+            if v in self._values: return v
+        except (ValueError, TypeError): pass
         try:
-            if key_type(x) in options.keys(): return options[key_type(x)]
-        except: pass
+            k = self.key_type(x)
+            if k in self.options: return self.options[k]
+        except (ValueError, TypeError): pass
+
+        raise argparse.ArgumentTypeError(
+            f"{str(x)} (type {type(x)}) is not a valid option: {str(self.options)}"
+        )
+
+    def __call__(self, x):
+        if type(x) is str:
+            v = self._by_str.get(x, self._by_str)
+            if v is not self._by_str: return v
+        return self._convert(x)
+
+    def validate_batch(self, values):
+        if numpy_for(values) is not None: return super().validate_batch(values)
+        # Strings of options (the common case) are known valid, so only the rest need checking.
+        indices, rest = [], []
+        for i, x in enumerate(values):
+            if type(x) is str and x in self._by_str: continue
+            indices.append(i)
+            rest.append(x)
+        return [Violation(indices[v.index], v.value, v.message) for v in super().validate_batch(rest)]
+
+def intlt(bounds):
+    start, end = bounds if type(bounds) is tuple else (0, bounds)
+    return IntRange(start, end)
 
-        raise argparse.ArgumentTypeError(f"{str(x)} (type {type(x)}) is not a valid option: {str(options)}")
-    return fntr
+def remap(options): return Remap(options)
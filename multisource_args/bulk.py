@@ -0,0 +1,103 @@
+"""
+Parallel discovery and loading of many run directories' args files at once.
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from .serializers import YAML, decode
+
+@dataclass
+class LoadResult:
+    """
+    The outcome of loading a single args file: either `args` (on success) or `error` (on failure) is set.
+    """
+    path:  Path
+    args:  Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self): return self.error is None
+
+def _parse(args_cls, filetype, data):
+    # Module level so it can be shipped to a process pool. Loaders often aren't picklable (e.g., lambdas), so
+    # the worker looks up `args_cls`'s own one (which is then pickled by reference, so must be importable).
+    return decode(args_cls.LOADERS_AND_DUMPERS, filetype, data)
+
+def find_args_files(root_or_paths, filename, extensions, recursive=True):
+    """
+    Yields the paths of all files named `{filename}.{ext}` (for `ext` in `extensions`) within `root_or_paths`,
+    which may be a single path or an iterable of paths. Directories are scanned (recursively, if `recursive`),
+    and explicitly listed files are yielded as is.
+    """
+    if isinstance(root_or_paths, (str, os.PathLike)): root_or_paths = [root_or_paths]
+
+    targets = {f"{filename}.{ext}" for ext in extensions}
+
+    def scan(directory):
+        try:
+            with os.scandir(directory) as it: entries = list(it)
+        except OSError: return
+
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if recursive: yield from scan(entry.path)
+            elif entry.name in targets: yield Path(entry.path)
+
+    for path in root_or_paths:
+        path = Path(path)
+        if path.is_dir(): yield from scan(path)
+        else: yield path
+
+def _load_one(args_cls, path, process_pool):
+    try:
+        filetype = path.suffix[1:]
+        with open(path, mode='rb') as f: data = f.read()
+
+        if process_pool is not None and filetype == YAML:
+            contents = process_pool.submit(_parse, args_cls, filetype, data).result()
+            return LoadResult(path, args_cls._from_contents(contents, path))
+
+        return LoadResult(path, args_cls.from_bytes(data, filetype, path))
+    except Exception as e:
+        return LoadResult(path, error=e)
+
+def load_many(args_cls, root_or_paths, workers=8, process_workers=0, recursive=True):
+    """
+    Loads every args file for `args_cls` found in `root_or_paths` (see `find_args_files`), streaming back a
+    `LoadResult` per file in completion order. Reads (and JSON/pickle decoding) happen on a pool of `workers`
+    threads; if `process_workers > 0`, YAML parsing is additionally farmed out to a process pool of that size
+    (in which case `args_cls` must be importable, i.e., defined at module level).
+    Failures are reported via `LoadResult.error` and never stop the batch. Only a bounded number of files are
+    in flight at once, so arbitrarily large trees can be streamed.
+    """
+    assert workers > 0, f"`workers` must be positive! Got {workers}"
+
+    paths = find_args_files(
+        root_or_paths, args_cls.FILENAME, args_cls.LOADERS_AND_DUMPERS.keys(), recursive=recursive
+    )
+    window = 4 * workers
+
+    process_pool = None
+    if process_workers > 0:
+        from concurrent.futures import ProcessPoolExecutor # Imports multiprocessing, so only when needed.
+        process_pool = ProcessPoolExecutor(process_workers)
+    thread_pool = ThreadPoolExecutor(workers)
+    pending = set()
+    try:
+        for path in paths:
+            pending.add(thread_pool.submit(_load_one, args_cls, path, process_pool))
+            if len(pending) >= window:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done: yield fut.result()
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done: yield fut.result()
+    finally:
+        for fut in pending: fut.cancel()
+        thread_pool.shutdown(wait=True)
+        if process_pool is not None: process_pool.shutdown(wait=True)
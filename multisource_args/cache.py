@@ -0,0 +1,211 @@
+"""
+An opt-in, bounded, mtime-validated LRU cache in front of `BaseArgs.from_file`.
+
+Entries are keyed on `(class, resolved path, filetype)` and remember the `(mtime_ns, size)` the file had when
+it was parsed; a lookup only hits if the file's current stat still matches, so external rewrites invalidate
+naturally. `BaseArgs.to_file` additionally drops the entry explicitly, which covers rewrites that land within
+the filesystem's mtime granularity.
+"""
+
+import copy, dataclasses, os, threading, weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+IMMUTABLE_TYPES = (type(None), bool, int, float, complex, str, bytes, tuple, frozenset, Path)
+
+@dataclass
+class CacheStats:
+    hits:          int = 0
+    misses:        int = 0
+    evictions:     int = 0
+    invalidations: int = 0
+    currsize:      int = 0
+    maxsize:       int = 0
+
+def _rebuild(args_cls, state):
+    obj = object.__new__(args_cls)
+    obj.__dict__.update(state)
+    return obj
+
+def _frozen_setattr(self, name, value):
+    raise dataclasses.FrozenInstanceError(f"cannot assign to field {name!r}: shared cached args are frozen.")
+
+def _frozen_delattr(self, name):
+    raise dataclasses.FrozenInstanceError(f"cannot delete field {name!r}: shared cached args are frozen.")
+
+def _frozen_eq(self, other):
+    if not isinstance(other, self._FROZEN_BASE): return NotImplemented
+    return self.to_dict() == other.to_dict()
+
+def _frozen_reduce(self):
+    # Copying or pickling a frozen instance yields a regular (mutable) instance of the original class.
+    return _rebuild, (self._FROZEN_BASE, dict(self.__dict__))
+
+_FROZEN_CLASSES = weakref.WeakKeyDictionary()
+
+def frozen_class(args_cls):
+    """
+    Returns (building once per class) a read-only subclass of `args_cls` used for shared cache entries.
+    """
+    frozen_cls = _FROZEN_CLASSES.get(args_cls)
+    if frozen_cls is None:
+        frozen_cls = type(f"Frozen{args_cls.__name__}", (args_cls,), {
+            '_FROZEN_BASE': args_cls, '__setattr__': _frozen_setattr, '__delattr__': _frozen_delattr,
+            '__eq__': _frozen_eq, '__hash__': None, '__reduce__': _frozen_reduce,
+            '__qualname__': f"Frozen{args_cls.__qualname__}",
+        })
+        _FROZEN_CLASSES[args_cls] = frozen_cls
+    return frozen_cls
+
+def freeze(args): return _rebuild(frozen_class(type(args)), dict(args.__dict__))
+
+def cheap_copy(args):
+    """
+    A copy of `args` which shares immutable field values with the original, deep copying only the rest.
+    """
+    return _rebuild(type(args), {
+        k: (v if isinstance(v, IMMUTABLE_TYPES) else copy.deepcopy(v)) for k, v in args.__dict__.items()
+    })
+
+class LRU:
+    """
+    A thread-safe mapping of at most `maxsize` entries, evicting the least recently used; the storage behind
+    every cache in this package (`ArgsFileCache`, `delta.BaseCache`, `sources.LayerCache`).
+    """
+
+    def __init__(self, maxsize):
+        assert maxsize > 0, f"`maxsize` must be positive! Got {maxsize}"
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, touch=True):
+        """
+        Returns the value under `key` (or None), marking it as recently used unless `touch` is False.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None and touch: self._entries.move_to_end(key)
+        return value
+
+    def touch(self, key, value):
+        """
+        Marks `key` as recently used, if it still holds `value` (it may have been evicted or replaced since).
+        """
+        with self._lock:
+            if self._entries.get(key) is value: self._entries.move_to_end(key)
+
+    def put(self, key, value):
+        """
+        Stores `value` under `key` as the most recently used entry. Returns how many entries were evicted.
+        """
+        evicted = 0
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                evicted += 1
+        return evicted
+
+    def pop(self, key):
+        with self._lock: return self._entries.pop(key, None)
+
+    def remove_if(self, predicate):
+        """
+        Removes every entry whose key satisfies `predicate`. Returns how many were removed.
+        """
+        with self._lock:
+            keys = [k for k in self._entries if predicate(k)]
+            for key in keys: del self._entries[key]
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+        return removed
+
+    def __len__(self): return len(self._entries)
+
+class ArgsFileCache:
+    """
+    Memoizes `from_file` results. Install on a class (or on `BaseArgs` for all classes) via `FILE_CACHE`:
+    ```
+    @dataclass
+    class ExampleArgs(BaseArgs):
+        ...
+        FILE_CACHE = ArgsFileCache(maxsize=4096)
+    ```
+    If `frozen` is False, each hit returns a cheap copy the caller may freely mutate; if True, all callers
+    share a single read-only instance per file.
+    """
+
+    def __init__(self, maxsize=1024, frozen=False):
+        self._entries = LRU(maxsize)
+        self.maxsize = maxsize
+        self.frozen = frozen
+
+        self._lock = threading.Lock() # Guards the statistics.
+        self._hits = self._misses = self._evictions = self._invalidations = 0
+
+    @staticmethod
+    def _key(args_cls, filepath, filetype): return (args_cls, str(Path(filepath).resolve()), filetype)
+
+    def _out(self, args): return args if self.frozen else cheap_copy(args)
+
+    @staticmethod
+    def _signature(path):
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def get(self, args_cls, filepath, filetype, loader, deps=None):
+        """
+        Returns the cached parse of `filepath` for `args_cls` if it is still valid, else calls `loader()` and
+        caches its result. `loader` may append the paths of other files its result depends on (e.g., a delta's
+        base) to the list `deps`; the entry is then only valid while those are unchanged too.
+        """
+        key = self._key(args_cls, filepath, filetype)
+        signature = self._signature(filepath)
+
+        entry = self._entries.get(key, touch=False)
+        if entry is not None and entry[0] == signature and self._deps_unchanged(entry[2]):
+            # Only touched once validated; another thread may have evicted or replaced it in the meantime.
+            self._entries.touch(key, entry)
+            with self._lock: self._hits += 1
+            return self._out(entry[1])
+        with self._lock: self._misses += 1
+
+        args = loader()
+        if not isinstance(args, args_cls): return args # Non-dict contents; nothing sensible to share.
+        if self.frozen: args = freeze(args)
+        dep_signatures = tuple((path, self._signature(path)) for path in (deps or ()))
+
+        evicted = self._entries.put(key, (signature, args, dep_signatures))
+        with self._lock: self._evictions += evicted
+
+        return self._out(args)
+
+    def _deps_unchanged(self, dep_signatures):
+        try: return all(self._signature(path) == signature for path, signature in dep_signatures)
+        except FileNotFoundError: return False
+
+    def invalidate(self, filepath=None):
+        """
+        Drops all entries for `filepath` (for any class / filetype), or every entry if `filepath` is None.
+        """
+        if filepath is None: removed = self._entries.clear()
+        else:
+            path = str(Path(filepath).resolve())
+            removed = self._entries.remove_if(lambda key: key[1] == path)
+        with self._lock: self._invalidations += removed
+
+    def stats(self):
+        with self._lock:
+            return CacheStats(
+                hits=self._hits, misses=self._misses, evictions=self._evictions,
+                invalidations=self._invalidations, currsize=len(self._entries), maxsize=self.maxsize,
+            )
+
+    def __len__(self): return len(self._entries)
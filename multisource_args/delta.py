@@ -0,0 +1,137 @@
+"""
+Delta storage of args against a shared base args file.
+
+In a sweep nearly every field of each run's args matches a common base configuration, so `to_file(...,
+base=base_path)` can write just the fields that differ from the args at `base_path`, plus a reference to it:
+```
+{"__base__": {"path": "../base_args.json", "fingerprint": "<sha256 of the base>"}, "int_arg": 3, ...}
+```
+The reference is relative to the delta file's directory (so a sweep can be moved as a whole), and the base may
+itself be a delta against another base. Loading (`from_file`, `from_bytes` with a `filepath`, `load_many`,
+...) resolves the layers transparently.
+
+Bases are held in a small in-memory `BaseCache` (`BaseArgs.BASE_CACHE`, or one shared by all classes if that
+is None), validated by the fingerprint each delta records rather than by stat'ing the base, so loading many
+sibling runs reads (and checks) the shared base once. If a base file changes after deltas were written against
+it, loading those deltas fails loudly rather than silently resolving to different args. (Rewrites via
+`to_file` are noticed immediately; a base cached by this process and rewritten by another is only re-read
+once evicted or after `base_cache(args_cls).clear()`.)
+"""
+
+import copy, os, threading
+from pathlib import Path
+
+from . import nested
+from .cache import IMMUTABLE_TYPES, LRU
+
+DELTA_KEY = '__base__'
+
+def is_delta(contents): return isinstance(contents, dict) and DELTA_KEY in contents
+
+class BaseCache:
+    """
+    An LRU cache of base args contents and fingerprints, keyed on `(class, resolved path)`.
+    """
+
+    def __init__(self, maxsize=64):
+        self._entries = LRU(maxsize)
+        self.maxsize = maxsize
+        self._lock = threading.Lock() # Guards `loads` and `_load_locks`.
+        # Per key, held while (re)loading that base, so that concurrent siblings wait for one read rather than
+        # racing while loads of different bases proceed in parallel. Reentrant, as a delta base loads its own.
+        self._load_locks = {}
+        self.loads = 0
+
+    def get(self, args_cls, path, fingerprint=None):
+        """
+        Returns `(contents, fingerprint)` of the base args at `path`. If `fingerprint` is given, a cached
+        entry with that fingerprint is returned without touching the filesystem; otherwise the base is
+        (re)loaded unless it is cached and unchanged on disk.
+        """
+        path = Path(os.path.abspath(path)) # Unlike `resolve()`, free of filesystem calls.
+        key = (args_cls, path)
+
+        entry = self._valid_entry(key, path, fingerprint)
+        if entry is not None: return entry[1], entry[2]
+
+        with self._lock: load_lock = self._load_locks.setdefault(key, threading.RLock())
+        with load_lock:
+            entry = self._valid_entry(key, path, fingerprint)
+            if entry is not None: return entry[1], entry[2]
+            return self._load(args_cls, key, path)
+
+    def _valid_entry(self, key, path, fingerprint):
+        entry = self._entries.get(key)
+        if entry is None: return None
+        if fingerprint is not None: return entry if entry[2] == fingerprint else None
+        st = os.stat(path)
+        return entry if entry[0] == (st.st_mtime_ns, st.st_size) else None
+
+    def _load(self, args_cls, key, path):
+        st = os.stat(path)
+        base = args_cls.from_file(path)
+        entry = ((st.st_mtime_ns, st.st_size), base.to_dict(), base.fingerprint(include_output_dir=True))
+
+        with self._lock: self.loads += 1
+        self._entries.put(key, entry)
+        return entry[1], entry[2]
+
+    def invalidate(self, path):
+        path = Path(os.path.abspath(path))
+        self._entries.remove_if(lambda key: key[1] == path)
+        with self._lock:
+            for key in [key for key in self._load_locks if key[1] == path]: del self._load_locks[key]
+
+    def clear(self):
+        self._entries.clear()
+        with self._lock: self._load_locks.clear()
+
+    def __len__(self): return len(self._entries)
+
+_SHARED_CACHE = BaseCache()
+
+def base_cache(args_cls):
+    """
+    Returns the `BaseCache` of `args_cls`: its `BASE_CACHE`, or the shared one if that is None.
+    """
+    return _SHARED_CACHE if args_cls.BASE_CACHE is None else args_cls.BASE_CACHE
+
+def make_delta(args, base_path, filepath, filetype, batch):
+    """
+    Returns the delta contents of `args` against the base args at `base_path`, to be written to `filepath` as
+    `filetype`. Like a full write (see `nested.to_contents`), separate file sections and sidecar arrays which
+    differ from the base are written to their own files within `batch`, and unloaded sections are referenced.
+    """
+    base_contents, fingerprint = base_cache(type(args)).get(type(args), base_path)
+    contents = nested.to_contents(args, Path(filepath), filetype, batch, base=base_contents)
+    base_ref = os.path.relpath(os.path.abspath(base_path), os.path.dirname(os.path.abspath(filepath)))
+    contents[DELTA_KEY] = {'path': Path(base_ref).as_posix(), 'fingerprint': fingerprint}
+    return contents
+
+def base_path(contents, filepath=None):
+    """
+    Returns the path of the base of delta `contents`, read from `filepath` (needed iff the base path is
+    relative).
+    """
+    path = Path(contents[DELTA_KEY]['path'])
+    if path.is_absolute(): return path
+    assert filepath is not None, f"Can't resolve relative delta base {path} without the delta's path!"
+    return Path(filepath).parent / path
+
+def resolve(args_cls, contents, filepath=None):
+    """
+    Returns the full contents of delta `contents`, read from `filepath` (needed iff its base path is
+    relative).
+    """
+    base = base_path(contents, filepath)
+    contents = dict(contents)
+    ref = contents.pop(DELTA_KEY)
+
+    base_contents, fingerprint = base_cache(args_cls).get(args_cls, base, ref['fingerprint'])
+    assert fingerprint == ref['fingerprint'], \
+        f"Delta base {base} has changed since {filepath or 'the delta'} was written against it!"
+
+    # Cached base values are shared across every sibling; only hand out copies of mutable ones.
+    out = {k: v if isinstance(v, IMMUTABLE_TYPES) else copy.deepcopy(v) for k, v in base_contents.items()}
+    out.update(contents)
+    return out
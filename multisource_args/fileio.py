@@ -0,0 +1,162 @@
+"""
+Atomic, durable file writes. Every write goes to a temporary file in the target's directory which is then
+renamed over the target, so readers (and preempted jobs) only ever see either the old or the new contents,
+never a truncated file. How hard we try to survive a crash / power loss is set by the fsync policy:
+  * `NO_FSYNC`: never fsync. Atomic w.r.t. other processes, but not necessarily durable.
+  * `FSYNC_FILE`: fsync each file's data before renaming it into place (the default).
+  * `FSYNC_ALL`: additionally fsync the containing directory after the rename, making the rename durable.
+
+A `WriteBatch` amortizes these costs over many writes: directory handles are opened once per flush and
+shared by all of its files (then closed, so open descriptors stay bounded by `batch_size`), and fsyncs are
+deferred until the batch flushes (so the kernel can write all files back concurrently), after
+which all renames and a single fsync per directory are performed.
+"""
+
+import os
+from pathlib import Path
+
+NO_FSYNC, FSYNC_FILE, FSYNC_ALL = 'none', 'file', 'all'
+FSYNC_POLICIES = (NO_FSYNC, FSYNC_FILE, FSYNC_ALL)
+
+# `os.replace` never shows up in `os.supports_dir_fd` (even where it works), but `os.rename` does, and is what
+# renames through directory fds; all platforms with dir fds are POSIX, where it replaces the target too.
+USE_DIR_FD = hasattr(os, 'O_DIRECTORY') and {os.open, os.rename, os.unlink} <= os.supports_dir_fd
+
+class DirHandle:
+    """
+    An open handle on a directory, through which temporary files are created and renamed. Uses a directory
+    file descriptor where the platform supports it (saving repeated path resolution), else plain paths.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY) if USE_DIR_FD else None
+
+    def _path(self, name): return name if self.fd is not None else str(self.directory / name)
+
+    def open_temp(self, name):
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+        while True:
+            tmp_name = f".{name}.{os.getpid()}.{os.urandom(4).hex()}.tmp"
+            try: return os.open(self._path(tmp_name), flags, 0o666, dir_fd=self.fd), tmp_name
+            except FileExistsError: continue
+
+    def replace(self, tmp_name, name):
+        if self.fd is None: os.replace(self._path(tmp_name), self._path(name))
+        else: os.rename(tmp_name, name, src_dir_fd=self.fd, dst_dir_fd=self.fd)
+
+    def unlink(self, tmp_name):
+        try: os.unlink(self._path(tmp_name), dir_fd=self.fd)
+        except FileNotFoundError: pass
+
+    def fsync(self):
+        if self.fd is not None:
+            os.fsync(self.fd)
+            return
+        try:
+            fd = os.open(self.directory, os.O_RDONLY)
+        except OSError: return # E.g., Windows, where directories can't be opened (or fsync'ed).
+        try: os.fsync(fd)
+        finally: os.close(fd)
+
+    def close(self):
+        if self.fd is not None: os.close(self.fd)
+        self.fd = None
+
+class WriteBatch:
+    """
+    Collects atomic writes, flushing (fsync, rename, directory fsync, per the policy) every `batch_size` files
+    and on exit. If the body raises, writes not yet flushed are discarded and their temporary files removed.
+    ```
+    with WriteBatch(fsync=FSYNC_ALL) as batch:
+        for path, obj in ...: batch.add(path, lambda f: json.dump(obj, f), binary=False)
+    ```
+    """
+
+    def __init__(self, fsync=FSYNC_FILE, batch_size=256):
+        assert fsync in FSYNC_POLICIES, f"Invalid fsync policy {fsync}! Must be in {FSYNC_POLICIES}"
+        assert batch_size > 0, f"`batch_size` must be positive! Got {batch_size}"
+
+        self.fsync = fsync
+        self.batch_size = batch_size
+        self._dirs = {}
+        self._pending = [] # (dir_handle, fd, tmp_name, name, on_commit)
+
+    def _dir(self, directory):
+        handle = self._dirs.get(directory)
+        if handle is None:
+            handle = DirHandle(directory)
+            self._dirs[directory] = handle
+        return handle
+
+    def add(self, filepath, write_fn, binary, on_commit=None):
+        """
+        Writes `filepath` (via `write_fn(f)` on a file object opened in binary mode iff `binary`) to a
+        temporary file now; it is renamed into place when the batch next flushes, after which `on_commit()` is
+        called (if given).
+        """
+        filepath = Path(filepath)
+        handle = self._dir(filepath.parent)
+        fd, tmp_name = handle.open_temp(filepath.name)
+        try:
+            with os.fdopen(fd, 'wb' if binary else 'w', closefd=False) as f: write_fn(f)
+        except BaseException:
+            os.close(fd)
+            handle.unlink(tmp_name)
+            raise
+
+        self._pending.append((handle, fd, tmp_name, filepath.name, on_commit))
+        if len(self._pending) >= self.batch_size: self.flush()
+
+    def flush(self):
+        pending, self._pending = self._pending, []
+        renamed = 0
+        try:
+            try:
+                if self.fsync != NO_FSYNC:
+                    for _, fd, *_ in pending: os.fsync(fd)
+            finally:
+                for _, fd, *_ in pending: os.close(fd)
+
+            for handle, _, tmp_name, name, _ in pending:
+                handle.replace(tmp_name, name)
+                renamed += 1
+        except BaseException:
+            for handle, _, tmp_name, *_ in pending[renamed:]: handle.unlink(tmp_name)
+            raise
+
+        if self.fsync == FSYNC_ALL:
+            for handle in {id(h): h for h, *_ in pending}.values(): handle.fsync()
+        # Nothing is pending any more, so no handle is in use.
+        self.close()
+
+        for *_, on_commit in pending:
+            if on_commit is not None: on_commit()
+
+    @staticmethod
+    def _discard(pending):
+        for handle, fd, tmp_name, *_ in pending:
+            try: os.close(fd)
+            except OSError: pass
+            handle.unlink(tmp_name)
+
+    def close(self):
+        for handle in self._dirs.values(): handle.close()
+        self._dirs = {}
+
+    def __enter__(self): return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None: self.flush()
+            else:
+                self._discard(self._pending)
+                self._pending = []
+        finally:
+            self.close()
+
+def atomic_write(filepath, write_fn, binary, fsync=FSYNC_FILE):
+    """
+    Atomically (and, per `fsync`, durably) replaces `filepath` with the contents written by `write_fn(f)`.
+    """
+    with WriteBatch(fsync=fsync, batch_size=1) as batch: batch.add(filepath, write_fn, binary)
@@ -0,0 +1,83 @@
+"""
+Canonical, format-independent content hashes of args.
+
+JSON, YAML and pickle round-trip values differently (tuples become lists, integer dict keys become strings,
+`4.0` may come back as `4`, paths become strings, ...), so fingerprints are computed over a canonical form of
+`to_dict()` which erases exactly those differences, serialized as compact JSON with sorted keys.
+"""
+
+import hashlib, json, math, os, weakref
+from pathlib import Path
+
+def canonicalize(obj):
+    """
+    Returns the canonical (JSON serializable) form of a `to_dict()` value.
+    """
+    if obj is None or isinstance(obj, (bool, str)): return obj
+    if isinstance(obj, int): return int(obj)
+    if isinstance(obj, float):
+        if math.isnan(obj): return 'NaN'
+        if math.isinf(obj): return 'Infinity' if obj > 0 else '-Infinity'
+        if obj.is_integer(): return int(obj) # Also folds -0.0 into 0.
+        return obj
+    if isinstance(obj, os.PathLike): return os.fspath(obj)
+    if isinstance(obj, dict): return {str(k): canonicalize(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)): return [canonicalize(v) for v in obj]
+    if isinstance(obj, (set, frozenset)): return sorted((canonicalize(v) for v in obj), key=_sort_key)
+    raise TypeError(f"Can't fingerprint {obj!r} of type {type(obj)}!")
+
+def _sort_key(v): return json.dumps(v, sort_keys=True)
+
+def fingerprint_dict(d):
+    canonical = json.dumps(canonicalize(d), sort_keys=True, separators=(',', ':'), allow_nan=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+# id(args) -> (weakref to args, identity snapshot of its field values, {include_output_dir: fingerprint}).
+# Kept outside the instances so that memoization never shows up in `vars(args)`.
+_MEMO = {}
+
+def memoized_fingerprint(args, names, include_output_dir, compute):
+    """
+    Returns `compute()`, memoized per instance until any of the fields `names` is reassigned. Mutating a field
+    value in place (e.g., appending to a list field) isn't detected; call `forget(args)` after doing so.
+    """
+    key = id(args)
+    snapshot = tuple(args.__dict__.get(n) for n in names)
+
+    entry = _MEMO.get(key)
+    if entry is None or entry[0]() is not args or any(a is not b for a, b in zip(entry[1], snapshot)):
+        entry = (weakref.ref(args, lambda _, key=key: _MEMO.pop(key, None)), snapshot, {})
+        _MEMO[key] = entry
+
+    if include_output_dir not in entry[2]: entry[2][include_output_dir] = compute()
+    return entry[2][include_output_dir]
+
+def forget(args): _MEMO.pop(id(args), None)
+
+def find_duplicate(args, root):
+    """
+    Returns an existing args instance (of `type(args)`) whose fingerprint matches `args`, found either in the
+    class's `INDEX` (if set) or by loading the args files of the run directories directly under `root`, else
+    None.
+    """
+    args_cls, target = type(args), args.fingerprint()
+    root = Path(root)
+
+    if args_cls.INDEX is not None:
+        for path in args_cls.INDEX.find_fingerprint(target, args_cls=args_cls):
+            if path.is_file(): return args_cls.from_file(path)
+        return None
+
+    if not root.is_dir(): return None
+
+    run_dirs = [d for d in root.iterdir() if d.is_dir()]
+    found = None
+    results = args_cls.load_many(run_dirs, recursive=False)
+    try:
+        for result in results:
+            if result.ok and isinstance(result.args, args_cls) and result.args.fingerprint() == target:
+                found = result.args
+                break
+    finally:
+        results.close()
+    return found
@@ -0,0 +1,249 @@
+"""
+A persistent, queryable on-disk index of many runs' args, backed by a local SQLite file.
+
+Each indexed args file is stored as one row in `runs` (keyed by its resolved path, with the mtime/size it
+was indexed at) plus one row per flattened `to_dict()` entry in `fields`. Field values use SQLite's dynamic
+typing, so numeric predicates compare numerically and string predicates lexically, and `(key, val)` is
+indexed so predicate lookups stay fast at hundreds of thousands of runs.
+"""
+
+import json, os, sqlite3, threading
+from pathlib import Path
+
+from . import bulk
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id       INTEGER PRIMARY KEY,
+    path     TEXT UNIQUE NOT NULL,
+    cls      TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size     INTEGER NOT NULL,
+    fingerprint TEXT
+);
+CREATE TABLE IF NOT EXISTS fields (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    key    TEXT NOT NULL,
+    val
+);
+CREATE INDEX IF NOT EXISTS fields_key_val ON fields (key, val);
+CREATE INDEX IF NOT EXISTS fields_run_id ON fields (run_id);
+CREATE INDEX IF NOT EXISTS runs_fingerprint ON runs (fingerprint);
+"""
+
+OPERATORS = {
+    'eq': '=', 'ne': '!=', 'lt': '<', 'le': '<=', 'gt': '>', 'ge': '>=', 'like': 'LIKE', 'in': 'IN',
+    'isnull': 'IS NULL',
+}
+SYMBOLS = {'==': 'eq', '=': 'eq', '!=': 'ne', '<': 'lt', '<=': 'le', '>': 'gt', '>=': 'ge'}
+
+def class_key(args_cls): return f"{args_cls.__module__}.{args_cls.__qualname__}"
+
+def to_sql_value(value):
+    """
+    Maps a `to_dict()` leaf onto an SQLite-storable scalar. Non-scalar leaves are stored as canonical JSON.
+    """
+    if value is None or isinstance(value, (int, float, str)): return value  # bools are ints already.
+    if isinstance(value, os.PathLike): return os.fspath(value)
+    return json.dumps(value, sort_keys=True, default=str)
+
+def flatten(d, prefix=''):
+    """
+    Yields `(dotted_key, leaf)` pairs from a (possibly nested) dictionary.
+    """
+    for k, v in d.items():
+        key = f"{prefix}{k}"
+        if isinstance(v, dict): yield from flatten(v, f"{key}.")
+        else: yield key, v
+
+class ArgsIndex:
+    """
+    A SQLite-backed index of args files. Usable as a context manager; safe to share across threads.
+
+    Example:
+    ```
+    with ArgsIndex('runs.sqlite') as index:
+        index.refresh(ExampleArgs, '/path/to/all/runs')
+        for path in index.query(num_layers=2, float_arg__lt=0.5): ...
+    ```
+    """
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+
+        # Indices created before fingerprints were tracked lack the column.
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(runs)")]
+        if columns and 'fingerprint' not in columns:
+            self._conn.execute("ALTER TABLE runs ADD COLUMN fingerprint TEXT")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock: self._conn.close()
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+    def __len__(self):
+        with self._lock: return self._conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    @staticmethod
+    def _key(filepath): return str(Path(filepath).resolve())
+
+    def is_current(self, filepath, stat=None):
+        """
+        Returns True iff `filepath` is indexed at its current mtime and size.
+        """
+        if stat is None: stat = os.stat(filepath)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT mtime_ns, size FROM runs WHERE path = ?", (self._key(filepath),)
+            ).fetchone()
+        return row is not None and tuple(row) == (stat.st_mtime_ns, stat.st_size)
+
+    def _record(self, filepath, args, stat):
+        key = self._key(filepath)
+        try: fingerprint = args.fingerprint()
+        except TypeError: fingerprint = None # Args with values that can't be canonicalized.
+
+        row = self._conn.execute("SELECT id FROM runs WHERE path = ?", (key,)).fetchone()
+        if row is None:
+            run_id = self._conn.execute(
+                "INSERT INTO runs (path, cls, mtime_ns, size, fingerprint) VALUES (?, ?, ?, ?, ?)",
+                (key, class_key(type(args)), stat.st_mtime_ns, stat.st_size, fingerprint)
+            ).lastrowid
+        else:
+            run_id = row[0]
+            self._conn.execute(
+                "UPDATE runs SET cls = ?, mtime_ns = ?, size = ?, fingerprint = ? WHERE id = ?",
+                (class_key(type(args)), stat.st_mtime_ns, stat.st_size, fingerprint, run_id)
+            )
+            self._conn.execute("DELETE FROM fields WHERE run_id = ?", (run_id,))
+
+        self._conn.executemany(
+            "INSERT INTO fields (run_id, key, val) VALUES (?, ?, ?)",
+            ((run_id, k, to_sql_value(v)) for k, v in flatten(args.to_dict()))
+        )
+
+    def record(self, filepath, args):
+        """
+        Indexes `args` as the contents of the (already written) args file at `filepath`.
+        """
+        stat = os.stat(filepath)
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._record(filepath, args, stat)
+
+    def remove(self, filepath):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM runs WHERE path = ?", (self._key(filepath),))
+
+    def refresh(self, args_cls, root_or_paths, workers=8, prune=True):
+        """
+        Incrementally brings the index up to date with the args files for `args_cls` in `root_or_paths`:
+        files whose mtime and size are unchanged are skipped, changed or new files are (re)loaded in parallel
+        via `bulk.load_many`, and, if `prune`, indexed runs of this class whose files have vanished are
+        dropped. Returns the list of `bulk.LoadResult`s for files that failed to load.
+        """
+        with self._lock:
+            known = {
+                path: (mtime_ns, size) for path, mtime_ns, size in self._conn.execute(
+                    "SELECT path, mtime_ns, size FROM runs WHERE cls = ?", (class_key(args_cls),)
+                )
+            }
+
+        seen, stale = set(), []
+        paths = bulk.find_args_files(root_or_paths, args_cls.FILENAME, args_cls.LOADERS_AND_DUMPERS.keys())
+        for path in paths:
+            key = self._key(path)
+            seen.add(key)
+            try: stat = os.stat(path)
+            except OSError: continue
+            if known.get(key) != (stat.st_mtime_ns, stat.st_size): stale.append(path)
+
+        errors = []
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            for result in bulk.load_many(args_cls, stale, workers=workers):
+                if not result.ok:
+                    errors.append(result)
+                    continue
+                self._record(result.path, result.args, os.stat(result.path))
+
+            if prune:
+                gone = [(path,) for path in known if path not in seen and not os.path.exists(path)]
+                self._conn.executemany("DELETE FROM runs WHERE path = ?", gone)
+
+        return errors
+
+    @staticmethod
+    def _parse_conditions(conditions, predicates):
+        for cond in conditions:
+            key, op, value = cond
+            yield key, SYMBOLS.get(op, op), value
+
+        for name, value in predicates.items():
+            key, _, op = name.partition('__')
+            yield key, (op or 'eq'), value
+
+    def _build_query(self, args_cls, conditions, predicates):
+        clauses, params = [], []
+        if args_cls is not None:
+            clauses.append("SELECT id FROM runs WHERE cls = ?")
+            params.append(class_key(args_cls))
+
+        for key, op, value in self._parse_conditions(conditions, predicates):
+            assert op in OPERATORS, f"Invalid operator {op}! Must be in {list(OPERATORS)} or {list(SYMBOLS)}."
+
+            if op == 'isnull' or value is None:
+                assert op in ('isnull', 'eq', 'ne'), f"Can only compare to None with eq/ne! Got {op}"
+                is_null = bool(value) if op == 'isnull' else (op == 'eq')
+                null_check = 'IS NULL' if is_null else 'IS NOT NULL'
+                clauses.append(f"SELECT run_id FROM fields WHERE key = ? AND val {null_check}")
+                params.append(key)
+            elif op == 'in':
+                values = [to_sql_value(v) for v in value]
+                clauses.append(
+                    f"SELECT run_id FROM fields WHERE key = ? AND val IN ({', '.join('?' * len(values))})"
+                )
+                params.extend([key, *values])
+            else:
+                clauses.append(f"SELECT run_id FROM fields WHERE key = ? AND val {OPERATORS[op]} ?")
+                params.extend([key, to_sql_value(value)])
+
+        if not clauses: return "SELECT path FROM runs ORDER BY path", params
+        return f"SELECT path FROM runs WHERE id IN ({' INTERSECT '.join(clauses)}) ORDER BY path", params
+
+    def query(self, *conditions, args_cls=None, **predicates):
+        """
+        Returns the paths of all indexed args files matching every condition. Conditions are given either as
+        `(dotted_key, op, value)` tuples (op being one of `==, !=, <, <=, >, >=` or an `OPERATORS` name) or as
+        keyword predicates of the form `field=value` or `field__op=value` (e.g., `float_arg__lt=0.5`). If
+        `args_cls` is given, results are restricted to files indexed for that class.
+        """
+        sql, params = self._build_query(args_cls, conditions, predicates)
+        with self._lock: rows = self._conn.execute(sql, params).fetchall()
+        return [Path(p) for p, in rows]
+
+    def find_fingerprint(self, fingerprint, args_cls=None):
+        """
+        Returns the paths of all indexed args files whose `BaseArgs.fingerprint()` is `fingerprint`.
+        """
+        sql, params = "SELECT path FROM runs WHERE fingerprint = ?", [fingerprint]
+        if args_cls is not None:
+            sql += " AND cls = ?"
+            params.append(class_key(args_cls))
+        with self._lock: rows = self._conn.execute(sql + " ORDER BY path", params).fetchall()
+        return [Path(p) for p, in rows]
+
+    def query_args(self, args_cls, *conditions, **predicates):
+        """
+        Like `query` (restricted to `args_cls`), but lazily yields `(path, args)` pairs, loading each matching
+        args file via `args_cls.from_file` only as it is consumed.
+        """
+        for path in self.query(*conditions, args_cls=args_cls, **predicates):
+            yield path, args_cls.from_file(path)
@@ -0,0 +1,190 @@
+"""
+Opt-in instrumentation of the `BaseArgs` hot paths.
+
+When enabled, each phase of argument resolution and file I/O emits an `Event` (phase name, duration, byte
+count where meaningful, and a few attributes such as the args class and path) to every registered sink:
+  * `spec_build`: compiling a class's argparse spec (cache misses of `compiled_spec`).
+  * `parse`: `parser.parse_args` as a whole, and `convert` for each field's type conversion within it.
+  * `load` / `dump`: reading or writing an args file (with its size in bytes).
+  * `makedirs`: creating a run directory in `from_commandline`.
+  * `from_argv`: the whole of `from_argv` / `from_commandline`.
+
+Instrumentation is enabled either for a block, via the `instrumented` context manager (also available as
+`BaseArgs.instrumented`):
+```
+with BaseArgs.instrumented() as sink:
+    args = ExampleArgs.from_commandline()
+print(sink.summary())
+```
+or for the whole process via the `MULTISOURCE_ARGS_TRACE` environment variable, which may be `log` (log events
+to the `multisource_args.instrument` logger at DEBUG level) or a path (append events to it as JSON lines).
+
+When disabled, each instrumented site costs a check of the global `ACTIVE` flag (sites whose attributes take
+work to build, such as file paths, check it before building them), and each commandline field's conversion
+an extra call through the `timed_type_fn` wrapper.
+"""
+
+import json, logging, os, threading, time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Optional
+
+ENV_VAR = 'MULTISOURCE_ARGS_TRACE'
+
+logger = logging.getLogger(__name__)
+
+# Read directly by the instrumented call sites; True iff any sink is registered.
+ACTIVE = False
+
+_SINKS = []
+_SINKS_LOCK = threading.Lock()
+
+@dataclass
+class Event:
+    phase:      str
+    start:      float
+    duration_s: float
+    bytes:      Optional[int] = None
+    attrs:      Dict[str, Any] = field(default_factory=dict)
+
+class LoggingSink:
+    def __init__(self, logger=logger, level=logging.DEBUG): self.logger, self.level = logger, level
+
+    def emit(self, event):
+        extra = f" {event.bytes}B" if event.bytes is not None else ''
+        self.logger.log(self.level, f"{event.phase}: {1e3 * event.duration_s:.3f}ms{extra} {event.attrs}")
+
+    def close(self): pass
+
+class MemorySink:
+    """
+    Collects events in memory, for inspection or summarizing.
+    """
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+
+    def emit(self, event):
+        with self._lock: self.events.append(event)
+
+    def close(self): pass
+
+    def summary(self):
+        """
+        Returns `{phase: {'count', 'total_s', 'mean_s', 'max_s', 'bytes'}}` over all collected events.
+        """
+        out = {}
+        with self._lock: events = list(self.events)
+        for event in events:
+            s = out.setdefault(event.phase, {'count': 0, 'total_s': 0.0, 'max_s': 0.0, 'bytes': 0})
+            s['count'] += 1
+            s['total_s'] += event.duration_s
+            s['max_s'] = max(s['max_s'], event.duration_s)
+            s['bytes'] += event.bytes or 0
+        for s in out.values(): s['mean_s'] = s['total_s'] / s['count']
+        return out
+
+class JsonlSink:
+    """
+    Appends each event as a line of JSON to `filepath`.
+    """
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self._f = open(filepath, mode='a')
+        self._lock = threading.Lock()
+
+    def emit(self, event):
+        line = json.dumps(asdict(event), default=str)
+        with self._lock:
+            self._f.write(line + '\n')
+            self._f.flush()
+
+    def close(self):
+        with self._lock: self._f.close()
+
+class Span:
+    __slots__ = ('phase', 'attrs', 'bytes', '_start', '_wall')
+
+    def __init__(self, phase, attrs):
+        self.phase, self.attrs, self.bytes = phase, attrs, None
+
+    def __enter__(self):
+        self._wall = time.time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter() - self._start
+        if exc[0] is not None: self.attrs['error'] = exc[0].__name__
+        _emit(Event(self.phase, self._wall, duration, self.bytes, self.attrs))
+
+    def __bool__(self): return True
+
+class _NullSpan:
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc): pass
+    def __bool__(self): return False
+
+NULL_SPAN = _NullSpan()
+
+def span(phase, **attrs):
+    """
+    Returns a context manager timing `phase`. It is falsy (and does nothing) when instrumentation is disabled,
+    so call sites can skip computing extra details (e.g., `if sp: sp.bytes = ...`). Attributes that are costly
+    to compute should be guarded by `ACTIVE` instead, as they are evaluated before this is called.
+    """
+    return Span(phase, attrs) if ACTIVE else NULL_SPAN
+
+def _emit(event):
+    for sink in list(_SINKS):
+        try: sink.emit(event)
+        except Exception: logger.exception(f"Instrumentation sink {sink} failed!")
+
+def add_sink(sink):
+    global ACTIVE
+    with _SINKS_LOCK:
+        _SINKS.append(sink)
+        ACTIVE = True
+    return sink
+
+def remove_sink(sink, close=True):
+    global ACTIVE
+    with _SINKS_LOCK:
+        if sink in _SINKS: _SINKS.remove(sink)
+        ACTIVE = bool(_SINKS)
+    if close: sink.close()
+
+def sinks(): return list(_SINKS)
+
+@contextmanager
+def instrumented(*sinks):
+    """
+    Enables instrumentation within the block, emitting to `sinks` (a fresh `MemorySink` if none are given).
+    Yields the first sink.
+    """
+    sinks = sinks or (MemorySink(),)
+    for sink in sinks: add_sink(sink)
+    try:
+        yield sinks[0]
+    finally:
+        for sink in sinks: remove_sink(sink)
+
+def timed_type_fn(name, type_fn):
+    """
+    Wraps an argparse `type=` callable so each conversion emits a `convert` event when enabled.
+    """
+    def convert(x):
+        if not ACTIVE: return type_fn(x)
+        with Span('convert', {'field': name}): return type_fn(x)
+
+    convert.__name__ = getattr(type_fn, '__name__', repr(type_fn)) # argparse uses this in error messages.
+    convert.__wrapped__ = type_fn
+    return convert
+
+def _configure_from_env():
+    value = os.environ.get(ENV_VAR, '').strip()
+    if not value: return
+    add_sink(LoggingSink() if value.lower() in ('1', 'log', 'true') else JsonlSink(value))
+
+_configure_from_env()
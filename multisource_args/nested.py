@@ -0,0 +1,156 @@
+"""
+Support for `BaseArgs` fields which are themselves `BaseArgs` (e.g., model / data / optimizer sections).
+
+Nested args round-trip through args files as nested dictionaries, and on the commandline each of their fields
+gets a dotted flag (`--model.num_layers 4`, `--model.do_dropout` / `--model.no_do_dropout`), defaulting to the
+value in the parent field's default.
+
+A nested section can also live in its own file, referenced from the parent's args file as
+`{"__file__": "<path relative to the parent file>"}`. Such sections are only read and parsed on first
+attribute access, so jobs which never touch (say) a huge data spec never pay for it. To have `to_file` write a
+section to its own file (`{parent stem}.{field}.{ext}`, next to the parent), mark the field:
+```
+@dataclass
+class ExampleArgs(BaseArgs):
+    output_dir: str
+    model:      ModelArgs = dataclasses.field(default_factory=ModelArgs)
+    data:       DataArgs = dataclasses.field(default_factory=DataArgs, metadata={'separate_file': True})
+```
+Sections which haven't been loaded yet are written back as references, without being loaded.
+"""
+
+import copy, dataclasses, os, threading, weakref
+from pathlib import Path
+
+from . import sidecar
+
+FILE_KEY = '__file__'
+LAZY_REFS = '_lazy_refs' # Where unloaded sections' `LazyRef`s are kept, in the instance's `__dict__`.
+
+@dataclasses.dataclass(frozen=True)
+class LazyRef:
+    args_cls: type
+    path:     Path # Absolute.
+
+    def load(self): return self.args_cls.from_file(self.path)
+
+_NESTED = weakref.WeakKeyDictionary()
+_NESTED_LOCK = threading.Lock()
+
+def nested_type(field):
+    from .args import BaseArgs
+    t = field.type
+    return t if isinstance(t, type) and issubclass(t, BaseArgs) else None
+
+def nested_fields(args_cls):
+    """
+    Returns `{name: (sub_cls, separate_file)}` for the nested args fields of `args_cls` (cached per class).
+    """
+    out = _NESTED.get(args_cls)
+    if out is None:
+        out = {}
+        for field in dataclasses.fields(args_cls):
+            sub_cls = nested_type(field)
+            if sub_cls is None: continue
+            out[field.name] = (sub_cls, bool(field.metadata.get('separate_file', False)))
+        with _NESTED_LOCK: _NESTED[args_cls] = out
+    return out
+
+def field_default(field):
+    if field.default is not dataclasses.MISSING: return field.default
+    if field.default_factory is not dataclasses.MISSING: return field.default_factory()
+    return None
+
+def unflatten(flat):
+    """
+    Turns the dotted keys of a parsed commandline (`{'model.lr': 0.1}`) into nested dictionaries.
+    """
+    out = {}
+    for key, value in flat.items():
+        *parents, name = key.split('.')
+        d = out
+        for p in parents: d = d.setdefault(p, {})
+        d[name] = value
+    return out
+
+def build_nested(args_cls, contents, filepath=None):
+    """
+    Converts the nested sections of `contents` in place: dictionaries become sub-args instances, and file
+    references (resolved relative to `filepath`) become `LazyRef`s. Returns the names of the latter.
+    """
+    lazy = []
+    for name, (sub_cls, _) in nested_fields(args_cls).items():
+        value = contents.get(name)
+        if not isinstance(value, dict): continue
+        if FILE_KEY in value:
+            path = Path(value[FILE_KEY])
+            if not path.is_absolute():
+                assert filepath is not None, \
+                    f"Can't resolve relative sub-config {path} without the file's path!"
+                path = Path(filepath).parent / path
+            contents[name] = LazyRef(sub_cls, Path(os.path.abspath(path)))
+            lazy.append(name)
+        else:
+            contents[name] = sub_cls._from_contents(value, filepath)
+    return lazy
+
+def defer(args, names):
+    # Moves the `LazyRef`s of fields `names` out of `args.__dict__`, so that `BaseArgs.__getattr__` sees them.
+    if not names: return
+    args.__dict__[LAZY_REFS] = {name: args.__dict__.pop(name) for name in names}
+
+def load_deferred(args, name):
+    """
+    Loads and returns the unloaded section `name` of `args`, or raises `AttributeError` if there is none.
+    """
+    refs = args.__dict__.get(LAZY_REFS)
+    if not refs or name not in refs:
+        raise AttributeError(f"{type(args).__name__!r} object has no attribute {name!r}")
+
+    value = refs[name].load()
+    # Rebuilt rather than mutated, as copies of `args` (e.g., frozen cache entries) may share the dictionary.
+    remaining = {k: v for k, v in refs.items() if k != name}
+    args.__dict__[name] = value
+    if remaining: args.__dict__[LAZY_REFS] = remaining
+    else: args.__dict__.pop(LAZY_REFS, None)
+    return value
+
+def is_loaded(args, name): return name not in args.__dict__.get(LAZY_REFS, {})
+
+def to_contents(args, filepath, filetype, batch, base=None):
+    """
+    Returns the contents `to_file` writes for `args` at `filepath`, writing sections marked `separate_file`
+    and array fields (see `sidecar`) to their own files (within `batch`) and referencing still unloaded
+    sections rather than loading them. If `base` (the plain contents of a delta's base; see `delta`) is given,
+    fields equal to their value in it are left out (unloaded sections are always kept, as references).
+    """
+    nested = nested_fields(type(args))
+    refs = args.__dict__.get(LAZY_REFS, {})
+    arrays = sidecar.sidecar_fields(args)
+
+    def in_base(name, plain): return base is not None and name in base and base[name] == plain
+
+    if not refs and not arrays and not any(separate for _, separate in nested.values()):
+        return {name: v for name, v in args.to_dict().items() if not in_base(name, v)}
+
+    contents = {}
+    for field in dataclasses.fields(args):
+        name = field.name
+        if name in refs:
+            contents[name] = {FILE_KEY: Path(os.path.relpath(refs[name].path, filepath.parent)).as_posix()}
+            continue
+
+        value = getattr(args, name)
+        if name in nested:
+            plain = value.to_dict()
+            if in_base(name, plain): continue
+            if nested[name][1]:
+                sub_path = filepath.with_name(f"{filepath.stem}.{name}.{filetype}")
+                value.to_file(sub_path, filetype, batch=batch)
+                contents[name] = {FILE_KEY: sub_path.name}
+            else: contents[name] = plain
+        elif name in arrays:
+            if base is not None and in_base(name, sidecar.to_plain({name: value})[name]): continue
+            contents[name] = sidecar.write(args, name, filepath, batch)
+        elif not in_base(name, value): contents[name] = copy.deepcopy(value)
+    return contents
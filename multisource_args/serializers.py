@@ -0,0 +1,188 @@
+"""
+The registry of file format backends behind `BaseArgs.LOADERS_AND_DUMPERS`.
+
+Each extension may have several registered codecs (e.g., `json`, `ujson` and `orjson` for `.json`). A codec's
+module is only imported the first time its extension is actually used, so (e.g.) a job which only ever reads
+JSON never pays for importing PyYAML. When an extension is first used, the highest priority codec whose
+requirements are installed is selected; this can be overridden with `REGISTRY.prefer`.
+
+The stdlib `json` codec always stays the default for `.json`, whatever else is installed: `ujson` and
+`orjson` don't round-trip everything it does (e.g., NaN / infinities become `null`, and orjson rejects ints
+wider than 64 bits) and lay files out differently. Opt in to one explicitly with `REGISTRY.prefer('json',
+'orjson')` where its limits are acceptable.
+
+Third parties can add codecs or whole new formats:
+```
+from multisource_args.serializers import REGISTRY
+
+def toml_factory():
+    import tomli, tomli_w
+    return (tomli.load, tomli_w.dump)
+
+REGISTRY.register('toml', 'tomli', toml_factory, uses_binary=True, requires=('tomli', 'tomli_w'))
+```
+"""
+
+import importlib.util, io, threading
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Callable, Tuple
+
+JSON, PKL, YAML, MSGPACK, ARGPACK = 'json', 'pkl', 'yaml', 'msgpack', 'argpack'
+
+@dataclass(frozen=True)
+class Codec:
+    """
+    A lazily importable format backend. `factory` performs any imports and returns `(loader, dumper)`, where
+    `loader(f)` reads from and `dumper(obj, f)` writes to a file object opened in binary mode iff
+    `uses_binary`. A factory may raise `ImportError` to signal that the codec is unusable, in which case the
+    next one is tried.
+    """
+    extension:   str
+    name:        str
+    factory:     Callable[[], Tuple[Callable, Callable]]
+    uses_binary: bool
+    priority:    int = 0
+    requires:    Tuple[str, ...] = ()
+
+    def is_installed(self): return all(importlib.util.find_spec(m) is not None for m in self.requires)
+
+class SerializerRegistry(Mapping):
+    """
+    A read-only `{extension: (loader, dumper, uses_binary)}` mapping (the format `LOADERS_AND_DUMPERS` has
+    always had) which resolves and imports each extension's codec on first lookup.
+    """
+
+    def __init__(self):
+        self._codecs = {}
+        self._preferred = {}
+        self._resolved = {}
+        self._installed = {}
+        self._lock = threading.RLock()
+
+    def register(self, extension, name, factory, uses_binary, priority=0, requires=()):
+        with self._lock:
+            codecs = [c for c in self._codecs.get(extension, []) if c.name != name]
+            codecs.append(Codec(extension, name, factory, uses_binary, priority, tuple(requires)))
+            self._codecs[extension] = sorted(codecs, key=lambda c: -c.priority)
+            self._resolved.pop(extension, None)
+
+    def prefer(self, extension, name=None):
+        """
+        Forces `extension` to use the codec called `name` (or restores automatic selection if `name` is None).
+        """
+        with self._lock:
+            if name is None: self._preferred.pop(extension, None)
+            else:
+                assert name in [c.name for c in self._codecs.get(extension, [])], \
+                    f"No codec {name} registered for {extension}!"
+                self._preferred[extension] = name
+            self._resolved.pop(extension, None)
+
+    def _is_installed(self, codec):
+        if codec not in self._installed: self._installed[codec] = codec.is_installed()
+        return self._installed[codec]
+
+    def codecs(self, extension, installed_only=True):
+        with self._lock:
+            codecs = self._codecs.get(extension, [])
+            return [c for c in codecs if self._is_installed(c)] if installed_only else list(codecs)
+
+    def _resolve(self, extension):
+        candidates = self.codecs(extension)
+        preferred = self._preferred.get(extension, None)
+        if preferred is not None: candidates = [c for c in candidates if c.name == preferred]
+
+        for codec in candidates:
+            try: loader, dumper = codec.factory()
+            except (ImportError, AttributeError): continue
+            return codec, (loader, dumper, codec.uses_binary)
+
+        registered = [c.name for c in self.codecs(extension, installed_only=False)]
+        raise KeyError(f"No usable codec for {extension}! Registered: {registered}")
+
+    def selected(self, extension):
+        """
+        Returns the `Codec` that is (or will be) used for `extension`.
+        """
+        self[extension]
+        return self._resolved[extension][0]
+
+    def __getitem__(self, extension):
+        resolved = self._resolved.get(extension, None)
+        if resolved is None:
+            with self._lock:
+                resolved = self._resolved.get(extension, None)
+                if resolved is None:
+                    resolved = self._resolve(extension)
+                    self._resolved[extension] = resolved
+        return resolved[1]
+
+    def __contains__(self, extension): return len(self.codecs(extension)) > 0
+    def __iter__(self): return (ext for ext in list(self._codecs) if ext in self)
+    def __len__(self): return sum(1 for _ in self)
+    def __repr__(self): return f"SerializerRegistry({list(self)})"
+
+def decode(loaders_and_dumpers, filetype, data):
+    """
+    Parses `data`, the raw bytes of a file of type `filetype`, with its loader from `loaders_and_dumpers` (a
+    mapping in the `LOADERS_AND_DUMPERS` format, e.g., `REGISTRY`).
+    """
+    loader, _, use_binary = loaders_and_dumpers[filetype]
+    with (io.BytesIO(data) if use_binary else io.StringIO(data.decode())) as f: return loader(f)
+
+def encode(loaders_and_dumpers, filetype, contents):
+    """
+    Returns the raw bytes of `contents` dumped as `filetype`; the inverse of `decode`.
+    """
+    _, dumper, use_binary = loaders_and_dumpers[filetype]
+    with (io.BytesIO() if use_binary else io.StringIO()) as f:
+        dumper(contents, f)
+        data = f.getvalue()
+    return data if use_binary else data.encode()
+
+def _json():
+    import json
+    return json.load, lambda obj, f: json.dump(obj, f, indent=4)
+
+def _ujson():
+    import ujson
+    return ujson.load, lambda obj, f: ujson.dump(obj, f, indent=4)
+
+def _orjson():
+    import orjson
+    options = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+    return (lambda f: orjson.loads(f.read())), (lambda obj, f: f.write(orjson.dumps(obj, option=options)))
+
+def _pickle():
+    import pickle
+    return pickle.load, pickle.dump
+
+def _pyyaml():
+    import yaml
+    return (lambda f: yaml.load(f, Loader=yaml.SafeLoader)), yaml.dump
+
+def _libyaml():
+    import yaml
+    loader_cls, dumper_cls = yaml.CSafeLoader, yaml.CDumper # AttributeError if not built against libyaml.
+    return (lambda f: yaml.load(f, Loader=loader_cls)), (lambda obj, f: yaml.dump(obj, f, Dumper=dumper_cls))
+
+def _msgpack():
+    import msgpack
+    return (lambda f: msgpack.unpack(f, raw=False)), (lambda obj, f: msgpack.pack(obj, f, use_bin_type=True))
+
+def _argpack():
+    from . import archive
+    return archive.load_single, archive.dump_single
+
+REGISTRY = SerializerRegistry()
+
+REGISTRY.register(JSON, 'json', _json, uses_binary=False)
+# Opt-in only (see the module docstring), hence below the stdlib codec.
+REGISTRY.register(JSON, 'ujson', _ujson, uses_binary=False, priority=-10, requires=('ujson',))
+REGISTRY.register(JSON, 'orjson', _orjson, uses_binary=True, priority=-20, requires=('orjson',))
+REGISTRY.register(PKL, 'pickle', _pickle, uses_binary=True)
+REGISTRY.register(YAML, 'pyyaml', _pyyaml, uses_binary=False, requires=('yaml',))
+REGISTRY.register(YAML, 'libyaml', _libyaml, uses_binary=False, priority=10, requires=('yaml',))
+REGISTRY.register(MSGPACK, 'msgpack', _msgpack, uses_binary=True, requires=('msgpack',))
+REGISTRY.register(ARGPACK, 'argpack', _argpack, uses_binary=True)
@@ -0,0 +1,124 @@
+"""
+Broadcasting args to worker processes through `multiprocessing.shared_memory`.
+
+Rather than every worker re-reading the args file or being sent a pickled copy, the parent publishes the args
+(one instance or a whole batch) once, as a compact block of encoded records, and hands workers only a tiny
+picklable `SharedArgsHandle`. Workers attach and rebuild instances straight out of shared memory:
+```
+with ArgsBroadcast(all_args) as broadcast:
+    with multiprocessing.Pool(64, initializer=init_worker, initargs=(broadcast.handle,)) as pool: ...
+
+def init_worker(handle):
+    global ARGS_VIEW
+    ARGS_VIEW = attach(handle) # ARGS_VIEW[i] rebuilds the i-th args instance.
+```
+Records are encoded exactly as `to_file` would write them (via `to_bytes` / `from_bytes`), by default in each
+class's `DEFAULT_EXTENSION`. The publisher owns the segment and unlinks it when its block exits; views only
+close their own mapping.
+
+Layout: an 8 byte magic and a uint64 record count, then `(offset, length, class index)` per record, then the
+records' bytes.
+"""
+
+import dataclasses, struct, sys
+from multiprocessing import shared_memory
+from typing import Tuple
+
+MAGIC = b'MSARGS01'
+_HEADER = struct.Struct('<8sQ')
+_ENTRY = struct.Struct('<QQH')
+
+@dataclasses.dataclass(frozen=True)
+class SharedArgsHandle:
+    name:      str
+    size:      int
+    classes:   Tuple[type, ...] # Pickled by reference, so must be importable by the workers.
+    filetypes: Tuple[str, ...]  # Per class.
+
+class ArgsBroadcast:
+    """
+    Publishes `args` (an args instance or an iterable of them, possibly of several classes) into a new shared
+    memory segment, for the lifetime of the `with` block (or until `close()`). See the module docstring.
+    """
+
+    def __init__(self, args, filetype=None):
+        batch = [args] if dataclasses.is_dataclass(args) else list(args)
+
+        classes, class_idx = [], {}
+        for a in batch:
+            if type(a) not in class_idx:
+                class_idx[type(a)] = len(classes)
+                classes.append(type(a))
+        assert len(classes) < 2**16, f"Too many distinct args classes ({len(classes)})!"
+        filetypes = tuple(c.DEFAULT_EXTENSION if filetype is None else filetype for c in classes)
+
+        records = [a.to_bytes(filetypes[class_idx[type(a)]]) for a in batch]
+        offset = _HEADER.size + _ENTRY.size * len(records)
+        size = offset + sum(map(len, records))
+
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        try:
+            buf = self._shm.buf
+            _HEADER.pack_into(buf, 0, MAGIC, len(records))
+            for i, (a, record) in enumerate(zip(batch, records)):
+                _ENTRY.pack_into(buf, _HEADER.size + i * _ENTRY.size, offset, len(record), class_idx[type(a)])
+                buf[offset:offset + len(record)] = record
+                offset += len(record)
+        except BaseException:
+            self.close()
+            raise
+
+        self._len = len(records)
+        self.handle = SharedArgsHandle(self._shm.name, size, tuple(classes), filetypes)
+
+    def __len__(self): return self._len
+
+    def close(self):
+        if self._shm is None: return
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+class SharedArgsView:
+    """
+    A read-only sequence of the args published under `handle`, each rebuilt (as a fresh instance) on access.
+    """
+
+    def __init__(self, handle):
+        # Attaching processes must never unlink the segment. Python 3.13+ can opt out of resource tracking;
+        # before that, processes started via `multiprocessing` share the publisher's tracker, so attaching is
+        # a no-op for it.
+        kwargs = {'track': False} if sys.version_info >= (3, 13) else {}
+        self.handle = handle
+        self._shm = shared_memory.SharedMemory(name=handle.name, **kwargs)
+
+        magic, self._len = _HEADER.unpack_from(self._shm.buf, 0)
+        if magic != MAGIC:
+            self._shm.close()
+            raise ValueError(f"Shared memory segment {handle.name} doesn't hold published args!")
+
+    def __len__(self): return self._len
+
+    def __getitem__(self, i):
+        if i < 0: i += self._len
+        if not 0 <= i < self._len: raise IndexError(f"Index {i} out of range for {self._len} shared args!")
+
+        offset, length, class_idx = _ENTRY.unpack_from(self._shm.buf, _HEADER.size + i * _ENTRY.size)
+        data = bytes(self._shm.buf[offset:offset + length])
+        return self.handle.classes[class_idx].from_bytes(data, self.handle.filetypes[class_idx])
+
+    def __iter__(self):
+        for i in range(self._len): yield self[i]
+
+    def close(self):
+        if self._shm is None: return
+        self._shm.close()
+        self._shm = None
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+def attach(handle): return SharedArgsView(handle)
@@ -0,0 +1,221 @@
+"""
+Sidecar storage of large array-valued fields.
+
+Inlining big numeric lists (class weights, feature masks, vocab ids, ...) into JSON or YAML makes args files
+slow to parse and every loading process hold its own copy. Instead, `to_file` writes each array-valued field
+to a `.npy` file next to the args file (`{args filename}.{field}.npy`), keeping only a reference in the args
+file:
+```
+{"output_dir": "...", "class_weights": {"__array__": "args.json.class_weights.npy"}}
+```
+A field is stored this way if its value is an array (a NumPy array of a numeric / bool dtype, an
+`array.array` or a `MappedArray`). Plain lists / tuples of bools, ints or floats (all of one type) are only
+stored this way if opted in, as they load back as (read-only) `MappedArray`s rather than lists: per field,
+with `metadata={'sidecar': True}`, or per class, by setting `BaseArgs.SIDECAR_MIN_ITEMS` to the length from
+which lists are stored this way. Fields can opt out entirely with `metadata={'sidecar': False}`.
+
+On load, such fields become read-only, memory-mapped `MappedArray`s, so loading is zero-copy and pages are
+shared between all processes using the same args. A `MappedArray` behaves like a read-only sequence (and
+compares equal to the list it was written from); `np.asarray(...)` (or `.data`) gives the underlying memory
+mapped NumPy array without copying. NumPy is optional (and only imported once a sidecar is written or
+mapped): without it, `.npy` files are written and mapped by hand, `.data` is a `memoryview` and slices are
+lists. `to_dict()` always returns such fields as plain lists.
+"""
+
+import array, ast, functools, mmap, os, struct, sys
+from pathlib import Path
+
+from .argtype_utils import numpy_for
+
+# Whether to use NumPy (if installed) to write and map sidecars; if False, the NumPy-free path is always used.
+USE_NUMPY = True
+
+ARRAY_KEY = '__array__'
+
+NPY_MAGIC = b'\x93NUMPY'
+# `.npy` dtype descriptions <-> `array` / `memoryview` typecodes, for when NumPy isn't available.
+DESCR_TO_TYPECODE = {
+    '|b1': '?', '|i1': 'b', '|u1': 'B', '<i2': 'h', '<u2': 'H', '<i4': 'i', '<u4': 'I', '<i8': 'q',
+    '<u8': 'Q', '<f4': 'f', '<f8': 'd',
+}
+TYPECODE_TO_DESCR = {
+    **{v: k for k, v in DESCR_TO_TYPECODE.items()},
+    'l': f"<i{array.array('l').itemsize}", 'L': f"<u{array.array('L').itemsize}",
+}
+INT64_MIN, INT64_MAX = -2**63, 2**63 - 1
+
+@functools.lru_cache(maxsize=None)
+def _import_numpy():
+    try: import numpy
+    except ImportError: return None
+    return numpy
+
+# NumPy is only imported once sidecars are actually written or mapped, not with `BaseArgs`.
+def _numpy(): return _import_numpy() if USE_NUMPY else None
+
+class MappedArray:
+    """
+    A read-only, memory-mapped array loaded from a sidecar `.npy` file; see the module docstring.
+    """
+    __slots__ = ('path', 'data', '_ino')
+
+    def __init__(self, path, data, ino):
+        self.path, self.data, self._ino = Path(path), data, ino
+
+    @classmethod
+    def open(cls, path):
+        path = Path(path)
+        ino = os.stat(path).st_ino
+        np = _numpy()
+        if np is not None: return cls(path, np.load(path, mmap_mode='r', allow_pickle=False), ino)
+        return cls(path, _map_npy(path), ino)
+
+    @property
+    def shape(self): return tuple(self.data.shape)
+
+    def is_unchanged_file(self, path):
+        # Whether `path` is still the very file this array maps (so needn't be rewritten).
+        try: return Path(os.path.abspath(path)) == Path(os.path.abspath(self.path)) and \
+            os.stat(path).st_ino == self._ino
+        except OSError: return False
+
+    def __len__(self): return len(self.data)
+    def __getitem__(self, i):
+        out = self.data[i]
+        return out.tolist() if isinstance(out, memoryview) else out # Slices of the NumPy-free mapping.
+
+    def __iter__(self): return iter(self.data)
+    def tolist(self): return self.data.tolist()
+
+    def __array__(self, dtype=None, copy=None):
+        out = _import_numpy().asarray(self.data, dtype=dtype)
+        return out.copy() if copy else out
+
+    def __eq__(self, other):
+        if isinstance(other, MappedArray): other = other.data
+        elif not isinstance(other, (list, tuple, array.array, memoryview)) and numpy_for(other) is None:
+            return NotImplemented
+        np = numpy_for(self.data) or numpy_for(other)
+        if np is not None: return bool(np.array_equal(np.asarray(self.data), np.asarray(other)))
+        return self.tolist() == (other.tolist() if hasattr(other, 'tolist') else list(other))
+
+    __hash__ = None
+
+    # Read only, so copies can share the mapping; pickles re-map the file.
+    def __copy__(self): return self
+    def __deepcopy__(self, memo): return self
+    def __reduce__(self): return MappedArray.open, (str(self.path),)
+
+    def __repr__(self): return f"MappedArray({str(self.path)!r}, shape={self.shape})"
+
+def _map_npy(path):
+    with open(path, mode='rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    assert mm[:6] == NPY_MAGIC, f"{path} is not a .npy file!"
+    major = mm[6]
+    header_len_fmt = '<H' if major == 1 else '<I'
+    (header_len,) = struct.unpack_from(header_len_fmt, mm, 8)
+    offset = 8 + struct.calcsize(header_len_fmt) + header_len
+    header = ast.literal_eval(mm[8 + struct.calcsize(header_len_fmt):offset].decode('latin1'))
+
+    typecode = DESCR_TO_TYPECODE.get(header['descr'])
+    assert typecode is not None, f"Can't map {path} (dtype {header['descr']}) without NumPy!"
+    shape = list(header['shape'])
+    assert not header['fortran_order'] or len(shape) <= 1, f"Can't map Fortran ordered {path} without NumPy!"
+    assert sys.byteorder == 'little' or header['descr'][0] == '|', f"Can't map {path} on a big-endian host!"
+
+    data = memoryview(mm)[offset:]
+    return data.cast(typecode, shape) if len(shape) != 1 else data.cast(typecode)
+
+def _list_typecode(values):
+    if all(type(v) is bool for v in values): return '?'
+    if all(type(v) is int for v in values) and all(INT64_MIN <= v <= INT64_MAX for v in values): return 'q'
+    if all(type(v) is float for v in values): return 'd'
+    return None
+
+def is_sidecar_value(value, min_items):
+    """
+    Whether `value` should be written to a sidecar file (see the module docstring), where lists / tuples only
+    are if they have at least `min_items` (if not None) items.
+    """
+    if isinstance(value, MappedArray): return True
+    if isinstance(value, array.array): return value.typecode in TYPECODE_TO_DESCR
+    if numpy_for(value) is not None: return value.dtype.kind in 'biuf'
+    if isinstance(value, (list, tuple)) and min_items is not None and len(value) >= min_items:
+        return len(value) > 0 and _list_typecode(value) is not None
+    return False
+
+def sidecar_fields(args):
+    """
+    Returns the names of the fields of `args` to be written to sidecar files.
+    """
+    class_min_items = type(args).SIDECAR_MIN_ITEMS
+    out = []
+    for field in args.__dataclass_fields__.values():
+        opt_in = field.metadata.get('sidecar', None)
+        if opt_in is False: continue
+        value = args.__dict__.get(field.name)
+        min_items = 1 if opt_in else class_min_items
+        if value is not None and is_sidecar_value(value, min_items): out.append(field.name)
+    return out
+
+def _npy_header(descr, shape):
+    header = repr({'descr': descr, 'fortran_order': False, 'shape': tuple(shape)})
+    # Pad (with spaces, then a newline) so the data starts 64-byte aligned, as NumPy does.
+    header += ' ' * (-(len(NPY_MAGIC) + 4 + len(header) + 1) % 64) + '\n'
+    return NPY_MAGIC + b'\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1')
+
+def _write_npy(value, f):
+    if isinstance(value, MappedArray): value = value.data
+    np = _numpy()
+    if np is not None:
+        if isinstance(value, (list, tuple)): value = np.asarray(value, dtype=_list_typecode(value))
+        np.save(f, np.asarray(value), allow_pickle=False)
+        return
+
+    if isinstance(value, (list, tuple)):
+        typecode = _list_typecode(value)
+        descr, shape = TYPECODE_TO_DESCR[typecode], (len(value),)
+        value = bytes(value) if typecode == '?' else array.array(typecode, value) # `array` has no bools.
+    elif isinstance(value, memoryview): descr, shape = TYPECODE_TO_DESCR[value.format], value.shape
+    else: descr, shape = TYPECODE_TO_DESCR[value.typecode], (len(value),)
+    assert sys.byteorder == 'little', "Writing sidecar arrays without NumPy requires a little-endian host!"
+    f.write(_npy_header(descr, shape))
+    f.write(value)
+
+def write(args, name, filepath, batch):
+    """
+    Writes field `name` of `args` to its sidecar file for the args file `filepath` (within `batch`, unless it
+    is already there), returning the reference to store in the args file.
+    """
+    value = args.__dict__[name]
+    # Named after the whole filename, so args files of different formats side by side don't share sidecars.
+    sidecar_path = filepath.with_name(f"{filepath.name}.{name}.npy")
+    if not (isinstance(value, MappedArray) and value.is_unchanged_file(sidecar_path)):
+        batch.add(sidecar_path, lambda f: _write_npy(value, f), binary=True)
+    return {ARRAY_KEY: sidecar_path.name}
+
+def load_refs(contents, filepath=None):
+    """
+    Replaces the sidecar references in `contents` (in place) with `MappedArray`s, resolving relative paths
+    against the args file's `filepath`.
+    """
+    for name, value in contents.items():
+        if type(value) is not dict or ARRAY_KEY not in value: continue
+        path = Path(value[ARRAY_KEY])
+        if not path.is_absolute():
+            assert filepath is not None, \
+                f"Can't resolve relative sidecar {path} without the args file's path!"
+            path = Path(filepath).parent / path
+        contents[name] = MappedArray.open(path)
+
+def to_plain(contents):
+    """
+    Converts array values within (nested) `contents` to plain lists, in place; as used by `to_dict()`.
+    """
+    for name, value in contents.items():
+        if isinstance(value, dict): to_plain(value)
+        elif isinstance(value, (MappedArray, array.array, memoryview)) or numpy_for(value) is not None:
+            contents[name] = value.tolist()
+    return contents
@@ -0,0 +1,230 @@
+"""
+Resolving args from several layered sources, recording where each field's value came from.
+
+From lowest to highest precedence, the layers are: the dataclass defaults, then each config file in turn (any
+format in `LOADERS_AND_DUMPERS`; files may be partial, deltas, or reference nested section files), then
+environment variables (`{env_prefix}{FIELD}`, upper cased, with nested fields as `{env_prefix}MODEL__LR`),
+then commandline overrides (parsed against the class's argparse spec, but only flags actually passed count).
+```
+resolved = ExampleArgs.from_sources(
+    files=['configs/base.yaml', 'configs/big_model.json'], env_prefix='EXAMPLE_', argv=None, # sys.argv[1:]
+)
+resolved.args                       # ExampleArgs(...)
+resolved.sources['model.lr']        # 'env:EXAMPLE_MODEL__LR'
+resolved.sources['output_dir']      # 'file:/abs/path/configs/base.yaml'
+```
+Sources are `'default'`, `'file:{path}'`, `'env:{variable}'` or `'cli'`. Nested fields are keyed by their
+dotted names (as on the commandline).
+
+The parsed (flattened) contents of each file and environment layer are kept in `BaseArgs.LAYER_CACHE` (or, if
+that is None, a `LayerCache` shared by all classes), keyed by the layer's content (the SHA-256 of the file,
+and of any section files or delta base it references; the relevant environment variables' values), so
+repeated resolutions (e.g., in a long-lived notebook kernel or launcher) only re-parse layers which actually
+changed.
+"""
+
+import argparse, copy, dataclasses, hashlib, json, os, sys, threading, typing, weakref
+from pathlib import Path
+from typing import Dict, NamedTuple
+
+from . import delta, nested, sidecar
+from .cache import IMMUTABLE_TYPES, LRU
+from .serializers import decode
+
+DEFAULT, CLI = 'default', 'cli'
+TRUE_STRINGS, FALSE_STRINGS = ('1', 'true', 'yes', 'on'), ('0', 'false', 'no', 'off')
+
+class Resolved(NamedTuple):
+    args:    object
+    sources: Dict[str, str] # Dotted field name -> source.
+
+class LayerCache:
+    """
+    An LRU cache of parsed file and environment layers, keyed on their content.
+    """
+
+    def __init__(self, maxsize=256):
+        self._entries = LRU(maxsize)
+        self.maxsize = maxsize
+        self._lock = threading.Lock() # Guards `parses`.
+        self.parses = 0
+
+    def get(self, key, parse):
+        """
+        Returns the layer cached under `key`, first computing (and caching) it with `parse()` if needed.
+        """
+        out = self._entries.get(key)
+        if out is not None: return out
+
+        out = parse()
+        with self._lock: self.parses += 1
+        self._entries.put(key, out)
+        return out
+
+    def discard(self, key): self._entries.pop(key)
+
+    def clear(self): self._entries.clear()
+
+    def __len__(self): return len(self._entries)
+
+_SHARED_CACHE = LayerCache()
+
+def layer_cache(args_cls):
+    """
+    Returns the `LayerCache` of `args_cls`: its `LAYER_CACHE`, or the shared one if that is None.
+    """
+    return _SHARED_CACHE if args_cls.LAYER_CACHE is None else args_cls.LAYER_CACHE
+
+_FIELDS = weakref.WeakKeyDictionary()
+_OVERRIDE_PARSERS = weakref.WeakKeyDictionary()
+_LOCK = threading.Lock()
+
+def flat_fields(args_cls):
+    """
+    Returns `{dotted name: field}` for every leaf (i.e., not nested args) field of `args_cls`.
+    """
+    out = _FIELDS.get(args_cls)
+    if out is None:
+        out = {}
+        for field in dataclasses.fields(args_cls):
+            sub_cls = nested.nested_type(field)
+            if sub_cls is None: out[field.name] = field
+            else: out.update({f"{field.name}.{k}": v for k, v in flat_fields(sub_cls).items()})
+        with _LOCK: _FIELDS[args_cls] = out
+    return out
+
+def _defaults(args_cls, prefix='', instance=None):
+    # Like `_add_field_args`, within a nested field defaults come from the parent field's default instance.
+    out = {}
+    for field in dataclasses.fields(args_cls):
+        name = f"{prefix}{field.name}"
+        sub_cls = nested.nested_type(field)
+        if sub_cls is not None:
+            sub_instance = nested.field_default(field) if instance is None else getattr(instance, field.name)
+            out.update(_defaults(sub_cls, f"{name}.", sub_instance))
+        elif instance is not None: out[name] = copy.deepcopy(getattr(instance, field.name))
+        elif field.default is not dataclasses.MISSING: out[name] = field.default
+        elif field.default_factory is not dataclasses.MISSING: out[name] = field.default_factory()
+    return out
+
+def _copy(value): return value if isinstance(value, IMMUTABLE_TYPES) else copy.deepcopy(value)
+
+def _decode(args_cls, path, data):
+    filetype = path.suffix[1:]
+    assert filetype in args_cls.LOADERS_AND_DUMPERS, \
+        f"Invalid filetype {filetype}! Must be in {args_cls.LOADERS_AND_DUMPERS.keys()}"
+    return decode(args_cls.LOADERS_AND_DUMPERS, filetype, data)
+
+def _digest(data): return hashlib.sha256(data).hexdigest()
+
+def _flatten_file(args_cls, path, contents, prefix, out, deps):
+    # Flattens the (possibly partial) `contents` read from `path` into `out`, loading referenced section files
+    # and resolving delta bases, and adding `(path, digest)` to `deps` for each other file this reads.
+    if delta.is_delta(contents):
+        base_path = Path(contents[delta.DELTA_KEY]['path'])
+        base_path = Path(os.path.abspath(base_path if base_path.is_absolute() else path.parent / base_path))
+        deps.append((base_path, _digest(base_path.read_bytes())))
+        contents = delta.resolve(args_cls, contents, path)
+    assert isinstance(contents, dict), f"{path} doesn't hold a dictionary of args!"
+
+    sub_classes = nested.nested_fields(args_cls)
+    fields = flat_fields(args_cls)
+    for name, value in contents.items():
+        if name in sub_classes and isinstance(value, dict):
+            sub_cls, sub_path, sub_contents = sub_classes[name][0], path, value
+            if nested.FILE_KEY in value:
+                sub_path = Path(os.path.abspath(path.parent / value[nested.FILE_KEY]))
+                data = sub_path.read_bytes()
+                sub_contents = _decode(sub_cls, sub_path, data)
+                deps.append((sub_path, _digest(data)))
+            _flatten_file(sub_cls, sub_path, sub_contents, f"{prefix}{name}.", out, deps)
+            continue
+
+        assert name in fields, f"Unknown field {prefix}{name} in {path}!"
+        if isinstance(value, dict) and sidecar.ARRAY_KEY in value:
+            value = {sidecar.ARRAY_KEY: os.path.abspath(path.parent / value[sidecar.ARRAY_KEY])}
+        out[f"{prefix}{name}"] = value
+
+def _file_layer(args_cls, path):
+    path = Path(os.path.abspath(path))
+    data = path.read_bytes()
+
+    def parse():
+        out, deps = {}, []
+        _flatten_file(args_cls, path, _decode(args_cls, path, data), '', out, deps)
+        return out, tuple(deps)
+
+    key, cache = ('file', args_cls, path, _digest(data)), layer_cache(args_cls)
+    flat, deps = cache.get(key, parse)
+    # Any section file or base the cached layer was built from must also be unchanged.
+    if any(not p.is_file() or _digest(p.read_bytes()) != digest for p, digest in deps):
+        cache.discard(key)
+        flat, deps = cache.get(key, parse)
+    return flat
+
+def env_var(env_prefix, name): return env_prefix + name.replace('.', '__').upper()
+
+def _parse_env_value(field, raw):
+    type_fn = field.type
+    if type_fn is bool:
+        assert raw.lower() in TRUE_STRINGS + FALSE_STRINGS, \
+            f"Can't parse {raw!r} as a bool for {field.name}!"
+        return raw.lower() in TRUE_STRINGS
+    if type_fn is str: return raw
+    # Generic aliases (`List[int]`, ...) aren't constructors; their values are given as JSON instead.
+    if callable(type_fn) and typing.get_origin(type_fn) is None: return type_fn(raw)
+    return json.loads(raw)
+
+def _env_layer(args_cls, env_prefix, environ):
+    names = {env_var(env_prefix, name): name for name in flat_fields(args_cls)}
+    present = tuple((var, environ[var]) for var in names if var in environ)
+
+    def parse():
+        fields = flat_fields(args_cls)
+        return {names[var]: (_parse_env_value(fields[names[var]], raw), var) for var, raw in present}
+
+    return layer_cache(args_cls).get(('env', args_cls, env_prefix, present), parse)
+
+def override_parser(args_cls):
+    """
+    Returns (and caches) `args_cls`'s argparse spec with every default suppressed and nothing required, so
+    that parsing yields just the flags actually passed.
+    """
+    parser = _OVERRIDE_PARSERS.get(args_cls)
+    if parser is None:
+        parser = argparse.ArgumentParser(description=args_cls.DESCRIPTION, argument_default=argparse.SUPPRESS)
+        args_cls._build_argparse_spec(parser)
+        for action in parser._actions:
+            action.default, action.required = argparse.SUPPRESS, False
+        with _LOCK: _OVERRIDE_PARSERS[args_cls] = parser
+    return parser
+
+def resolve(args_cls, files=(), env_prefix=None, argv=(), environ=None):
+    """
+    Resolves `args_cls` from its defaults, `files` (in increasing precedence), the environment variables
+    prefixed by `env_prefix` (read from `environ`, `os.environ` by default; skipped if `env_prefix` is None)
+    and commandline flags `argv` (`sys.argv[1:]` if None); see the module docstring.
+    """
+    flat = _defaults(args_cls)
+    sources = dict.fromkeys(flat, DEFAULT)
+
+    for path in files:
+        layer = _file_layer(args_cls, path)
+        flat.update({name: _copy(value) for name, value in layer.items()})
+        sources.update(dict.fromkeys(layer, f"file:{os.path.abspath(path)}"))
+
+    if env_prefix is not None:
+        layer = _env_layer(args_cls, env_prefix, os.environ if environ is None else environ)
+        for name, (value, var) in layer.items():
+            flat[name] = _copy(value)
+            sources[name] = f"env:{var}"
+
+    if argv is None: argv = sys.argv[1:]
+    if argv:
+        overrides = vars(override_parser(args_cls).parse_args(argv))
+        flat.update(overrides)
+        sources.update(dict.fromkeys(overrides, CLI))
+
+    missing = [name for name in flat_fields(args_cls) if name not in flat]
+    assert not missing, f"No source set required field(s) {missing} of {args_cls.__name__}!"
+    return Resolved(args_cls._from_contents(nested.unflatten(flat)), sources)
@@ -0,0 +1,203 @@
+"""
+Lazy hyperparameter sweep expansion over the dataclass fields of a `BaseArgs` subclass.
+
+A sweep is a base configuration plus a list of axes, whose cartesian product defines the points of the sweep:
+  * `Grid(field=values, ...)`: one dimension per field, taking each of its values.
+  * `Zipped(field=values, ...)`: a single dimension along which all listed fields advance together.
+  * `Random(num_samples, seed, field=sampler, ...)`: a single dimension of `num_samples` random draws, where
+    each sampler is either a sequence (sampled uniformly) or a callable taking a `random.Random`.
+
+Points are never materialized: point `i` is decoded from its index on demand (random draws are seeded by the
+point's index along the random axis), so a sweep of any size can be iterated, indexed, or split into shards
+across independent launcher processes with no coordination beyond `(shard, num_shards)`.
+
+Example:
+```
+sweep = Sweep(
+    ExampleArgs, '/path/to/sweep_root', base={'int_arg': 3},
+    axes=[Grid(num_layers=[1, 2]), Random(8, seed=0, float_arg=lambda rng: rng.uniform(0, 1))]
+)
+len(sweep) # 16
+for args in sweep.iter_args(shard=2, num_shards=4): launch(args)
+```
+"""
+
+import dataclasses, random
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from pathlib import Path
+
+class Axis(ABC):
+    """
+    A single sweep dimension: a fixed number of positions, each setting some fields.
+    """
+    @abstractmethod
+    def __len__(self): pass
+
+    @abstractmethod
+    def fields(self): pass
+
+    @abstractmethod
+    def values(self, position): pass
+
+class _Values(Axis):
+    def __init__(self, name, values):
+        self.name, self._values = name, list(values)
+        assert self._values, f"Axis for {name} has no values!"
+
+    def __len__(self): return len(self._values)
+    def fields(self): return [self.name]
+    def values(self, position): return {self.name: self._values[position]}
+
+class Grid(list):
+    """
+    One axis per field, so that all combinations of the given values are swept.
+    """
+    def __init__(self, **field_values):
+        super().__init__(_Values(name, values) for name, values in field_values.items())
+
+class Zipped(Axis):
+    def __init__(self, **field_values):
+        self._values = {name: list(values) for name, values in field_values.items()}
+        lengths = {len(v) for v in self._values.values()}
+        assert len(lengths) == 1, f"Zipped fields must have equal numbers of values! Got {self._values}"
+        self._len = lengths.pop()
+        assert self._len > 0, "Zipped axis has no values!"
+
+    def __len__(self): return self._len
+    def fields(self): return list(self._values)
+    def values(self, position): return {name: values[position] for name, values in self._values.items()}
+
+class Random(Axis):
+    def __init__(self, num_samples, seed=0, **field_samplers):
+        assert num_samples > 0, f"`num_samples` must be positive! Got {num_samples}"
+        self.num_samples, self.seed, self.samplers = num_samples, seed, field_samplers
+        for name, sampler in field_samplers.items():
+            assert callable(sampler) or (isinstance(sampler, Sequence) and len(sampler) > 0), \
+                f"Sampler for {name} must be a callable or a non-empty sequence! Got {sampler}"
+
+    def __len__(self): return self.num_samples
+    def fields(self): return list(self.samplers)
+
+    def values(self, position):
+        rng = random.Random(f"{self.seed}:{position}")
+        return {
+            name: (sampler(rng) if callable(sampler) else rng.choice(sampler))
+            for name, sampler in self.samplers.items()
+        }
+
+def _flatten_axes(axes):
+    for axis in axes:
+        if isinstance(axis, Axis): yield axis
+        else: yield from _flatten_axes(axis)
+
+SIMPLE_TYPES = {int: (int,), float: (int, float), str: (str,), bool: (bool,)}
+
+class Sweep:
+    """
+    A lazily expanded sweep of `args_cls` configurations. If `root` is given, each point's output dir field
+    (as found by `args_cls`'s argparse spec) is set to `root / run_name(i, point)`, where `run_name` defaults
+    to the zero-padded point index.
+    """
+
+    def __init__(self, args_cls, root=None, base=None, axes=(), run_name=None):
+        self.args_cls = args_cls
+        self.root = None if root is None else Path(root)
+        self.base = dict(base or {})
+        self.axes = list(_flatten_axes(axes))
+        self.run_name = run_name
+
+        self._fields = {f.name: f for f in dataclasses.fields(args_cls)}
+        self.output_dir_arg = args_cls.compiled_spec().main_dir_arg
+
+        swept = [name for axis in self.axes for name in axis.fields()]
+        assert len(swept) == len(set(swept)), f"Fields are swept by more than one axis: {swept}"
+        for name in [*self.base, *swept]:
+            assert name in self._fields, f"{name} is not a field of {args_cls.__name__}!"
+        if self.root is not None:
+            assert self.output_dir_arg not in swept, \
+                f"Can't sweep over the output dir arg {self.output_dir_arg} when a `root` is given!"
+
+        self._radices = [len(axis) for axis in self.axes]
+        self._len = 1
+        for radix in self._radices: self._len *= radix
+        self._width = len(str(max(self._len - 1, 0)))
+
+    def __len__(self): return self._len
+
+    def point(self, i):
+        """
+        Returns the full field dictionary of point `i` (negative indices count from the end).
+        """
+        if i < 0: i += self._len
+        if not 0 <= i < self._len: raise IndexError(f"Point {i} out of range for sweep of size {self._len}")
+
+        point = dict(self.base)
+        # Mixed radix decoding, with the last axis varying fastest.
+        remainder = i
+        positions = []
+        for radix in reversed(self._radices):
+            remainder, position = divmod(remainder, radix)
+            positions.append(position)
+        for axis, position in zip(self.axes, reversed(positions)): point.update(axis.values(position))
+
+        if self.root is not None:
+            name = f"{i:0{self._width}d}" if self.run_name is None else self.run_name(i, point)
+            point[self.output_dir_arg] = str(self.root / name)
+
+        return point
+
+    def _validate(self, point):
+        for name, value in point.items():
+            allowed = SIMPLE_TYPES.get(self._fields[name].type)
+            if allowed is None: continue
+            is_valid = isinstance(value, allowed) and not (bool not in allowed and isinstance(value, bool))
+            assert is_valid, f"{name} must be of type {self._fields[name].type.__name__}! Got {value!r}"
+
+    def args(self, i):
+        point = self.point(i)
+        self._validate(point)
+        return self.args_cls(**point)
+
+    def __getitem__(self, i): return self.args(i)
+
+    def indices(self, shard=0, num_shards=1):
+        """
+        The point indices belonging to `shard` of `num_shards` (strided, so shards are balanced).
+        """
+        assert 0 <= shard < num_shards, f"Invalid shard {shard} of {num_shards}!"
+        return range(shard, self._len, num_shards)
+
+    def iter_points(self, shard=0, num_shards=1):
+        for i in self.indices(shard, num_shards): yield i, self.point(i)
+
+    def iter_args(self, shard=0, num_shards=1):
+        for i in self.indices(shard, num_shards): yield self.args(i)
+
+    def __iter__(self): return self.iter_args()
+
+    def run_dir(self, i):
+        assert self.root is not None, "Sweep has no `root`, so no run directories!"
+        return Path(self.point(i)[self.output_dir_arg])
+
+    def write(self, shard=0, num_shards=1, filetype=None, fsync=None, batch_size=256, base_file=None):
+        """
+        Creates the run directory of, and writes the args file for, each point in the given shard (via
+        `BaseArgs.write_many`). The args filename follows `from_commandline`. If `base_file` (the path of an
+        args file, which should lie outside of the run directories) is given, args are written as deltas
+        against it (see `delta`).
+        """
+        assert self.root is not None, "Sweep has no `root`, so nowhere to write!"
+        spec = self.args_cls.compiled_spec()
+
+        def args_and_filepaths():
+            for args in self.iter_args(shard, num_shards):
+                args_dir = Path(getattr(args, self.output_dir_arg))
+                args_dir.mkdir(parents=True, exist_ok=True)
+                filepath = args_dir / spec.args_filename
+                if not filepath.suffix: filepath = filepath.with_suffix(f".{self.args_cls.DEFAULT_EXTENSION}")
+                yield args, filepath
+
+        self.args_cls.write_many(
+            args_and_filepaths(), filetype, fsync=fsync, batch_size=batch_size, base=base_file
+        )
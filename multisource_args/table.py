@@ -0,0 +1,330 @@
+"""
+A columnar, memory-compact container for many configurations of a single `BaseArgs` subclass.
+
+Rather than one dataclass instance (and `__dict__`) per run, an `ArgsTable` stores each field as a typed
+column: `bool`, `int` and `float` fields live in compact `array.array`s (which filters operate on zero-copy
+through NumPy when it is installed), `str` fields are category encoded (interned categories plus integer
+codes), and anything else (or any value which doesn't fit its field's column type) falls back to a plain
+object column. Rows only become real args instances on demand.
+
+Example:
+```
+table = ArgsTable.load(ExampleArgs, '/path/to/all/runs')
+deep = table.where(num_layers__ge=4, optimizer='adam')
+for (lr,), group in deep.group_by('learning_rate').items(): ...
+best_args = deep.args(0)
+```
+"""
+
+import csv, operator, sys
+from abc import ABC, abstractmethod
+from array import array
+
+from . import nested
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+COMPARISONS = {
+    'eq': operator.eq, 'ne': operator.ne, 'lt': operator.lt, 'le': operator.le, 'gt': operator.gt,
+    'ge': operator.ge,
+}
+INT64_MIN, INT64_MAX = -2**63, 2**63 - 1
+
+class _Column(ABC):
+    @abstractmethod
+    def __len__(self): pass
+
+    @abstractmethod
+    def append(self, value): pass # Returns False if the value can't be stored.
+
+    @abstractmethod
+    def get(self, i): pass
+
+    @abstractmethod
+    def take(self, indices): pass
+
+    @abstractmethod
+    def values(self): pass
+
+    def to_list(self): return [self.get(i) for i in range(len(self))]
+
+    def compare(self, op, value):
+        """
+        Returns a boolean mask (a NumPy array if available, else a list) of `op(row_value, value)`.
+        """
+        if op == 'in':
+            value = set(value)
+            mask = [v in value for v in self.to_list()]
+        else:
+            fn = COMPARISONS[op]
+            mask = [fn(v, value) for v in self.to_list()]
+        return np.asarray(mask, dtype=bool) if np is not None else mask
+
+    def group_codes(self):
+        """
+        Returns an int NumPy array assigning each row the same code as every other row with an equal value.
+        """
+        codes = {}
+        return np.fromiter((codes.setdefault(v, len(codes)) for v in self.to_list()), 'int64', len(self))
+
+class _ArrayColumn(_Column):
+    # (array typecode, numpy dtype) per kind.
+    KINDS = {'bool': ('b', 'bool'), 'int': ('q', 'int64'), 'float': ('d', 'float64')}
+
+    def __init__(self, kind, data=None, int_rows=None):
+        self.kind = kind
+        self.typecode, self.dtype = self.KINDS[kind]
+        self.data = array(self.typecode) if data is None else data
+        # The rows of a float column which were given as ints, so they are returned as ints again.
+        self.int_rows = set() if int_rows is None else int_rows
+
+    def __len__(self): return len(self.data)
+
+    def fits(self, value):
+        if self.kind == 'bool': return isinstance(value, bool)
+        if isinstance(value, bool): return False
+        if self.kind == 'int': return isinstance(value, int) and INT64_MIN <= value <= INT64_MAX
+        if isinstance(value, int): return abs(value) <= 2**53 # Exactly representable as a float.
+        return isinstance(value, float)
+
+    def append(self, value):
+        if not self.fits(value): return False
+        if self.kind == 'float' and isinstance(value, int): self.int_rows.add(len(self.data))
+        self.data.append(value)
+        return True
+
+    def get(self, i):
+        v = self.data[i]
+        if self.kind == 'bool': return bool(v)
+        return int(v) if self.int_rows and i in self.int_rows else v
+
+    def take(self, indices):
+        data = array(self.typecode, (self.data[i] for i in indices))
+        int_rows = {j for j, i in enumerate(indices) if i in self.int_rows} if self.int_rows else None
+        return _ArrayColumn(self.kind, data, int_rows)
+
+    def _view(self):
+        # Zero-copy, but pins the buffer (the array can't grow while the view is alive), so only used
+        # transiently.
+        if not self.data: return np.empty(0, dtype=self.dtype)
+        if self.kind == 'bool': return np.frombuffer(self.data, dtype='int8').view(bool)
+        return np.frombuffer(self.data, dtype=self.dtype)
+
+    def values(self): return self._view().copy() if np is not None else self.to_list()
+
+    def group_codes(self): return np.unique(self._view(), return_inverse=True)[1].reshape(-1)
+
+    def compare(self, op, value):
+        if np is None or (op != 'in' and not isinstance(value, (bool, int, float))):
+            return super().compare(op, value)
+        if op == 'in': return np.isin(self._view(), list(value))
+        return np.asarray(COMPARISONS[op](self._view(), value), dtype=bool)
+
+class _CategoryColumn(_Column):
+    def __init__(self, categories=None, codes=None):
+        self.categories = [] if categories is None else categories
+        self.lookup = {c: i for i, c in enumerate(self.categories)}
+        self.codes = array('i') if codes is None else codes
+
+    def __len__(self): return len(self.codes)
+
+    def _code(self, value, add=False):
+        code = self.lookup.get(value)
+        if code is None and add:
+            code = len(self.categories)
+            self.categories.append(sys.intern(value))
+            self.lookup[value] = code
+        return code
+
+    def append(self, value):
+        if not isinstance(value, str): return False
+        self.codes.append(self._code(value, add=True))
+        return True
+
+    def get(self, i): return self.categories[self.codes[i]]
+
+    def take(self, indices):
+        # Categories are shared (they're only ever appended to), so taking is cheap.
+        column = _CategoryColumn.__new__(_CategoryColumn)
+        column.categories, column.lookup = self.categories, self.lookup
+        column.codes = array('i', (self.codes[i] for i in indices))
+        return column
+
+    def values(self):
+        if np is None: return self.to_list()
+        categories = np.empty(len(self.categories), dtype=object)
+        categories[:] = self.categories
+        return categories[self.codes_array()]
+
+    def codes_array(self):
+        # A transient zero-copy view of the codes; see `_ArrayColumn._view`.
+        return np.frombuffer(self.codes, dtype='int32') if self.codes else np.empty(0, dtype='int32')
+
+    def group_codes(self): return self.codes_array()
+
+    def compare(self, op, value):
+        if np is None or op not in ('eq', 'ne', 'in'): return super().compare(op, value)
+        if op == 'in':
+            codes = [c for c in (self._code(v) for v in value if isinstance(v, str)) if c is not None]
+            return np.isin(self.codes_array(), codes)
+        code = self._code(value) if isinstance(value, str) else None
+        mask = np.zeros(len(self), dtype=bool) if code is None else (self.codes_array() == code)
+        return mask if op == 'eq' else ~mask
+
+class _ObjectColumn(_Column):
+    def __init__(self, data=None): self.data = [] if data is None else data
+    def __len__(self): return len(self.data)
+
+    def append(self, value):
+        self.data.append(value)
+        return True
+
+    def get(self, i): return self.data[i]
+    def take(self, indices): return _ObjectColumn([self.data[i] for i in indices])
+    def values(self):
+        if np is None: return list(self.data)
+        values = np.empty(len(self.data), dtype=object)
+        values[:] = self.data
+        return values
+
+def _new_column(field_type):
+    if field_type is bool: return _ArrayColumn('bool')
+    if field_type is int: return _ArrayColumn('int')
+    if field_type is float: return _ArrayColumn('float')
+    if field_type is str: return _CategoryColumn()
+    return _ObjectColumn()
+
+class ArgsTable:
+    """
+    A columnar table of `args_cls` configurations. See the module docstring.
+    """
+
+    def __init__(self, args_cls, columns=None):
+        self.args_cls = args_cls
+        fields = args_cls.compiled_spec().fields
+        self.fields = [f.name for f in fields]
+        self._columns = columns if columns is not None else {f.name: _new_column(f.type) for f in fields}
+
+    @classmethod
+    def from_args(cls, args_cls, args_iter):
+        table = cls(args_cls)
+        table.extend(args_iter)
+        return table
+
+    @classmethod
+    def load(cls, args_cls, root_or_paths, workers=8, errors=None):
+        """
+        Streams every args file under `root_or_paths` (see `BaseArgs.load_many`) into a new table, never
+        holding more than a bounded number of instances at once. Failed `LoadResult`s are appended to `errors`
+        if given.
+        """
+        table = cls(args_cls)
+        for result in args_cls.load_many(root_or_paths, workers=workers):
+            if result.ok: table.append(result.args)
+            elif errors is not None: errors.append(result)
+        return table
+
+    def __len__(self): return len(self._columns[self.fields[0]]) if self.fields else 0
+
+    def append(self, args):
+        """
+        Appends one row, from an `args_cls` instance or a field dictionary (e.g., its `to_dict()`).
+        """
+        row = args if isinstance(args, dict) else args.__dict__
+        if nested.LAZY_REFS in row: row = {name: getattr(args, name) for name in self.fields}
+        missing = [n for n in self.fields if n not in row]
+        assert not missing, f"Row is missing fields {missing}!"
+
+        for name in self.fields:
+            column, value = self._columns[name], row[name]
+            if not column.append(value):
+                self._columns[name] = _ObjectColumn(column.to_list())
+                self._columns[name].append(value)
+
+    def extend(self, args_iter):
+        for args in args_iter: self.append(args)
+
+    def column(self, name):
+        """
+        Returns (a copy of) the values of column `name`: a typed NumPy array if NumPy is installed (so ints in
+        a float column are floats), else a list.
+        """
+        assert name in self._columns, f"{name} is not a field of {self.args_cls.__name__}!"
+        return self._columns[name].values()
+
+    def row(self, i): return {name: self._columns[name].get(i) for name in self.fields}
+    def args(self, i): return self.args_cls(**self.row(i))
+
+    def iter_args(self):
+        for i in range(len(self)): yield self.args(i)
+
+    def take(self, indices):
+        indices = list(indices)
+        return ArgsTable(self.args_cls, {n: c.take(indices) for n, c in self._columns.items()})
+
+    def mask(self, *conditions, **predicates):
+        """
+        Returns the boolean mask of rows satisfying every condition, given as `(field, op, value)` tuples or
+        as `field=value` / `field__op=value` keyword predicates (ops: `eq, ne, lt, le, gt, ge, in`).
+        """
+        conditions = [*conditions]
+        for name, value in predicates.items():
+            field, _, op = name.partition('__')
+            conditions.append((field, op or 'eq', value))
+
+        mask = None
+        for field, op, value in conditions:
+            assert field in self._columns, f"{field} is not a field of {self.args_cls.__name__}!"
+            assert op in COMPARISONS or op == 'in', f"Invalid operator {op}!"
+            m = self._columns[field].compare(op, value)
+            if mask is None: mask = m
+            elif np is not None: mask = mask & m
+            else: mask = [a and b for a, b in zip(mask, m)]
+
+        if mask is None: mask = np.ones(len(self), dtype=bool) if np is not None else [True] * len(self)
+        return mask
+
+    def where(self, *conditions, **predicates):
+        mask = self.mask(*conditions, **predicates)
+        indices = np.flatnonzero(mask) if np is not None else [i for i, m in enumerate(mask) if m]
+        return self.take(indices)
+
+    def group_by(self, *names):
+        """
+        Returns `{(value, ...): sub_table}` for each distinct combination of the values of fields `names`, in
+        order of first appearance.
+        """
+        assert names, "Must group by at least one field!"
+        columns = [self._columns[n] for n in names]
+        if np is None:
+            groups = {}
+            for i in range(len(self)): groups.setdefault(tuple(c.get(i) for c in columns), []).append(i)
+            return {key: self.take(indices) for key, indices in groups.items()}
+        if not len(self): return {}
+
+        # Each row's group id, from the per column codes of its values.
+        codes = np.stack([c.group_codes() for c in columns], axis=1)
+        _, first, ids = np.unique(codes, axis=0, return_index=True, return_inverse=True)
+        order = np.argsort(ids.reshape(-1), kind='stable')
+        groups = np.split(order, np.cumsum(np.bincount(ids.reshape(-1)))[:-1])
+        # Keys are read back from each group's first row, so they keep the columns' original Python types.
+        return {
+            tuple(c.get(int(indices[0])) for c in columns): self.take(indices.tolist())
+            for _, indices in sorted(zip(first, groups), key=lambda g: g[0])
+        }
+
+    def to_columns(self): return {name: self._columns[name].to_list() for name in self.fields}
+    def to_records(self): return [self.row(i) for i in range(len(self))]
+
+    def to_csv(self, filepath):
+        with open(filepath, mode='w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.fields)
+            for i in range(len(self)): writer.writerow([self._columns[n].get(i) for n in self.fields])
+
+    def to_pandas(self):
+        import pandas as pd
+        return pd.DataFrame({name: self.column(name) for name in self.fields})
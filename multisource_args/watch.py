@@ -0,0 +1,199 @@
+"""
+Live reloading of a running job's args when its args file is edited.
+
+```
+@dataclass
+class TrainArgs(BaseArgs):
+    output_dir: str = dataclasses.field(metadata={'immutable': True})
+    lr:       float = 1e-3
+    ...
+
+args = TrainArgs.from_commandline()
+with args.watch(lambda diff: logger.info(f"Args changed: {diff}")):
+    train(args) # Sees edits to `lr` (as `args.lr`) as soon as the file is saved.
+```
+The watcher waits on inotify (Linux, via `ctypes`) for writes into the args file's directory, falling back to
+polling the file's `(mtime, size, inode)` every `interval` seconds elsewhere. On a change, the file is only
+re-parsed if its bytes actually differ from the last version seen. The new args are then diffed field by field
+(nested fields by dotted name) against the watched instance, the changed fields are assigned onto it, and
+subscribers are called with `{name: Change(old, new)}`.
+
+An edit changing any field marked `metadata={'immutable': True}` (or any field within a nested args field so
+marked) is rejected as a whole: nothing is applied and a warning is logged. Files which fail to parse (e.g., a
+half saved edit) are likewise skipped until they next change.
+"""
+
+import ctypes, ctypes.util, dataclasses, hashlib, logging, os, select, struct, sys, threading
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from . import nested
+
+logger = logging.getLogger(__name__)
+
+INOTIFY, POLL = 'inotify', 'poll'
+# From <sys/inotify.h>.
+IN_CLOSE_WRITE, IN_MOVED_TO = 0x008, 0x080
+_EVENT = struct.Struct('iIII') # wd, mask, cookie, name length.
+
+class Change(NamedTuple):
+    old: Any
+    new: Any
+
+def flat_dict(args, prefix=''):
+    """
+    Returns `{dotted name: value}` of the (plain, `to_dict()` style) values of `args`'s leaf fields.
+    """
+    return _flatten(type(args), args.to_dict(), prefix)
+
+def _flatten(args_cls, contents, prefix):
+    sub_fields = nested.nested_fields(args_cls)
+    out = {}
+    for name, value in contents.items():
+        if name in sub_fields and isinstance(value, dict):
+            out.update(_flatten(sub_fields[name][0], value, f"{prefix}{name}."))
+        else: out[f"{prefix}{name}"] = value
+    return out
+
+def diff(old, new):
+    """
+    Returns `{dotted name: Change(old, new)}` for the leaf fields whose values differ between `old` and `new`.
+    """
+    old_flat, new_flat = flat_dict(old), flat_dict(new)
+    return {name: Change(old_flat.get(name), v) for name, v in new_flat.items() if old_flat.get(name) != v}
+
+def immutable_prefixes(args_cls, prefix=''):
+    """
+    Returns the dotted names of the fields of `args_cls` marked immutable (a nested field's name also covers
+    everything within it).
+    """
+    out = []
+    for field in dataclasses.fields(args_cls):
+        name = f"{prefix}{field.name}"
+        if field.metadata.get('immutable', False): out.append(name)
+        elif nested.nested_type(field) is not None:
+            out.extend(immutable_prefixes(nested.nested_type(field), f"{name}."))
+    return out
+
+def _is_immutable(name, prefixes): return any(name == p or name.startswith(p + '.') for p in prefixes)
+
+def _inotify():
+    if not sys.platform.startswith('linux'): return None
+    try: libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+    except OSError: return None
+    return libc if hasattr(libc, 'inotify_init1') else None
+
+class ArgsWatcher:
+    """
+    Watches `filepath` and applies edits to `args` in place; see the module docstring. Use as a context
+    manager, or `start()` / `stop()` the background thread; `check()` can also be called directly (e.g., once
+    per training step) instead.
+    """
+
+    def __init__(self, args, filepath, callback=None, interval=1.0, backend=None):
+        assert not hasattr(type(args), '_FROZEN_BASE'), "Can't watch frozen (shared, cached) args!"
+        assert backend in (None, INOTIFY, POLL), f"Invalid backend {backend}! Must be {INOTIFY} or {POLL}."
+        if backend is None: backend = INOTIFY if _inotify() is not None else POLL
+
+        self.args, self.filepath, self.interval, self.backend = args, Path(filepath), interval, backend
+        self.filetype = self.filepath.suffix[1:]
+        self._subscribers = [] if callback is None else [callback]
+        self._immutable = immutable_prefixes(type(args))
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._stat, self._digest = self._stat_file(), None
+        if self._stat is not None: self._digest = hashlib.sha256(self.filepath.read_bytes()).hexdigest()
+
+    def subscribe(self, callback):
+        """
+        Calls `callback(diff)` (from the watcher's thread) after each applied edit.
+        """
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback): self._subscribers.remove(callback)
+
+    def _stat_file(self):
+        try: st = os.stat(self.filepath)
+        except FileNotFoundError: return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def check(self, force=False):
+        """
+        Applies the args file's changes, if any. Returns the applied diff, or None if nothing was applied.
+        Unless `force`, the file is only read if its stat changed.
+        """
+        with self._lock:
+            st = self._stat_file()
+            if st is None or (st == self._stat and not force): return None
+            self._stat = st
+
+            try: data = self.filepath.read_bytes()
+            except FileNotFoundError: return None
+            digest = hashlib.sha256(data).hexdigest()
+            if digest == self._digest: return None
+            self._digest = digest
+
+            try: new = type(self.args).from_bytes(data, self.filetype, self.filepath)
+            except Exception as e:
+                logger.warning(f"Ignoring unparsable edit to {self.filepath}: {e!r}")
+                return None
+
+            changes = diff(self.args, new)
+            if not changes: return None
+            rejected = [name for name in changes if _is_immutable(name, self._immutable)]
+            if rejected:
+                logger.warning(f"Rejecting edit to {self.filepath}: changes immutable field(s) {rejected}.")
+                return None
+
+            for name in dict.fromkeys(name.split('.')[0] for name in changes):
+                setattr(self.args, name, getattr(new, name))
+
+        for callback in list(self._subscribers):
+            try: callback(changes)
+            except Exception: logger.exception(f"Args watcher subscriber {callback} failed!")
+        return changes
+
+    def _run_poll(self):
+        self.check()
+        while not self._stop.wait(self.interval): self.check()
+
+    def _run_inotify(self):
+        libc = _inotify()
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0: return self._run_poll()
+        try:
+            # The directory, not the file: atomic writes replace the file's inode.
+            wd = libc.inotify_add_watch(fd, os.fsencode(self.filepath.parent), IN_CLOSE_WRITE | IN_MOVED_TO)
+            if wd < 0: return self._run_poll()
+            name = os.fsencode(self.filepath.name)
+            self.check()
+            while not self._stop.is_set():
+                if not select.select([fd], [], [], self.interval)[0]: continue
+                buf = os.read(fd, 64 * 1024)
+                offset, relevant = 0, False
+                while offset + _EVENT.size <= len(buf):
+                    _, _, _, length = _EVENT.unpack_from(buf, offset)
+                    start = offset + _EVENT.size
+                    relevant |= buf[start:start + length].rstrip(b'\0') == name
+                    offset = start + length
+                if relevant: self.check(force=True)
+        finally: os.close(fd)
+
+    def start(self):
+        assert self._thread is None, "Watcher already started!"
+        run = self._run_inotify if self.backend == INOTIFY else self._run_poll
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name=f"ArgsWatcher({self.filepath})", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None: self._thread.join()
+        self._thread = None
+
+    def __enter__(self): return self if self._thread is not None else self.start()
+    def __exit__(self, *exc): self.stop()
@@ -0,0 +1,112 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio, shutil, tempfile, threading, unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from multisource_args.args import *
+from multisource_args import aio
+
+@dataclass
+class ExampleArgs(BaseArgs):
+    output_dir:    str
+    do_bool_arg:  bool = True
+    int_arg:       int = 60000
+
+class TestAio(unittest.TestCase):
+    def setUp(self): self.root = Path(tempfile.mkdtemp())
+    def tearDown(self): shutil.rmtree(self.root)
+
+    def _write_runs(self, num_runs):
+        for i in range(num_runs):
+            run_dir = self.root / str(i)
+            run_dir.mkdir()
+            ExampleArgs(output_dir=str(run_dir), int_arg=i).to_file(run_dir / 'args.json')
+
+    def test_round_trip_matches_sync(self):
+        args = ExampleArgs(output_dir=str(self.root), int_arg=3)
+
+        async def run():
+            for ext in ExampleArgs.LOADERS_AND_DUMPERS:
+                filepath = self.root / f"async.{ext}"
+                await args.ato_file(filepath)
+                self.assertEqual(filepath.read_bytes(), self._sync_bytes(args, ext))
+                self.assertEqual(await ExampleArgs.afrom_file(filepath), ExampleArgs.from_file(filepath))
+
+        asyncio.run(run())
+
+    def _sync_bytes(self, args, ext):
+        filepath = self.root / f"sync.{ext}"
+        args.to_file(filepath)
+        return filepath.read_bytes()
+
+    def test_aload_many(self):
+        want = {}
+        for i in range(20):
+            run_dir = self.root / f"run_{i}"
+            run_dir.mkdir()
+            want[run_dir / 'args.json'] = ExampleArgs(output_dir=str(run_dir), int_arg=i)
+            want[run_dir / 'args.json'].to_file(run_dir / 'args.json')
+        (self.root / 'run_0' / 'args.yaml').write_text('[unclosed')
+
+        async def run():
+            return [r async for r in ExampleArgs.aload_many(self.root, limit=3)]
+
+        results = asyncio.run(run())
+        self.assertEqual({r.path: r.args for r in results if r.ok}, want)
+        self.assertEqual([r.path for r in results if not r.ok], [self.root / 'run_0' / 'args.yaml'])
+
+    def test_concurrency_is_bounded(self):
+        self._write_runs(12)
+
+        in_flight, peak, lock = [0], [0], threading.Lock()
+        from_file = ExampleArgs.from_file.__func__
+
+        def counting_from_file(cls, filepath, filetype=None):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            try:
+                threading.Event().wait(0.01)
+                return from_file(cls, filepath, filetype)
+            finally:
+                with lock: in_flight[0] -= 1
+
+        async def run():
+            with ThreadPoolExecutor(8) as executor:
+                return [r async for r in ExampleArgs.aload_many(self.root, limit=2, executor=executor)]
+
+        ExampleArgs.from_file = classmethod(counting_from_file)
+        try:
+            results = asyncio.run(run())
+        finally:
+            del ExampleArgs.from_file
+
+        self.assertEqual(len(results), 12)
+        self.assertTrue(all(r.ok for r in results))
+        self.assertLessEqual(peak[0], 2)
+
+    def test_cancellation(self):
+        self._write_runs(8)
+
+        async def run():
+            gen = ExampleArgs.aload_many(self.root, limit=2)
+            first = await gen.__anext__()
+            await gen.aclose()
+            return first
+
+        self.assertTrue(asyncio.run(run()).ok)
+
+    def test_set_default_executor(self):
+        filepath = self.root / 'args.json'
+        ExampleArgs(output_dir=str(self.root)).to_file(filepath)
+
+        aio.set_default_executor(2)
+        try:
+            self.assertEqual(aio.get_default_executor()._max_workers, 2)
+            self.assertEqual(asyncio.run(ExampleArgs.afrom_file(filepath)), ExampleArgs.from_file(filepath))
+        finally:
+            aio.set_default_executor(aio.DEFAULT_MAX_WORKERS)
+
+if __name__ == '__main__': unittest.main()
@@ -0,0 +1,100 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import shutil, tempfile, unittest
+from pathlib import Path
+
+from multisource_args.args import *
+from multisource_args.archive import ArgsArchive
+
+@dataclass
+class ExampleArgs(BaseArgs):
+    output_dir:    str
+    do_bool_arg:  bool = True
+    int_arg:       int = 60000
+
+class TestArchive(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.path = self.root / 'runs.argpack'
+
+    def tearDown(self): shutil.rmtree(self.root)
+
+    def _args(self, i): return ExampleArgs(output_dir=str(self.root / f"run_{i}"), int_arg=i)
+
+    def test_put_get_reopen(self):
+        with ArgsArchive(ExampleArgs, self.path) as archive:
+            archive.put_many((f"run_{i}", self._args(i)) for i in range(50))
+            archive.put('run_3', self._args(300))
+            archive.delete('run_4')
+            self.assertEqual(len(archive), 49)
+            self.assertEqual(archive['run_3'], self._args(300))
+            self.assertGreater(archive.garbage_ratio, 0)
+
+        with ArgsArchive(ExampleArgs, self.path, mode='r') as archive:
+            self.assertEqual(len(archive), 49)
+            self.assertNotIn('run_4', archive)
+            self.assertIsNone(archive.get('run_4'))
+            self.assertEqual(archive['run_3'], self._args(300))
+            self.assertEqual(dict(archive.items())['run_10'], self._args(10))
+            with self.assertRaises(AssertionError): archive.put('x', self._args(0))
+
+    def test_compact(self):
+        with ArgsArchive(ExampleArgs, self.path) as archive:
+            for _ in range(3): archive.put_many((f"run_{i}", self._args(i)) for i in range(10))
+            archive.delete('run_0')
+            size = self.path.stat().st_size
+
+            archive.compact()
+            self.assertLess(self.path.stat().st_size, size / 2)
+            self.assertEqual(archive.garbage_ratio, 0)
+            self.assertEqual(sorted(archive.keys()), sorted(f"run_{i}" for i in range(1, 10)))
+            self.assertEqual(archive['run_5'], self._args(5))
+
+    def test_reader_refresh(self):
+        with ArgsArchive(ExampleArgs, self.path) as writer, \
+                ArgsArchive(ExampleArgs, self.path, mode='r') as reader:
+            writer.put('a', self._args(1))
+            self.assertNotIn('a', reader)
+            reader.refresh()
+            self.assertEqual(reader['a'], self._args(1))
+
+            writer.put('b', self._args(2))
+            writer.compact()
+            reader.refresh()
+            self.assertEqual(sorted(reader.keys()), ['a', 'b'])
+
+    def test_torn_append_is_truncated(self):
+        with ArgsArchive(ExampleArgs, self.path) as archive:
+            archive.put_many([('a', self._args(1)), ('b', self._args(2))])
+        size = self.path.stat().st_size
+        with open(self.path, mode='r+b') as f: f.truncate(size - 3)
+
+        with ArgsArchive(ExampleArgs, self.path) as archive:
+            self.assertEqual(archive.keys(), ['a'])
+            archive.put('c', self._args(3))
+        with ArgsArchive(ExampleArgs, self.path, mode='r') as archive:
+            self.assertEqual(archive.keys(), ['a', 'c'])
+
+    def test_import_export(self):
+        src = self.root / 'src'
+        for i in range(5):
+            (src / 'sweep' / f"run_{i}").mkdir(parents=True)
+            self._args(i).to_file(src / 'sweep' / f"run_{i}" / 'args.json')
+
+        with ArgsArchive(ExampleArgs, self.path) as archive:
+            self.assertEqual(archive.import_dirs(src), [])
+            self.assertEqual(sorted(archive.keys()), [f"sweep/run_{i}" for i in range(5)])
+            archive.export_dirs(self.root / 'dst', filetype=YAML)
+
+        for i in range(5):
+            self.assertEqual(ExampleArgs.from_file(self.root / 'dst' / 'sweep' / f"run_{i}" / 'args.yaml'),
+                             self._args(i))
+
+    def test_registered_format(self):
+        args = self._args(7)
+        args.to_file(self.root / 'args.argpack')
+        self.assertEqual(ExampleArgs.from_file(self.root / 'args.argpack'), args)
+        self.assertEqual(ExampleArgs.from_bytes(args.to_bytes(ARGPACK), ARGPACK), args)
+
+if __name__ == '__main__': unittest.main()
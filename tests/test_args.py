@@ -1,7 +1,7 @@
 import os, sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-import argparse, contextlib, dataclasses, logging, shlex, shutil, tempfile, unittest
+import argparse, contextlib, dataclasses, logging, shlex, shutil, subprocess, tempfile, unittest
 from unittest.mock import patch
 from pathlib import Path
 
@@ -278,6 +278,43 @@ class TestArgs(unittest.TestCase):
 
         self.assertEqual(args, reloaded_args)
 
+    def test_compiled_spec_is_cached_per_class(self):
+        spec = ExampleArgsInferredArgparseSpec.compiled_spec()
+        self.assertIs(spec, ExampleArgsInferredArgparseSpec.compiled_spec())
+        self.assertEqual(spec.main_dir_arg, OUTPUT_DIR_ARG)
+        self.assertEqual(spec.args_filename, FILENAME_ARG)
+        self.assertEqual(
+            [f.name for f in spec.fields], [OUTPUT_DIR_ARG, 'do_bool_arg', 'int_arg', 'float_arg']
+        )
+
+        self.assertIsNot(spec, ExampleArgsCustomArgparseSpec.compiled_spec())
+
+        ExampleArgsInferredArgparseSpec.invalidate_spec_cache()
+        self.assertIsNot(spec, ExampleArgsInferredArgparseSpec.compiled_spec())
+
+    def test_from_argv(self):
+        argv = shlex.split(f"--{OUTPUT_DIR_ARG} {self.output_dir} --no_do_bool_arg --int_arg 3")
+        want_dict = {OUTPUT_DIR_ARG: self.output_dir, 'do_bool_arg': False, 'int_arg': 3, 'float_arg': 1.0}
+
+        for _ in range(3):
+            args = ExampleArgsInferredArgparseSpec.from_argv(argv, write_args_to_file=False)
+            self.assertEqual(vars(args), want_dict)
+
+        args = ExampleArgsInferredArgparseSpec.from_argv(argv, write_args_to_file=True)
+        reloaded_args = ExampleArgsInferredArgparseSpec.from_argv(
+            [f"--{OUTPUT_DIR_ARG}", self.output_dir, "--do_load_from_dir"]
+        )
+        self.assertEqual(args, reloaded_args)
+
+    def test_import_is_lazy(self):
+        # Feature modules (and their slow imports) are only imported once used.
+        lazy = ['concurrent.futures', 'hashlib', 'numpy', 'multisource_args.bulk', 'multisource_args.delta',
+                'multisource_args.fingerprint', 'multisource_args.instrument', 'multisource_args.sources']
+        code = f"import sys, multisource_args.args; print([m for m in {lazy!r} if m in sys.modules])"
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        out = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True)
+        self.assertEqual(out.stdout.strip(), '[]', out.stderr)
+
 if __name__ == '__main__':
     logging.basicConfig(stream=sys.stderr, level=logging.WARN)
     unittest.main(verbosity=0)
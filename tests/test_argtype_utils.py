@@ -0,0 +1,86 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse, subprocess, unittest
+
+from multisource_args.argtype_utils import *
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+LOG_STRS = {'info': 0, 'warning': 1, 'error': 2}
+
+class TestIntRange(unittest.TestCase):
+    def test_call(self):
+        fn = intlt((2, 5))
+        self.assertEqual(fn('3'), 3)
+        self.assertEqual(intlt(3)('0'), 0)
+        for bad in ('1', '5'):
+            with self.assertRaises(argparse.ArgumentTypeError): fn(bad)
+        with self.assertRaises(ValueError): fn('x')
+
+    def test_argparse_type(self):
+        parser = argparse.ArgumentParser(exit_on_error=False)
+        parser.add_argument('--n', type=intlt(3))
+        self.assertEqual(parser.parse_args(['--n', '2']).n, 2)
+        with self.assertRaises(argparse.ArgumentError): parser.parse_args(['--n', '3'])
+
+    def test_validate_batch(self):
+        fn = intlt((0, 10))
+        violations = fn.validate_batch([1, 10, 'x', -1, 10, 3])
+        self.assertEqual([(v.index, v.value) for v in violations], [(1, 10), (2, 'x'), (3, -1), (4, 10)])
+        self.assertEqual(violations[0].message, "10 must be in [0, 10)")
+        self.assertEqual(fn.validate_batch(range(10)), [])
+
+    @unittest.skipIf(np is None, "NumPy isn't installed.")
+    def test_validate_batch_numpy(self):
+        fn = intlt((0, 10))
+        values = np.array([[1, 12], [-3, 9]])
+        self.assertEqual([(v.index, v.value) for v in fn.validate_batch(values)], [(1, 12), (2, -3)])
+        self.assertEqual(
+            [(v.index, v.value) for v in fn.validate_batch(np.array(['1', '12', '1']))], [(1, '12')]
+        )
+
+class TestRemap(unittest.TestCase):
+    def test_call(self):
+        fn = remap(LOG_STRS)
+        self.assertEqual(fn('warning'), 1)
+        self.assertEqual(fn('2'), 2)
+        self.assertEqual(fn('02'), 2)
+        self.assertEqual(fn(1), 1)
+        with self.assertRaises(argparse.ArgumentTypeError): fn('debug')
+        with self.assertRaises(argparse.ArgumentTypeError): fn('3')
+
+    def test_values_take_precedence(self):
+        fn = remap({1: 2, 2: 3})
+        self.assertEqual(fn('2'), 2)
+        self.assertEqual(fn('1'), 2)
+
+    def test_options_are_copied(self):
+        options = dict(LOG_STRS)
+        fn = remap(options)
+        options['debug'] = 3
+        with self.assertRaises(argparse.ArgumentTypeError): fn('debug')
+
+    def test_validate_batch(self):
+        fn = remap(LOG_STRS)
+        violations = fn.validate_batch(['info', 'debug', '0', 'debug', None])
+        self.assertEqual([(v.index, v.value) for v in violations], [(1, 'debug'), (3, 'debug'), (4, None)])
+
+    @unittest.skipIf(np is None, "NumPy isn't installed.")
+    def test_validate_batch_numpy(self):
+        fn = remap(LOG_STRS)
+        values = np.array(['info', 'error', 'trace', 'info'])
+        self.assertEqual([(v.index, v.value) for v in fn.validate_batch(values)], [(2, 'trace')])
+
+class TestImports(unittest.TestCase):
+    def test_numpy_is_not_imported(self):
+        code = "import sys, multisource_args.argtype_utils; print('numpy' in sys.modules)"
+        out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+        self.assertEqual(out.stdout.strip(), 'False', out.stderr)
+
+if __name__ == '__main__': unittest.main()
@@ -0,0 +1,86 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import shutil, tempfile, unittest
+from pathlib import Path
+
+from multisource_args.args import *
+from multisource_args.bulk import LoadResult, find_args_files
+from multisource_args.serializers import REGISTRY
+
+@dataclass
+class ExampleArgs(BaseArgs):
+    output_dir:    str
+    do_bool_arg:  bool = True
+    int_arg:       int = 60000
+
+@dataclass
+class CustomLoaderArgs(ExampleArgs):
+    LOADERS_AND_DUMPERS = {YAML: (lambda f: {**REGISTRY[YAML][0](f), 'int_arg': -1}, *REGISTRY[YAML][1:])}
+
+class TestBulk(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+
+        self.want = {}
+        for i, ext in enumerate([JSON, PKL, YAML] * 4):
+            run_dir = self.root / f"group_{i % 2}" / f"run_{i}"
+            run_dir.mkdir(parents=True)
+            args = ExampleArgs(output_dir=str(run_dir), int_arg=i)
+            filepath = run_dir / f"{ARGS}.{ext}"
+            args.to_file(filepath)
+            self.want[filepath] = args
+
+        self.bad_path = self.root / "broken" / f"{ARGS}.{JSON}"
+        self.bad_path.parent.mkdir()
+        self.bad_path.write_text('{"output_dir": ')
+
+        # Not an args file, so should be ignored.
+        (self.root / "group_0" / "notes.json").write_text("{}")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def check_results(self, results):
+        results = list(results)
+        self.assertEqual({r.path for r in results}, {*self.want, self.bad_path})
+        for r in results:
+            if r.path == self.bad_path:
+                self.assertFalse(r.ok)
+                self.assertIsNone(r.args)
+            else:
+                self.assertTrue(r.ok, r.error)
+                self.assertEqual(r.args, self.want[r.path])
+
+    def test_find_args_files(self):
+        found = set(find_args_files(self.root, ARGS, [JSON, PKL, YAML]))
+        self.assertEqual(found, {*self.want, self.bad_path})
+
+        found = set(find_args_files(self.root, ARGS, [JSON, PKL, YAML], recursive=False))
+        self.assertEqual(found, set())
+
+    def test_load_many(self):
+        self.check_results(ExampleArgs.load_many(self.root, workers=2))
+
+    def test_load_many_explicit_paths(self):
+        paths = [self.root / "group_0", self.root / "group_1", self.bad_path]
+        self.check_results(ExampleArgs.load_many(paths, workers=3))
+
+    def test_load_many_process_pool(self):
+        self.check_results(ExampleArgs.load_many(str(self.root), workers=2, process_workers=2))
+
+    def test_load_many_process_pool_uses_class_loader(self):
+        path = self.root / "custom" / f"{ARGS}.{YAML}"
+        path.parent.mkdir()
+        CustomLoaderArgs(output_dir=str(path.parent)).to_file(path)
+        [result] = CustomLoaderArgs.load_many(path, workers=1, process_workers=1)
+        self.assertTrue(result.ok, result.error)
+        self.assertEqual(result.args.int_arg, -1)
+
+    def test_load_many_is_lazy(self):
+        results = ExampleArgs.load_many(self.root, workers=1)
+        self.assertIsInstance(next(results), LoadResult)
+        results.close()
+
+if __name__ == '__main__':
+    unittest.main(verbosity=0)
@@ -0,0 +1,143 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import copy, dataclasses, pickle, shutil, sys, tempfile, threading, unittest
+from pathlib import Path
+from typing import List
+from unittest.mock import patch
+
+from multisource_args.args import *
+from multisource_args.cache import LRU, ArgsFileCache
+
+@dataclass
+class ExampleArgs(BaseArgs):
+    output_dir:     str
+    int_arg:        int = 60000
+    list_arg: List[int] = dataclasses.field(default_factory=lambda: [1, 2, 3])
+
+# Module level, so instances can be pickled.
+@dataclass
+class SharedCachedArgs(ExampleArgs):
+    FILE_CACHE = ArgsFileCache(frozen=True)
+
+class TestArgsFileCache(unittest.TestCase):
+    def setUp(self):
+        self.output_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+    def build_class(self, **cache_kwargs):
+        @dataclass
+        class CachedArgs(ExampleArgs):
+            FILE_CACHE = ArgsFileCache(**cache_kwargs)
+        return CachedArgs
+
+    def test_hits_and_copies(self):
+        CachedArgs = self.build_class(maxsize=4)
+        filepath = self.output_dir / f"{ARGS}.{JSON}"
+        CachedArgs(output_dir=str(self.output_dir)).to_file(filepath)
+
+        first = CachedArgs.from_file(filepath)
+        second = CachedArgs.from_file(str(filepath))
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+
+        first.list_arg.append(4)
+        self.assertEqual(CachedArgs.from_file(filepath).list_arg, [1, 2, 3])
+
+        stats = CachedArgs.FILE_CACHE.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.currsize), (2, 1, 1))
+
+    def test_invalidates_on_rewrite(self):
+        CachedArgs = self.build_class()
+        for ext in [JSON, PKL, YAML]:
+            filepath = self.output_dir / f"{ARGS}.{ext}"
+            CachedArgs(output_dir=str(self.output_dir), int_arg=1).to_file(filepath)
+            self.assertEqual(CachedArgs.from_file(filepath).int_arg, 1)
+
+            # Same size, so this may well land in the same mtime tick; to_file must invalidate explicitly.
+            CachedArgs(output_dir=str(self.output_dir), int_arg=2).to_file(filepath)
+            self.assertEqual(CachedArgs.from_file(filepath).int_arg, 2)
+
+    def test_lru_eviction(self):
+        CachedArgs = self.build_class(maxsize=2)
+        paths = []
+        for i in range(3):
+            filepath = self.output_dir / f"{ARGS}_{i}.{JSON}"
+            CachedArgs(output_dir=str(self.output_dir), int_arg=i).to_file(filepath)
+            paths.append(filepath)
+
+        for filepath in paths: CachedArgs.from_file(filepath)
+        CachedArgs.from_file(paths[2])
+        CachedArgs.from_file(paths[0])
+
+        stats = CachedArgs.FILE_CACHE.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.evictions, stats.currsize), (1, 4, 2, 2))
+
+    def test_concurrent_get_and_evict(self):
+        CachedArgs = self.build_class(maxsize=1)
+        cache = CachedArgs.FILE_CACHE
+        paths = []
+        for i in range(2):
+            filepath = self.output_dir / f"{ARGS}_{i}.{JSON}"
+            CachedArgs(output_dir=str(self.output_dir), int_arg=i).to_file(filepath)
+            paths.append(filepath)
+
+        # The entry is evicted between being validated and being marked as recently used.
+        CachedArgs.from_file(paths[0])
+        check = cache._deps_unchanged
+        with patch.object(cache, '_deps_unchanged', lambda deps: cache.invalidate() or check(deps)):
+            self.assertEqual(CachedArgs.from_file(paths[0]).int_arg, 0)
+
+        errors, interval = [], sys.getswitchinterval()
+        def load(i):
+            try:
+                for _ in range(50): self.assertEqual(CachedArgs.from_file(paths[i % 2]).int_arg, i % 2)
+            except Exception as e: errors.append(e)
+
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=load, args=(i,)) for i in range(8)]
+            for t in threads: t.start()
+            for t in threads: t.join()
+        finally: sys.setswitchinterval(interval)
+        self.assertEqual(errors, [])
+
+    def test_frozen_shared_instances(self):
+        CachedArgs = SharedCachedArgs
+        filepath = self.output_dir / f"{ARGS}.{YAML}"
+        args = CachedArgs(output_dir=str(self.output_dir))
+        args.to_file(filepath)
+
+        shared = CachedArgs.from_file(filepath)
+        self.assertIs(shared, CachedArgs.from_file(filepath))
+        self.assertIsInstance(shared, CachedArgs)
+        self.assertEqual(shared, args)
+        self.assertEqual(args, shared)
+
+        with self.assertRaises(dataclasses.FrozenInstanceError): shared.int_arg = 3
+
+        for thawed in (copy.copy(shared), pickle.loads(pickle.dumps(shared))):
+            self.assertIs(type(thawed), CachedArgs)
+            thawed.int_arg = 3
+
+class TestLRU(unittest.TestCase):
+    def test_lru(self):
+        lru = LRU(maxsize=2)
+        self.assertEqual((lru.put('a', 1), lru.put('b', 2)), (0, 0))
+        self.assertEqual(lru.get('a'), 1)
+        self.assertEqual(lru.put('c', 3), 1) # Evicts 'b', the least recently used.
+        self.assertEqual((lru.get('b'), len(lru)), (None, 2))
+
+        lru.get('a', touch=False)
+        lru.touch('c', 3)
+        lru.touch('a', 'not its value')
+        lru.put('d', 4)
+        self.assertIsNone(lru.get('a'))
+
+        self.assertEqual(lru.remove_if(lambda key: key == 'c'), 1)
+        self.assertEqual((lru.pop('d'), lru.pop('d'), lru.clear()), (4, None, 0))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=0)
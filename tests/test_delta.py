@@ -0,0 +1,184 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json, shutil, tempfile, threading, unittest
+from pathlib import Path
+from typing import List
+from unittest.mock import patch
+
+from multisource_args.args import *
+from multisource_args.cache import ArgsFileCache
+from multisource_args.delta import BaseCache, DELTA_KEY
+from multisource_args.nested import is_loaded
+from multisource_args.sweep import Grid, Sweep
+
+@dataclass
+class ExampleArgs(BaseArgs):
+    output_dir:    str
+    do_bool_arg:  bool = True
+    int_arg:       int = 60000
+    values: List[int] = dataclasses.field(default_factory=lambda: [1, 2, 3])
+
+    BASE_CACHE = BaseCache()
+
+@dataclass
+class DataArgs(BaseArgs):
+    name:          str = 'mnist'
+    batch_size:    int = 32
+
+@dataclass
+class SectionArgs(BaseArgs):
+    output_dir:    str
+    int_arg:       int = 60000
+    data:     DataArgs = dataclasses.field(default_factory=DataArgs, metadata={'separate_file': True})
+    weights: List[float] = dataclasses.field(default_factory=list, metadata={'sidecar': True})
+
+    BASE_CACHE = BaseCache()
+
+class TestDelta(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.base_path = self.root / 'base_args.json'
+        self.base = ExampleArgs(output_dir=str(self.root), int_arg=7, values=[4, 5])
+        self.base.to_file(self.base_path)
+        ExampleArgs.BASE_CACHE.clear()
+
+    def tearDown(self): shutil.rmtree(self.root)
+
+    def test_round_trip(self):
+        for ext in (JSON, YAML, PKL):
+            run_dir = self.root / f"run_{ext}"
+            run_dir.mkdir()
+            args = ExampleArgs(output_dir=str(run_dir), int_arg=7, values=[4, 5], do_bool_arg=False)
+            args.to_file(run_dir / f"args.{ext}", base=self.base_path)
+            self.assertEqual(ExampleArgs.from_file(run_dir / f"args.{ext}"), args)
+
+        with open(self.root / 'run_json' / 'args.json') as f: stored = json.load(f)
+        self.assertEqual(set(stored), {'output_dir', 'do_bool_arg', DELTA_KEY})
+        self.assertEqual(stored[DELTA_KEY]['path'], '../base_args.json')
+
+    def test_base_is_loaded_once_and_not_shared(self):
+        for i in range(20):
+            (self.root / str(i)).mkdir()
+            ExampleArgs(output_dir=str(self.root / str(i)), values=[4, 5]).to_file(
+                self.root / str(i) / 'args.json', base=self.base_path
+            )
+
+        ExampleArgs.BASE_CACHE.clear()
+        ExampleArgs.BASE_CACHE.loads = 0
+        loaded = [r.args for r in ExampleArgs.load_many(self.root)]
+        self.assertEqual(len(loaded), 20)
+        self.assertEqual(ExampleArgs.BASE_CACHE.loads, 1)
+        self.assertEqual(sorted(a.int_arg for a in loaded), [60000] * 20)
+
+        loaded[0].values.append(6)
+        self.assertEqual(loaded[1].values, [4, 5])
+
+    def test_changed_base_is_detected(self):
+        (self.root / 'run').mkdir()
+        args = ExampleArgs(output_dir=str(self.root / 'run'))
+        args.to_file(self.root / 'run' / 'args.json', base=self.base_path)
+        self.assertEqual(ExampleArgs.from_file(self.root / 'run' / 'args.json'), args)
+
+        ExampleArgs(output_dir=str(self.root), int_arg=8).to_file(self.base_path)
+        with self.assertRaises(AssertionError): ExampleArgs.from_file(self.root / 'run' / 'args.json')
+
+    def test_changed_base_is_detected_through_file_cache(self):
+        (self.root / 'run').mkdir()
+        delta_path = self.root / 'run' / 'args.json'
+        args = ExampleArgs(output_dir=str(self.root / 'run'))
+        args.to_file(delta_path, base=self.base_path)
+
+        with patch.object(ExampleArgs, 'FILE_CACHE', ArgsFileCache()):
+            self.assertEqual(ExampleArgs.from_file(delta_path), args)
+            self.assertEqual(ExampleArgs.from_file(delta_path), args)
+            self.assertEqual(ExampleArgs.FILE_CACHE.stats().hits, 1)
+
+            ExampleArgs(output_dir=str(self.root), int_arg=8).to_file(self.base_path)
+            with self.assertRaises(AssertionError): ExampleArgs.from_file(delta_path)
+
+    def test_layered_bases_and_moves(self):
+        mid_path = self.root / 'mid_args.json'
+        mid = ExampleArgs(output_dir=str(self.root), int_arg=9, values=[4, 5])
+        mid.to_file(mid_path, base=self.base_path)
+
+        (self.root / 'run').mkdir()
+        args = ExampleArgs(output_dir='run', int_arg=9, do_bool_arg=False, values=[4, 5])
+        args.to_file(self.root / 'run' / 'args.json', base=mid_path)
+
+        moved = Path(tempfile.mkdtemp()) / 'moved'
+        try:
+            shutil.copytree(self.root, moved)
+            ExampleArgs.BASE_CACHE.clear()
+            self.assertEqual(ExampleArgs.from_file(moved / 'run' / 'args.json'), args)
+        finally:
+            shutil.rmtree(moved.parent)
+
+    def test_sweep(self):
+        sweep = Sweep(
+            ExampleArgs, self.root / 'sweep', base={'int_arg': 7}, axes=[Grid(do_bool_arg=[True, False])]
+        )
+        sweep.write(base_file=self.base_path)
+        got = sorted((r.args for r in ExampleArgs.load_many(self.root / 'sweep')), key=lambda a: a.output_dir)
+        self.assertEqual(got, list(sweep))
+
+    def test_sections_and_arrays_are_written_as_in_full_files(self):
+        base_path = self.root / 'sections.json'
+        SectionArgs(output_dir=str(self.root), weights=[0.5] * 100).to_file(base_path)
+        (self.root / 'run').mkdir()
+
+        args = SectionArgs(
+            output_dir=str(self.root / 'run'), data=DataArgs(name='imagenet'), weights=[0.25] * 100
+        )
+        args.to_file(self.root / 'run' / 'args.json', base=base_path)
+        with open(self.root / 'run' / 'args.json') as f: stored = json.load(f)
+        self.assertEqual(stored['data'], {'__file__': 'args.data.json'})
+        self.assertEqual(stored['weights'], {'__array__': 'args.json.weights.npy'})
+        self.assertEqual(SectionArgs.from_file(self.root / 'run' / 'args.json'), args)
+
+        # Sections and arrays equal to the base's are left out like any other field.
+        (self.root / 'same').mkdir()
+        args = SectionArgs(output_dir=str(self.root / 'same'), weights=[0.5] * 100)
+        args.to_file(self.root / 'same' / 'args.json', base=base_path)
+        with open(self.root / 'same' / 'args.json') as f: stored = json.load(f)
+        self.assertEqual(set(stored), {'output_dir', DELTA_KEY})
+        self.assertEqual(SectionArgs.from_file(self.root / 'same' / 'args.json'), args)
+
+    def test_unloaded_sections_stay_unloaded(self):
+        base_path = self.root / 'sections.json'
+        SectionArgs(output_dir=str(self.root)).to_file(base_path)
+        args = SectionArgs(output_dir=str(self.root), data=DataArgs(name='imagenet'))
+        args.to_file(self.root / 'args.json')
+
+        args = SectionArgs.from_file(self.root / 'args.json')
+        SectionArgs.BASE_CACHE.get(SectionArgs, base_path) # Loading the base itself loads its sections.
+        (self.root / 'run').mkdir()
+        with patch.object(DataArgs, 'from_file', wraps=DataArgs.from_file) as from_file:
+            args.to_file(self.root / 'run' / 'args.json', base=base_path)
+            from_file.assert_not_called()
+        self.assertFalse(is_loaded(args, 'data'))
+        self.assertEqual(SectionArgs.from_file(self.root / 'run' / 'args.json').data.name, 'imagenet')
+
+    def test_different_bases_load_concurrently(self):
+        other_path = self.root / 'other_args.json'
+        ExampleArgs(output_dir=str(self.root), int_arg=8).to_file(other_path)
+        ExampleArgs.BASE_CACHE.clear()
+        ExampleArgs.BASE_CACHE.loads = 0
+
+        # Each load waits for the other to start, which only happens if they aren't serialized.
+        barrier, from_file = threading.Barrier(2, timeout=5), ExampleArgs.from_file.__func__
+        def load(cls, path):
+            barrier.wait()
+            return from_file(cls, path)
+
+        with patch.object(ExampleArgs, 'from_file', classmethod(load)):
+            threads = [
+                threading.Thread(target=ExampleArgs.BASE_CACHE.get, args=(ExampleArgs, path))
+                for path in (self.base_path, other_path)
+            ]
+            for t in threads: t.start()
+            for t in threads: t.join()
+        self.assertFalse(barrier.broken)
+        self.assertEqual(ExampleArgs.BASE_CACHE.loads, 2)
+
+if __name__ == '__main__': unittest.main()
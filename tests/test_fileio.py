@@ -0,0 +1,102 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json, shutil, tempfile, unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from multisource_args.args import *
+from multisource_args import fileio
+from multisource_args.fileio import FSYNC_ALL, FSYNC_FILE, NO_FSYNC, WriteBatch, atomic_write
+
+@dataclass
+class ExampleArgs(BaseArgs):
+    output_dir:    str
+    int_arg:       int = 60000
+
+class Unserializable: pass
+
+class TestFileIO(unittest.TestCase):
+    def setUp(self):
+        self.output_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+    def test_atomic_write_preserves_old_contents_on_failure(self):
+        filepath = self.output_dir / f"{ARGS}.{JSON}"
+        ExampleArgs(output_dir=str(self.output_dir), int_arg=1).to_file(filepath)
+
+        with self.assertRaises(TypeError):
+            ExampleArgs(output_dir=str(self.output_dir), int_arg=Unserializable()).to_file(filepath)
+
+        self.assertEqual(ExampleArgs.from_file(filepath).int_arg, 1)
+        self.assertEqual(os.listdir(self.output_dir), [filepath.name])
+
+    def test_fsync_policies(self):
+        filepath = self.output_dir / "out.json"
+        for policy, want_fsyncs in [(NO_FSYNC, 0), (FSYNC_FILE, 1), (FSYNC_ALL, 2)]:
+            with patch('os.fsync', wraps=os.fsync) as fsync:
+                atomic_write(filepath, lambda f: json.dump({'policy': policy}, f), binary=False, fsync=policy)
+                self.assertEqual(fsync.call_count, want_fsyncs)
+            self.assertEqual(json.loads(filepath.read_text()), {'policy': policy})
+
+        with self.assertRaises(AssertionError): WriteBatch(fsync='sometimes')
+
+    def test_write_many(self):
+        items = []
+        for i in range(10):
+            run_dir = self.output_dir / f"run_{i % 3}"
+            run_dir.mkdir(exist_ok=True)
+            items.append((ExampleArgs(output_dir=str(run_dir), int_arg=i), run_dir / f"{ARGS}_{i}.{YAML}"))
+
+        with patch('os.fsync', wraps=os.fsync) as fsync:
+            ExampleArgs.write_many(iter(items), fsync=FSYNC_ALL, batch_size=4)
+            # One per file, plus one per directory touched by each of the 3 batches.
+            self.assertEqual(fsync.call_count, 10 + 3 + 3 + 2)
+
+        for args, filepath in items: self.assertEqual(ExampleArgs.from_file(filepath), args)
+        self.assertFalse([p for p in self.output_dir.rglob('*.tmp')])
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), "Directory fds are only guaranteed on Linux")
+    def test_dir_fds(self):
+        self.assertTrue(fileio.USE_DIR_FD)
+        fd_dir = Path('/proc/self/fd')
+        open_fds = len(os.listdir(fd_dir))
+
+        items = []
+        for i in range(200):
+            run_dir = self.output_dir / f"run_{i}"
+            run_dir.mkdir()
+            items.append((ExampleArgs(output_dir=str(run_dir), int_arg=i), run_dir / f"{ARGS}.{JSON}"))
+
+        with WriteBatch(fsync=FSYNC_ALL, batch_size=16) as batch:
+            for i, (args, filepath) in enumerate(items):
+                args.to_file(filepath, batch=batch)
+                # Directory handles only live until the next flush.
+                self.assertLessEqual(len(batch._dirs), 16)
+                self.assertLessEqual(len(os.listdir(fd_dir)), open_fds + 2 * 16 + 1)
+
+        self.assertEqual(len(os.listdir(fd_dir)), open_fds)
+        for args, filepath in items: self.assertEqual(ExampleArgs.from_file(filepath), args)
+        self.assertFalse([p for p in self.output_dir.rglob('*.tmp')])
+
+    def test_without_dir_fds(self):
+        filepath = self.output_dir / f"{ARGS}.{JSON}"
+        with patch.object(fileio, 'USE_DIR_FD', False):
+            for i in range(2):
+                ExampleArgs(output_dir=str(self.output_dir), int_arg=i).to_file(filepath, fsync=FSYNC_ALL)
+        self.assertEqual(ExampleArgs.from_file(filepath).int_arg, 1)
+        self.assertEqual(os.listdir(self.output_dir), [filepath.name])
+
+    def test_batch_discards_on_error(self):
+        filepath = self.output_dir / f"{ARGS}.{JSON}"
+        with self.assertRaises(RuntimeError):
+            with WriteBatch() as batch:
+                ExampleArgs(output_dir=str(self.output_dir)).to_file(filepath, batch=batch)
+                raise RuntimeError("Preempted!")
+
+        self.assertEqual(os.listdir(self.output_dir), [])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=0)
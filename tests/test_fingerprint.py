@@ -0,0 +1,107 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import dataclasses, shutil, tempfile, unittest
+from pathlib import Path
+from typing import Dict, List
+
+from multisource_args.args import *
+from multisource_args.fingerprint import canonicalize, forget
+from multisource_args.index import ArgsIndex
+
+@dataclass
+class ExampleArgs(BaseArgs):
+    output_dir:            str
+    do_bool_arg:          bool = True
+    int_arg:               int = 60000
+    float_arg:           float = 1.0
+    list_arg:        List[int] = dataclasses.field(default_factory=lambda: [1, 2])
+    dict_arg:   Dict[int, str] = dataclasses.field(default_factory=lambda: {1: 'a', 2: 'b'})
+
+class TestFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_canonicalize(self):
+        self.assertEqual(
+            canonicalize({'a': (1, 2.0, -0.0), 2: Path('/x'), 'b': float('nan'), 'c': {3, 1}}),
+            {'a': [1, 2, 0], '2': '/x', 'b': 'NaN', 'c': [1, 3]}
+        )
+        with self.assertRaises(TypeError): canonicalize(object())
+
+    def test_format_independence(self):
+        # Loaded back from JSON, `dict_arg` has string keys.
+        args = ExampleArgs(output_dir=str(self.root), float_arg=4.0)
+        fingerprints = {args.fingerprint(include_output_dir=True)}
+        for ext in [JSON, PKL, YAML]:
+            filepath = self.root / f"{ARGS}.{ext}"
+            args.to_file(filepath)
+            fingerprints.add(ExampleArgs.from_file(filepath).fingerprint(include_output_dir=True))
+        self.assertEqual(len(fingerprints), 1)
+
+    def test_output_dir_excluded_by_default(self):
+        a = ExampleArgs(output_dir='run_a')
+        b = ExampleArgs(output_dir='run_b')
+        self.assertEqual(a.fingerprint(), b.fingerprint())
+        self.assertNotEqual(a.fingerprint(include_output_dir=True), b.fingerprint(include_output_dir=True))
+        self.assertNotEqual(a.fingerprint(), ExampleArgs(output_dir='run_a', int_arg=3).fingerprint())
+
+    def test_memoization(self):
+        args = ExampleArgs(output_dir='run')
+        first = args.fingerprint()
+        self.assertIs(first, args.fingerprint())
+        self.assertNotIn('_fingerprint', vars(args))
+        self.assertEqual(set(vars(args)), {f.name for f in dataclasses.fields(ExampleArgs)})
+
+        args.int_arg = 4
+        self.assertNotEqual(first, args.fingerprint())
+        args.int_arg = 60000
+        self.assertEqual(first, args.fingerprint())
+
+        args.dict_arg[3] = 'c'
+        forget(args)
+        self.assertNotEqual(first, args.fingerprint())
+
+    def check_dedup(self, args_cls):
+        argv = ["--output_dir", str(self.root / "run_0"), "--int_arg", "3"]
+        original = args_cls.from_argv(argv, dedup=True)
+
+        dup_argv = ["--output_dir", str(self.root / "run_1"), "--int_arg", "3"]
+        duplicate = args_cls.from_argv(dup_argv, dedup=True)
+        self.assertEqual(duplicate, original)
+        self.assertFalse((self.root / "run_1").exists())
+
+        new_argv = ["--output_dir", str(self.root / "run_2"), "--int_arg", "4"]
+        different = args_cls.from_argv(new_argv, dedup=True)
+        self.assertEqual(different.output_dir, str(self.root / "run_2"))
+        self.assertTrue((self.root / "run_2").is_dir())
+
+        # Without dedup, a new run is always made.
+        self.assertEqual(args_cls.from_argv(dup_argv).output_dir, str(self.root / "run_1"))
+
+    def test_dedup_from_argv(self):
+        @dataclass
+        class InferredArgs(BaseArgs):
+            output_dir:    str
+            int_arg:       int = 60000
+            float_arg:   float = 1.0
+
+        self.check_dedup(InferredArgs)
+
+    def test_dedup_from_argv_with_index(self):
+        with ArgsIndex(self.root / "index.sqlite") as index:
+            @dataclass
+            class IndexedArgs(BaseArgs):
+                output_dir:    str
+                int_arg:       int = 60000
+                INDEX = index
+
+            self.check_dedup(IndexedArgs)
+            target = IndexedArgs(output_dir='x', int_arg=3).fingerprint()
+            self.assertEqual(len(index.find_fingerprint(target)), 2)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=0)
@@ -0,0 +1,84 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import shutil, tempfile, unittest
+from pathlib import Path
+
+from multisource_args.args import *
+from multisource_args.index import ArgsIndex
+
+@dataclass
+class ExampleArgs(BaseArgs):
+    output_dir:    str
+    do_bool_arg:  bool = True
+    num_layers:    int = 2
+    float_arg:   float = 1.0
+
+class TestArgsIndex(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.index = ArgsIndex(self.root / "index.sqlite")
+
+        self.paths = []
+        for i in range(6):
+            run_dir = self.root / "runs" / f"run_{i}"
+            run_dir.mkdir(parents=True)
+            args = ExampleArgs(
+                output_dir=str(run_dir), do_bool_arg=(i % 2 == 0), num_layers=i % 3, float_arg=i / 10
+            )
+            args.to_file(run_dir / f"{ARGS}.{JSON}")
+            self.paths.append((run_dir / f"{ARGS}.{JSON}").resolve())
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.root)
+
+    def test_refresh_and_query(self):
+        self.assertEqual(self.index.refresh(ExampleArgs, self.root / "runs"), [])
+        self.assertEqual(len(self.index), 6)
+
+        self.assertEqual(self.index.query(num_layers=2), [self.paths[2], self.paths[5]])
+        self.assertEqual(self.index.query(num_layers=2, float_arg__lt=0.5), [self.paths[2]])
+        self.assertEqual(self.index.query(('float_arg', '>=', 0.3), do_bool_arg=True), [self.paths[4]])
+        self.assertEqual(self.index.query(num_layers__in=[0, 1]), [self.paths[i] for i in (0, 1, 3, 4)])
+        self.assertEqual(self.index.query(output_dir__like='%run_3'), [self.paths[3]])
+        self.assertEqual(self.index.query(num_layers=7), [])
+        self.assertEqual(len(self.index.query(args_cls=ExampleArgs)), 6)
+
+        with self.assertRaises(AssertionError): self.index.query(num_layers__approx=2)
+
+        [(path, args)] = list(self.index.query_args(ExampleArgs, num_layers=0, do_bool_arg=False))
+        self.assertEqual(path, self.paths[3])
+        self.assertEqual(args, ExampleArgs.from_file(path))
+
+    def test_refresh_is_incremental(self):
+        self.index.refresh(ExampleArgs, self.root / "runs")
+
+        args = ExampleArgs.from_file(self.paths[0])
+        args.num_layers = 7
+        args.to_file(self.paths[0])
+        shutil.rmtree(self.paths[1].parent)
+
+        (self.root / "runs" / "run_0" / f"{ARGS}.{JSON}").touch()
+        self.assertFalse(self.index.is_current(self.paths[0]))
+        self.assertTrue(self.index.is_current(self.paths[2]))
+
+        self.index.refresh(ExampleArgs, self.root / "runs")
+        self.assertEqual(len(self.index), 5)
+        self.assertEqual(self.index.query(num_layers=7), [self.paths[0]])
+        self.assertEqual(self.index.query(num_layers=0), [self.paths[3]])
+
+    def test_to_file_records_into_index(self):
+        @dataclass
+        class IndexedArgs(ExampleArgs):
+            INDEX = self.index
+
+        run_dir = self.root / "runs" / "indexed"
+        args = IndexedArgs.from_argv(["--output_dir", str(run_dir), "--num_layers", "5"])
+
+        filepath = (run_dir / f"{ARGS}.{JSON}").resolve()
+        self.assertEqual(self.index.query(num_layers=5), [filepath])
+        self.assertTrue(self.index.is_current(filepath))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=0)
@@ -0,0 +1,108 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import contextlib, json, logging, shutil, subprocess, tempfile, unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from multisource_args.args import *
+from multisource_args import instrument
+from multisource_args.instrument import JsonlSink, LoggingSink, MemorySink
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+@dataclass
+class ExampleArgs(BaseArgs):
+    output_dir:    str
+    do_bool_arg:  bool = True
+    int_arg:       int = 60000
+    float_arg:   float = 1.0
+
+class TestInstrument(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_disabled_by_default(self):
+        self.assertFalse(instrument.ACTIVE)
+        self.assertFalse(instrument.span('parse'))
+        with instrument.span('parse') as sp: self.assertIs(sp, instrument.NULL_SPAN)
+
+    def test_disabled_file_io_skips_spans(self):
+        args = ExampleArgs(output_dir=str(self.root))
+        with patch.object(instrument, 'span') as span:
+            args.to_file(self.root / f"{ARGS}.{JSON}")
+            self.assertEqual(ExampleArgs.from_file(self.root / f"{ARGS}.{JSON}"), args)
+        span.assert_not_called()
+
+    def test_phases(self):
+        ExampleArgs.invalidate_spec_cache()
+        run_dir = self.root / "run"
+        argv = ["--output_dir", str(run_dir), "--int_arg", "3", "--float_arg", "0.5"]
+
+        with BaseArgs.instrumented() as sink:
+            self.assertTrue(instrument.ACTIVE)
+            args = ExampleArgs.from_argv(argv)
+            ExampleArgs.from_file(run_dir / f"{ARGS}.{JSON}")
+        self.assertFalse(instrument.ACTIVE)
+
+        phases = [e.phase for e in sink.events]
+        want_phases = [
+            'spec_build', 'convert', 'convert', 'convert', 'parse', 'makedirs', 'dump', 'from_argv', 'load'
+        ]
+        self.assertEqual(phases, want_phases)
+        converted = [e.attrs['field'] for e in sink.events if e.phase == 'convert']
+        self.assertEqual(converted, ['output_dir', 'int_arg', 'float_arg'])
+
+        size = (run_dir / f"{ARGS}.{JSON}").stat().st_size
+        self.assertEqual([e.bytes for e in sink.events if e.phase in ('dump', 'load')], [size, size])
+
+        summary = sink.summary()
+        self.assertEqual(summary['convert']['count'], 3)
+        self.assertEqual(summary['load']['bytes'], size)
+        self.assertTrue(all(e.duration_s >= 0 for e in sink.events))
+
+        # Cached spec, so no spec_build; nothing is recorded once disabled.
+        with BaseArgs.instrumented() as sink:
+            ExampleArgs.from_argv(argv, write_args_to_file=False)
+        self.assertNotIn('spec_build', [e.phase for e in sink.events])
+
+    def test_errors_are_recorded(self):
+        with BaseArgs.instrumented() as sink:
+            with self.assertRaises(SystemExit), open(os.devnull, 'w') as f, contextlib.redirect_stderr(f):
+                ExampleArgs.from_argv(["--output_dir", "x", "--int_arg", "three"], write_args_to_file=False)
+        [parse] = [e for e in sink.events if e.phase == 'parse']
+        self.assertEqual(parse.attrs['error'], 'SystemExit')
+
+    def test_sinks(self):
+        trace = self.root / "trace.jsonl"
+        log = logging.getLogger("TestInstrument.test_sinks")
+        with self.assertLogs(log, level=logging.DEBUG) as logs:
+            with BaseArgs.instrumented(JsonlSink(trace), LoggingSink(log), MemorySink()):
+                ExampleArgs(output_dir=str(self.root)).to_file(self.root / f"{ARGS}.{YAML}")
+
+        [event] = [json.loads(line) for line in trace.read_text().splitlines()]
+        self.assertEqual(event['phase'], 'dump')
+        self.assertEqual(event['attrs']['format'], YAML)
+        self.assertIn('dump', logs.output[0])
+        self.assertEqual(instrument.sinks(), [])
+
+    def test_env_var(self):
+        trace = self.root / "trace.jsonl"
+        code = (
+            "from multisource_args.args import *\n"
+            "@dataclass\n"
+            "class A(BaseArgs):\n"
+            "    output_dir: str\n"
+            f"A.from_argv(['--output_dir', {str(self.root)!r}], write_args_to_file=False)\n"
+        )
+        env = {**os.environ, instrument.ENV_VAR: str(trace)}
+        subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, check=True)
+
+        phases = [json.loads(line)['phase'] for line in trace.read_text().splitlines()]
+        self.assertEqual(phases, ['spec_build', 'convert', 'parse', 'from_argv'])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=0)
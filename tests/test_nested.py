@@ -0,0 +1,87 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json, shutil, tempfile, unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from multisource_args.args import *
+from multisource_args.nested import is_loaded
+
+@dataclass
+class ModelArgs(BaseArgs):
+    num_layers:    int = 2
+    do_dropout:   bool = True
+
+@dataclass
+class DataArgs(BaseArgs):
+    name:          str = 'mnist'
+    batch_size:    int = 32
+
+@dataclass
+class ExampleArgs(BaseArgs):
+    output_dir:    str
+    int_arg:       int = 60000
+    model:   ModelArgs = dataclasses.field(default_factory=lambda: ModelArgs(num_layers=3))
+    data:     DataArgs = dataclasses.field(default_factory=DataArgs, metadata={'separate_file': True})
+
+class TestNested(unittest.TestCase):
+    def setUp(self): self.root = Path(tempfile.mkdtemp())
+    def tearDown(self): shutil.rmtree(self.root)
+
+    def test_round_trip(self):
+        args = ExampleArgs(output_dir=str(self.root), model=ModelArgs(num_layers=5, do_dropout=False))
+        self.assertEqual(args.to_dict()['model'], {'num_layers': 5, 'do_dropout': False})
+
+        for ext in (JSON, YAML, PKL):
+            args.to_file(self.root / f"args.{ext}")
+            self.assertTrue((self.root / f"args.data.{ext}").is_file())
+            self.assertEqual(ExampleArgs.from_file(self.root / f"args.{ext}"), args)
+            self.assertEqual(ExampleArgs.from_bytes(args.to_bytes(ext), ext), args)
+
+        with open(self.root / 'args.json') as f: stored = json.load(f)
+        self.assertEqual(stored['model'], {'num_layers': 5, 'do_dropout': False})
+        self.assertEqual(stored['data'], {'__file__': 'args.data.json'})
+
+    def test_lazy_loading(self):
+        args = ExampleArgs(output_dir=str(self.root), data=DataArgs(name='imagenet'))
+        args.to_file(self.root / 'args.json')
+
+        with patch.object(DataArgs, 'from_file', wraps=DataArgs.from_file) as from_file:
+            args = ExampleArgs.from_file(self.root / 'args.json')
+            self.assertFalse(is_loaded(args, 'data'))
+            self.assertEqual(args.model.num_layers, 3)
+            from_file.assert_not_called()
+
+            # Rewriting the parent elsewhere keeps the section a (re-pointed) reference without loading it.
+            (self.root / 'copy').mkdir()
+            args.to_file(self.root / 'copy' / 'args.json')
+            from_file.assert_not_called()
+
+            self.assertEqual(args.data.name, 'imagenet')
+            self.assertTrue(is_loaded(args, 'data'))
+            from_file.assert_called_once()
+
+        with open(self.root / 'copy' / 'args.json') as f:
+            self.assertEqual(json.load(f)['data'], {'__file__': '../args.data.json'})
+        self.assertEqual(ExampleArgs.from_file(self.root / 'copy' / 'args.json').data.name, 'imagenet')
+        with self.assertRaises(AttributeError): args.not_a_field
+
+    def test_dotted_flags(self):
+        argv = [
+            '--output_dir', str(self.root / 'run'), '--model.num_layers', '4', '--model.no_do_dropout',
+            '--data.batch_size', '8',
+        ]
+        args = ExampleArgs.from_argv(argv)
+        self.assertEqual(args.model, ModelArgs(num_layers=4, do_dropout=False))
+        self.assertEqual(args.data, DataArgs(batch_size=8))
+        self.assertEqual(ExampleArgs.from_file(self.root / 'run' / 'args.json'), args)
+
+        defaults = ExampleArgs.from_argv(['--output_dir', str(self.root / 'run2')], write_args_to_file=False)
+        self.assertEqual(defaults.model, ModelArgs(num_layers=3))
+
+        help_text = ExampleArgs.compiled_spec().parser.format_help()
+        for flag in ('--model.num_layers', '--model.do_dropout', '--model.no_do_dropout', '--data.name'):
+            self.assertIn(flag, help_text)
+
+if __name__ == '__main__': unittest.main()
@@ -0,0 +1,104 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import shutil, subprocess, tempfile, unittest
+from pathlib import Path
+
+from multisource_args.args import *
+from multisource_args.serializers import Codec, SerializerRegistry
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+@dataclass
+class ExampleArgs(BaseArgs):
+    output_dir:    str
+    do_bool_arg:  bool = True
+    int_arg:       int = 60000
+    float_arg:   float = 0.1
+
+class TestSerializers(unittest.TestCase):
+    def setUp(self):
+        self.output_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+    def run_python(self, code):
+        out = subprocess.run(
+            [sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        return out.stdout.strip()
+
+    def test_backends_are_imported_lazily(self):
+        filepath = self.output_dir / f"{ARGS}.{JSON}"
+        ExampleArgs(output_dir=str(self.output_dir)).to_file(filepath)
+
+        code = (
+            "import sys\n"
+            "from multisource_args.args import BaseArgs\n"
+            "print('yaml' in sys.modules)\n"
+            "BaseArgs.LOADERS_AND_DUMPERS['json']\n"
+            "print('yaml' in sys.modules)\n"
+            "BaseArgs.LOADERS_AND_DUMPERS['yaml']\n"
+            "print('yaml' in sys.modules)\n"
+        )
+        self.assertEqual(self.run_python(code).split(), ['False', 'False', 'True'])
+
+    def test_codecs_interoperate(self):
+        args = ExampleArgs(output_dir=str(self.output_dir))
+        for ext in [JSON, YAML]:
+            codecs = REGISTRY.codecs(ext)
+            self.assertGreaterEqual(len(codecs), 1)
+            try:
+                for writer in codecs:
+                    REGISTRY.prefer(ext, writer.name)
+                    filepath = self.output_dir / f"{ARGS}.{ext}"
+                    args.to_file(filepath)
+                    for reader in codecs:
+                        REGISTRY.prefer(ext, reader.name)
+                        self.assertEqual(REGISTRY.selected(ext).name, reader.name)
+                        self.assertEqual(ExampleArgs.from_file(filepath), args)
+            finally:
+                REGISTRY.prefer(ext, None)
+
+    def test_default_json_round_trips_exactly(self):
+        self.assertEqual(REGISTRY.selected(JSON).name, 'json')
+        filepath = self.output_dir / f"{ARGS}.{JSON}"
+        for float_arg in (float('nan'), float('inf'), float('-inf')):
+            args = ExampleArgs(output_dir=str(self.output_dir), int_arg=2**70 + 1, float_arg=float_arg)
+            args.to_file(filepath)
+            loaded = ExampleArgs.from_file(filepath)
+            self.assertEqual(loaded.int_arg, 2**70 + 1)
+            self.assertEqual(repr(loaded.float_arg), repr(float_arg))
+            self.assertIn('\n    "output_dir"', filepath.read_text())
+
+    def test_registry_selection(self):
+        registry = SerializerRegistry()
+        registry.register('fmt', 'slow', lambda: ('slow_load', 'slow_dump'), uses_binary=False)
+        registry.register('fmt', 'fast', lambda: ('fast_load', 'fast_dump'), uses_binary=True, priority=5)
+        registry.register(
+            'fmt', 'missing', lambda: ('x', 'y'), uses_binary=False, priority=10,
+            requires=('surely_not_an_installed_module',)
+        )
+
+        def broken():
+            raise ImportError("Not actually usable.")
+        registry.register('fmt', 'broken', broken, uses_binary=False, priority=7)
+
+        self.assertEqual(registry['fmt'], ('fast_load', 'fast_dump', True))
+        self.assertEqual(registry.selected('fmt').name, 'fast')
+        self.assertEqual([c.name for c in registry.codecs('fmt')], ['broken', 'fast', 'slow'])
+
+        registry.prefer('fmt', 'slow')
+        self.assertEqual(registry['fmt'], ('slow_load', 'slow_dump', False))
+        registry.prefer('fmt', None)
+        self.assertEqual(registry.selected('fmt').name, 'fast')
+
+        registry.register('other', 'missing', lambda: (None, None), False, requires=('surely_not_installed',))
+        self.assertEqual(list(registry), ['fmt'])
+        self.assertNotIn('other', registry)
+        with self.assertRaises(KeyError): registry['other']
+        with self.assertRaises(AssertionError): registry.prefer('fmt', 'nonexistent')
+
+if __name__ == '__main__':
+    unittest.main(verbosity=0)
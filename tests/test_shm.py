@@ -0,0 +1,72 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import multiprocessing, pickle, shutil, tempfile, unittest
+from pathlib import Path
+from typing import List
+
+from multisource_args.args import *
+from multisource_args.shm import ArgsBroadcast, SharedArgsView, attach
+
+@dataclass
+class ExampleArgs(BaseArgs):
+    output_dir:    str
+    do_bool_arg:  bool = True
+    int_arg:       int = 60000
+
+@dataclass
+class OtherArgs(BaseArgs):
+    output_dir: str
+    values:     List[int] = dataclasses.field(default_factory=list)
+
+    DEFAULT_EXTENSION = YAML
+
+def _read_in_worker(handle, i):
+    with attach(handle) as view: return view[i].to_dict()
+
+class TestShm(unittest.TestCase):
+    def test_round_trip(self):
+        batch = [ExampleArgs(output_dir=f"/tmp/run_{i}", int_arg=i) for i in range(10)]
+        batch.append(OtherArgs(output_dir='/tmp/other', values=[1, 2, 3]))
+
+        with ArgsBroadcast(batch) as broadcast:
+            self.assertEqual(len(broadcast), 11)
+            self.assertEqual(broadcast.handle.filetypes, (JSON, YAML))
+
+            handle = pickle.loads(pickle.dumps(broadcast.handle))
+            with attach(handle) as view:
+                self.assertEqual(len(view), 11)
+                self.assertEqual(list(view), batch)
+                self.assertEqual(view[-1], batch[-1])
+                self.assertIsNot(view[0], view[0])
+                with self.assertRaises(IndexError): view[11]
+
+    def test_single_instance(self):
+        args = ExampleArgs(output_dir='/tmp/run', do_bool_arg=False)
+        with args.broadcast(filetype=PKL) as broadcast:
+            with attach(broadcast.handle) as view: self.assertEqual(list(view), [args])
+
+    def test_unlinked_on_exit(self):
+        with ArgsBroadcast([ExampleArgs(output_dir='/tmp/run')]) as broadcast: handle = broadcast.handle
+        with self.assertRaises(FileNotFoundError): SharedArgsView(handle)
+
+    def test_workers(self):
+        batch = [ExampleArgs(output_dir=f"/tmp/run_{i}", int_arg=i) for i in range(8)]
+        ctx = multiprocessing.get_context('fork')
+        with ArgsBroadcast(batch) as broadcast:
+            with ctx.Pool(2) as pool:
+                got = pool.starmap(_read_in_worker, [(broadcast.handle, i) for i in range(8)])
+        self.assertEqual(got, [a.to_dict() for a in batch])
+
+    def test_to_bytes_matches_to_file(self):
+        root = Path(tempfile.mkdtemp())
+        try:
+            args = ExampleArgs(output_dir=str(root), int_arg=3)
+            for ext in ExampleArgs.LOADERS_AND_DUMPERS:
+                args.to_file(root / f"args.{ext}")
+                self.assertEqual(args.to_bytes(ext), (root / f"args.{ext}").read_bytes())
+                self.assertEqual(ExampleArgs.from_bytes(args.to_bytes(ext), ext), args)
+        finally:
+            shutil.rmtree(root)
+
+if __name__ == '__main__': unittest.main()
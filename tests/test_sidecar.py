@@ -0,0 +1,179 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import array, copy, json, pickle, shutil, subprocess, tempfile, unittest
+from pathlib import Path
+from typing import List
+from unittest.mock import patch
+
+from multisource_args.args import *
+from multisource_args import sidecar
+from multisource_args.sidecar import MappedArray
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+@dataclass
+class ExampleArgs(BaseArgs):
+    output_dir:        str
+    class_weights:     List[float] = dataclasses.field(default_factory=list)
+    vocab_ids:         List[int] = dataclasses.field(default_factory=list)
+    feature_mask:      List[bool] = dataclasses.field(default_factory=list)
+    labels:            List[str] = dataclasses.field(default_factory=list)
+    inline_ids:        List[int] = dataclasses.field(default_factory=list, metadata={'sidecar': False})
+
+    SIDECAR_MIN_ITEMS = 1024
+
+@dataclass
+class DefaultArgs(BaseArgs):
+    output_dir:        str
+    values:            List[int] = dataclasses.field(default_factory=list)
+    opted_in:          List[int] = dataclasses.field(default_factory=list, metadata={'sidecar': True})
+
+def example(root, n=2000):
+    return ExampleArgs(
+        output_dir=str(root), class_weights=[i / 7 for i in range(n)], vocab_ids=list(range(-5, n - 5)),
+        feature_mask=[i % 3 == 0 for i in range(n)], labels=['a'] * n, inline_ids=list(range(n)),
+    )
+
+class TestSidecar(unittest.TestCase):
+    def setUp(self): self.root = Path(tempfile.mkdtemp())
+    def tearDown(self): shutil.rmtree(self.root)
+
+    def test_round_trip(self):
+        args = example(self.root)
+        for ext in (JSON, YAML, PKL):
+            args.to_file(self.root / f"args.{ext}")
+            loaded = ExampleArgs.from_file(self.root / f"args.{ext}")
+            self.assertEqual(loaded, args)
+            self.assertEqual(loaded.to_dict(), args.to_dict())
+            self.assertEqual(loaded.fingerprint(), args.fingerprint())
+
+            for name in ('class_weights', 'vocab_ids', 'feature_mask'):
+                self.assertTrue((self.root / f"args.{ext}.{name}.npy").is_file())
+                self.assertIsInstance(getattr(loaded, name), MappedArray)
+            self.assertEqual(loaded.vocab_ids[3], -2)
+            self.assertEqual(len(loaded.class_weights), 2000)
+            self.assertIsInstance(loaded.labels, list)
+            self.assertIsInstance(loaded.inline_ids, list)
+
+        contents = json.loads((self.root / 'args.json').read_text())
+        self.assertEqual(contents['vocab_ids'], {'__array__': 'args.json.vocab_ids.npy'})
+        self.assertEqual(contents['inline_ids'], list(range(2000)))
+
+    def test_read_only(self):
+        args = example(self.root)
+        args.to_file(self.root / 'args.json')
+        loaded = ExampleArgs.from_file(self.root / 'args.json')
+        with self.assertRaises(TypeError): loaded.vocab_ids[0] = 1
+        data = loaded.vocab_ids.data
+        self.assertTrue(data.readonly if isinstance(data, memoryview) else not data.flags.writeable)
+
+    def test_short_lists_stay_inline(self):
+        args = example(self.root, n=10)
+        args.to_file(self.root / 'args.json')
+        self.assertEqual(list(self.root.glob('*.npy')), [])
+        self.assertEqual(ExampleArgs.from_file(self.root / 'args.json').vocab_ids, args.vocab_ids)
+
+        with patch.object(ExampleArgs, 'SIDECAR_MIN_ITEMS', None):
+            example(self.root).to_file(self.root / 'args.json')
+        self.assertEqual(list(self.root.glob('*.npy')), [])
+
+    def test_lists_are_opt_in(self):
+        args = DefaultArgs(output_dir=str(self.root), values=list(range(2000)), opted_in=[1, 2, 3])
+        args.to_file(self.root / 'args.json')
+        self.assertEqual([p.name for p in self.root.glob('*.npy')], ['args.json.opted_in.npy'])
+
+        loaded = DefaultArgs.from_file(self.root / 'args.json')
+        self.assertEqual(loaded, args)
+        self.assertIsInstance(loaded.values, list)
+        self.assertIsInstance(loaded.opted_in, MappedArray)
+
+    def test_mixed_or_huge_ints_stay_inline(self):
+        args = ExampleArgs(output_dir=str(self.root), vocab_ids=[2**70] * 2000, class_weights=[1, 0.5] * 1000)
+        args.to_file(self.root / 'args.pkl')
+        self.assertEqual(list(self.root.glob('*.npy')), [])
+        self.assertEqual(ExampleArgs.from_file(self.root / 'args.pkl'), args)
+
+    def test_array_values(self):
+        args = ExampleArgs(output_dir=str(self.root), vocab_ids=array.array('i', [1, 2, 3]))
+        args.to_file(self.root / 'args.json')
+        loaded = ExampleArgs.from_file(self.root / 'args.json')
+        self.assertIsInstance(loaded.vocab_ids, MappedArray)
+        self.assertEqual(loaded.vocab_ids.tolist(), [1, 2, 3])
+        self.assertEqual(loaded.to_dict()['vocab_ids'], [1, 2, 3])
+
+    def test_rewrite_keeps_unchanged_sidecars(self):
+        example(self.root).to_file(self.root / 'args.json')
+        ino = os.stat(self.root / 'args.json.vocab_ids.npy').st_ino
+        loaded = ExampleArgs.from_file(self.root / 'args.json')
+
+        loaded.to_file(self.root / 'args.json')
+        self.assertEqual(os.stat(self.root / 'args.json.vocab_ids.npy').st_ino, ino)
+
+        other = self.root / 'other'
+        other.mkdir()
+        loaded.to_file(other / 'args.json')
+        copied = ExampleArgs.from_file(other / 'args.json')
+        self.assertEqual(copied, loaded)
+        self.assertEqual(copied.vocab_ids.path, other / 'args.json.vocab_ids.npy')
+
+    def test_formats_side_by_side(self):
+        ones = ExampleArgs(output_dir=str(self.root), vocab_ids=[1] * 2000)
+        twos = ExampleArgs(output_dir=str(self.root), vocab_ids=[2] * 2000)
+        ones.to_file(self.root / 'args.json')
+        twos.to_file(self.root / 'args.pkl')
+        self.assertEqual(ExampleArgs.from_file(self.root / 'args.json'), ones)
+        self.assertEqual(ExampleArgs.from_file(self.root / 'args.pkl'), twos)
+
+    def test_copy_and_pickle(self):
+        example(self.root).to_file(self.root / 'args.json')
+        loaded = ExampleArgs.from_file(self.root / 'args.json')
+        self.assertIs(copy.deepcopy(loaded.vocab_ids), loaded.vocab_ids)
+        self.assertEqual(pickle.loads(pickle.dumps(loaded)), loaded)
+        self.assertEqual(ExampleArgs.from_bytes(loaded.to_bytes(), JSON), loaded)
+
+    def test_without_numpy(self):
+        args = example(self.root)
+        with patch.object(sidecar, 'USE_NUMPY', False):
+            args.to_file(self.root / 'args.json')
+            loaded = ExampleArgs.from_file(self.root / 'args.json')
+            self.assertIsInstance(loaded.class_weights.data, memoryview)
+            self.assertEqual(loaded, args)
+            self.assertEqual(loaded.to_dict(), args.to_dict())
+            self.assertEqual(loaded.vocab_ids[:3], [-5, -4, -3])
+            self.assertEqual(loaded.feature_mask[1:4], [False, False, True])
+        if np is not None: self.assertEqual(ExampleArgs.from_file(self.root / 'args.json'), args)
+
+    def test_numpy_is_not_imported(self):
+        code = "import sys, multisource_args.sidecar; print('numpy' in sys.modules)"
+        out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+        self.assertEqual(out.stdout.strip(), 'False', out.stderr)
+
+@unittest.skipIf(np is None, "NumPy isn't installed")
+class TestSidecarNumpy(unittest.TestCase):
+    def setUp(self): self.root = Path(tempfile.mkdtemp())
+    def tearDown(self): shutil.rmtree(self.root)
+
+    def test_ndarrays(self):
+        weights = np.arange(12, dtype=np.float32).reshape(3, 4)
+        args = ExampleArgs(output_dir=str(self.root), class_weights=weights)
+        args.to_file(self.root / 'args.json')
+
+        loaded = ExampleArgs.from_file(self.root / 'args.json')
+        self.assertIsInstance(loaded.class_weights.data, np.memmap)
+        self.assertTrue(np.shares_memory(np.asarray(loaded.class_weights), loaded.class_weights.data))
+        self.assertEqual(loaded.class_weights.shape, (3, 4))
+        self.assertTrue(np.array_equal(np.asarray(loaded.class_weights), weights))
+        self.assertEqual(loaded.to_dict()['class_weights'], weights.tolist())
+
+        # Written by NumPy, mapped by hand.
+        with patch.object(sidecar, 'USE_NUMPY', False):
+            data = ExampleArgs.from_file(self.root / 'args.json').class_weights.data
+            self.assertEqual(data.tolist(), weights.tolist())
+
+if __name__ == '__main__': unittest.main()
@@ -0,0 +1,110 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json, shutil, tempfile, unittest
+from pathlib import Path
+from typing import List
+
+from multisource_args.args import *
+from multisource_args.sources import LayerCache
+
+@dataclass
+class ModelArgs(BaseArgs):
+    num_layers:    int = 2
+    lr:          float = 0.1
+    do_dropout:   bool = True
+
+@dataclass
+class ExampleArgs(BaseArgs):
+    output_dir:    str
+    int_arg:       int = 10
+    name:          str = 'example'
+    tags:    List[str] = dataclasses.field(default_factory=list)
+    model:   ModelArgs = dataclasses.field(default_factory=lambda: ModelArgs(num_layers=3))
+
+class TestSources(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        ExampleArgs.LAYER_CACHE = LayerCache()
+
+    def tearDown(self): shutil.rmtree(self.root)
+
+    def write(self, name, contents):
+        path = self.root / name
+        path.write_text(json.dumps(contents))
+        return path
+
+    def test_precedence_and_sources(self):
+        base = self.write('base.json', {'output_dir': '/base', 'int_arg': 1, 'model': {'lr': 0.5}})
+        exp = self.write('exp.json', {'int_arg': 2, 'tags': ['a']})
+        environ = {'EX_NAME': 'from_env', 'EX_MODEL__DO_DROPOUT': 'false', 'EX_INT_ARG': '3', 'OTHER': 'x'}
+
+        argv = ['--int_arg', '4', '--model.lr', '0.01']
+        args, sources = ExampleArgs.from_sources([base, exp], env_prefix='EX_', environ=environ, argv=argv)
+        self.assertEqual(args, ExampleArgs(
+            output_dir='/base', int_arg=4, name='from_env', tags=['a'],
+            model=ModelArgs(num_layers=3, lr=0.01, do_dropout=False),
+        ))
+        self.assertEqual(sources, {
+            'output_dir': f"file:{base}", 'int_arg': 'cli', 'name': 'env:EX_NAME', 'tags': f"file:{exp}",
+            'model.num_layers': 'default', 'model.lr': 'cli', 'model.do_dropout': 'env:EX_MODEL__DO_DROPOUT',
+        })
+
+    def test_missing_required(self):
+        with self.assertRaises(AssertionError): ExampleArgs.from_sources()
+        args, sources = ExampleArgs.from_sources(argv=['--output_dir', '/cli'])
+        self.assertEqual(args, ExampleArgs(output_dir='/cli'))
+        self.assertEqual(sources['output_dir'], 'cli')
+        self.assertEqual(sources['int_arg'], 'default')
+
+    def test_unknown_file_field(self):
+        path = self.write('bad.json', {'output_dir': '/x', 'not_a_field': 1})
+        with self.assertRaises(AssertionError): ExampleArgs.from_sources(files=[path])
+
+    def test_env_parsing(self):
+        environ = {'EX_OUTPUT_DIR': '/env', 'EX_TAGS': '["x", "y"]', 'EX_MODEL__LR': '1e-3'}
+        args, _ = ExampleArgs.from_sources(env_prefix='EX_', environ=environ)
+        self.assertEqual(args.tags, ['x', 'y'])
+        self.assertEqual(args.model.lr, 1e-3)
+        with self.assertRaises(AssertionError):
+            ExampleArgs.from_sources(env_prefix='EX_', environ={**environ, 'EX_MODEL__DO_DROPOUT': 'maybe'})
+
+    def test_full_args_files(self):
+        ExampleArgs(output_dir='/full', model=ModelArgs(num_layers=7)).to_file(self.root / 'args.yaml')
+        args, sources = ExampleArgs.from_sources(files=[self.root / 'args.yaml'], argv=['--name', 'x'])
+        self.assertEqual(args, ExampleArgs(output_dir='/full', name='x', model=ModelArgs(num_layers=7)))
+        self.assertEqual(sources['model.num_layers'], f"file:{self.root / 'args.yaml'}")
+
+    def test_layer_caching(self):
+        cache = ExampleArgs.LAYER_CACHE
+        base = self.write('base.json', {'output_dir': '/base', 'tags': ['a']})
+        environ = {'EX_INT_ARG': '3'}
+
+        first, _ = ExampleArgs.from_sources(files=[base], env_prefix='EX_', environ=environ)
+        self.assertEqual(cache.parses, 2)
+        second, _ = ExampleArgs.from_sources(files=[base], env_prefix='EX_', environ=environ)
+        self.assertEqual(cache.parses, 2)
+        self.assertEqual(first, second)
+
+        # Cached values are never shared with resolved args.
+        second.tags.append('b')
+        self.assertEqual(ExampleArgs.from_sources(files=[base]).args.tags, ['a'])
+
+        # Only changed layers are re-parsed.
+        self.write('base.json', {'output_dir': '/changed'})
+        args, _ = ExampleArgs.from_sources(files=[base], env_prefix='EX_', environ=environ)
+        self.assertEqual((args.output_dir, args.int_arg, cache.parses), ('/changed', 3, 3))
+        args, _ = ExampleArgs.from_sources(files=[base], env_prefix='EX_', environ={'EX_INT_ARG': '5'})
+        self.assertEqual((args.output_dir, args.int_arg, cache.parses), ('/changed', 5, 4))
+
+    def test_section_file_changes_invalidate(self):
+        self.write('model.json', {'num_layers': 5})
+        main = self.write('main.json', {'output_dir': '/x', 'model': {'__file__': 'model.json'}})
+        self.assertEqual(ExampleArgs.from_sources(files=[main]).args.model.num_layers, 5)
+
+        self.write('model.json', {'num_layers': 6})
+        args, sources = ExampleArgs.from_sources(files=[main])
+        self.assertEqual(args.model.num_layers, 6)
+        self.assertEqual(sources['model.num_layers'], f"file:{main}")
+
+if __name__ == '__main__': unittest.main()
@@ -0,0 +1,95 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import itertools, shutil, tempfile, unittest
+from pathlib import Path
+
+from multisource_args.args import *
+from multisource_args.sweep import Grid, Random, Sweep, Zipped
+
+@dataclass
+class ExampleArgs(BaseArgs):
+    output_dir:    str
+    do_bool_arg:  bool = True
+    int_arg:       int = 60000
+    float_arg:   float = 1.0
+    num_layers:    int = 2
+
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_grid_and_zipped(self):
+        sweep = Sweep(
+            ExampleArgs, self.root, base={'do_bool_arg': False},
+            axes=[Grid(num_layers=[1, 2, 3], int_arg=[10, 20]), Zipped(float_arg=[0.1, 0.2])]
+        )
+        self.assertEqual(len(sweep), 12)
+
+        got = [(a.num_layers, a.int_arg, a.float_arg) for a in sweep]
+        self.assertEqual(got, list(itertools.product([1, 2, 3], [10, 20], [0.1, 0.2])))
+        self.assertTrue(all(a.do_bool_arg is False for a in sweep))
+
+        self.assertEqual(sweep[-1], sweep[11])
+        self.assertEqual(sweep.run_dir(3), self.root / "03")
+        with self.assertRaises(IndexError): sweep.point(12)
+
+    def test_random_is_deterministic(self):
+        axes = [Random(50, seed=3, float_arg=lambda rng: rng.uniform(0, 1), num_layers=[1, 2, 3])]
+        sweep = Sweep(ExampleArgs, self.root, axes=axes)
+
+        first = [(a.float_arg, a.num_layers) for a in sweep]
+        self.assertEqual(first, [(a.float_arg, a.num_layers) for a in sweep])
+        self.assertEqual(len(set(first)), 50)
+        self.assertTrue(all(0 <= f < 1 and n in (1, 2, 3) for f, n in first))
+
+        other_seed = Sweep(ExampleArgs, self.root, axes=[Random(50, seed=4, float_arg=lambda r: r.random())])
+        self.assertNotEqual([a.float_arg for a in sweep], [a.float_arg for a in other_seed])
+
+    def test_sharding_partitions_points(self):
+        sweep = Sweep(ExampleArgs, self.root, axes=[Grid(num_layers=range(7), int_arg=range(5))])
+        shards = [list(sweep.iter_args(shard, 3)) for shard in range(3)]
+        self.assertEqual(sorted(len(s) for s in shards), [11, 12, 12])
+
+        dirs = [a.output_dir for s in shards for a in s]
+        self.assertEqual(sorted(dirs), [a.output_dir for a in sweep])
+
+        with self.assertRaises(AssertionError): list(sweep.iter_args(3, 3))
+
+    def test_huge_sweeps_are_lazy(self):
+        sweep = Sweep(ExampleArgs, self.root, axes=[Grid(int_arg=range(1000), num_layers=range(1000))])
+        self.assertEqual(len(sweep), 10**6)
+        self.assertEqual(sweep[999_999].int_arg, 999)
+        self.assertEqual(next(sweep.iter_args(5, 1000)).num_layers, 5)
+
+    def test_validation(self):
+        with self.assertRaises(AssertionError): Sweep(ExampleArgs, self.root, axes=[Grid(not_a_field=[1])])
+        with self.assertRaises(AssertionError):
+            Sweep(ExampleArgs, self.root, axes=[Grid(int_arg=[1]), Zipped(int_arg=[2])])
+        with self.assertRaises(AssertionError): Zipped(int_arg=[1, 2], float_arg=[0.5])
+        with self.assertRaises(AssertionError): Sweep(ExampleArgs, self.root, axes=[Grid(output_dir=['a'])])
+
+        sweep = Sweep(ExampleArgs, self.root, axes=[Grid(int_arg=[1, 'two', True])])
+        sweep[0]
+        for i in (1, 2):
+            with self.assertRaises(AssertionError): sweep[i]
+
+        # Ints are valid floats.
+        self.assertEqual(Sweep(ExampleArgs, self.root, axes=[Grid(float_arg=[1])])[0].float_arg, 1)
+
+    def test_write(self):
+        sweep = Sweep(
+            ExampleArgs, self.root, axes=[Grid(num_layers=[1, 2]), Zipped(int_arg=[1, 2, 3])],
+            run_name=lambda i, point: f"layers_{point['num_layers']}_int_{point['int_arg']}"
+        )
+        for shard in range(2): sweep.write(shard, 2)
+
+        loaded = {r.args.output_dir: r.args for r in ExampleArgs.load_many(self.root)}
+        self.assertEqual(loaded, {a.output_dir: a for a in sweep})
+        self.assertTrue((self.root / "layers_2_int_3" / f"{ARGS}.{JSON}").is_file())
+
+if __name__ == '__main__':
+    unittest.main(verbosity=0)
@@ -0,0 +1,130 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import csv, shutil, tempfile, unittest
+from pathlib import Path
+from typing import List
+
+from multisource_args.args import *
+from multisource_args.table import ArgsTable, np
+
+@dataclass
+class ExampleArgs(BaseArgs):
+    output_dir:         str
+    do_bool_arg:       bool = True
+    num_layers:         int = 2
+    float_arg:        float = 1.0
+    optimizer:          str = 'adam'
+    list_arg:     List[int] = None
+
+def as_list(values): return values.tolist() if np is not None else list(values)
+
+class TestArgsTable(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.args = [
+            ExampleArgs(
+                output_dir=f"run_{i}", do_bool_arg=(i % 2 == 0), num_layers=i % 4, float_arg=i / 10,
+                optimizer=['adam', 'sgd', 'adamw'][i % 3], list_arg=[i]
+            ) for i in range(24)
+        ]
+        self.table = ArgsTable.from_args(ExampleArgs, self.args)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_round_trip(self):
+        self.assertEqual(len(self.table), 24)
+        self.assertEqual(list(self.table.iter_args()), self.args)
+        self.assertEqual(self.table.args(5), self.args[5])
+        self.assertEqual(self.table.row(5), self.args[5].to_dict())
+
+    def test_columns_are_typed(self):
+        kinds = {name: type(column).__name__ for name, column in self.table._columns.items()}
+        self.assertEqual(kinds, {
+            'output_dir': '_CategoryColumn', 'do_bool_arg': '_ArrayColumn', 'num_layers': '_ArrayColumn',
+            'float_arg': '_ArrayColumn', 'optimizer': '_CategoryColumn', 'list_arg': '_ObjectColumn',
+        })
+        self.assertEqual(self.table._columns['optimizer'].categories, ['adam', 'sgd', 'adamw'])
+        self.assertEqual(as_list(self.table.column('num_layers')), [i % 4 for i in range(24)])
+        self.assertEqual(as_list(self.table.column('optimizer'))[:4], ['adam', 'sgd', 'adamw', 'adam'])
+
+        if np is not None:
+            self.assertEqual(self.table.column('float_arg').dtype, np.float64)
+            self.assertEqual(self.table.column('do_bool_arg').dtype, np.bool_)
+
+    def test_falls_back_to_object_column(self):
+        table = ArgsTable.from_args(ExampleArgs, self.args[:3])
+        odd = ExampleArgs(output_dir=None, num_layers='many', float_arg=0.5)
+        table.append(odd)
+        table.append(self.args[3])
+
+        self.assertEqual(type(table._columns['num_layers']).__name__, '_ObjectColumn')
+        self.assertEqual(list(table.iter_args()), [*self.args[:3], odd, self.args[3]])
+        self.assertEqual(len(table.where(num_layers='many')), 1)
+        self.assertEqual(list(table.group_by('num_layers')), [(0,), (1,), (2,), ('many',), (3,)])
+
+    def test_where(self):
+        want = [a for a in self.args if a.num_layers == 2 and a.float_arg < 1.5]
+        self.assertEqual(list(self.table.where(num_layers=2, float_arg__lt=1.5).iter_args()), want)
+
+        want = [a for a in self.args if a.optimizer in ('sgd', 'adamw') and a.do_bool_arg]
+        got = self.table.where(('optimizer', 'in', ['sgd', 'adamw', 'rmsprop']), do_bool_arg=True)
+        self.assertEqual(list(got.iter_args()), want)
+
+        self.assertEqual(len(self.table.where(optimizer='rmsprop')), 0)
+        self.assertEqual(len(self.table.where(optimizer__ne='adam')), 16)
+        self.assertEqual(len(self.table.where(optimizer__gt='adam')), 16)
+        self.assertEqual(len(self.table.where()), 24)
+
+        with self.assertRaises(AssertionError): self.table.where(not_a_field=3)
+        with self.assertRaises(AssertionError): self.table.where(num_layers__approx=3)
+
+    def test_sub_tables_stay_appendable(self):
+        sub = self.table.where(optimizer='sgd')
+        sub.append(ExampleArgs(output_dir='new', optimizer='lamb'))
+        self.assertEqual(sub.args(len(sub) - 1).optimizer, 'lamb')
+        self.assertEqual(len(self.table.where(optimizer='lamb')), 0)
+
+    def test_group_by(self):
+        groups = self.table.group_by('optimizer', 'do_bool_arg')
+        self.assertEqual(len(groups), 6)
+        for (optimizer, do_bool_arg), group in groups.items():
+            want = [a for a in self.args if a.optimizer == optimizer and a.do_bool_arg == do_bool_arg]
+            self.assertEqual(list(group.iter_args()), want)
+        self.assertEqual(list(groups)[:3], [('adam', True), ('sgd', False), ('adamw', True)])
+
+        with self.assertRaises(TypeError): self.table.group_by('list_arg') # Unhashable values.
+        self.assertEqual(len(self.table.group_by('float_arg', 'num_layers')), 24)
+        self.assertEqual(list(self.table.group_by('num_layers')), [(0,), (1,), (2,), (3,)])
+        self.assertEqual(self.table.take([]).group_by('num_layers'), {})
+
+    def test_ints_in_float_columns(self):
+        table = ArgsTable.from_args(ExampleArgs, [self.args[0], ExampleArgs(output_dir='x', float_arg=2)])
+        self.assertEqual(type(table._columns['float_arg']).__name__, '_ArrayColumn')
+        self.assertIs(type(table.row(1)['float_arg']), int)
+        self.assertIs(type(table.where(float_arg__gt=1).row(0)['float_arg']), int)
+        self.assertEqual([type(k[0]) for k in table.group_by('float_arg')], [float, int])
+
+        table.append(ExampleArgs(output_dir='y', float_arg=2**60 + 1)) # Not exactly representable.
+        self.assertEqual(table.row(2)['float_arg'], 2**60 + 1)
+
+    def test_export_and_load(self):
+        self.assertEqual(self.table.to_records(), [a.to_dict() for a in self.args])
+        self.assertEqual(self.table.to_columns()['num_layers'], [a.num_layers for a in self.args])
+
+        self.table.to_csv(self.root / "table.csv")
+        with open(self.root / "table.csv", newline='') as f: rows = list(csv.DictReader(f))
+        self.assertEqual([r['optimizer'] for r in rows], [a.optimizer for a in self.args])
+
+        for args in self.args[:6]:
+            run_dir = self.root / args.output_dir
+            run_dir.mkdir()
+            args.to_file(run_dir / f"{ARGS}.{JSON}")
+
+        loaded = ArgsTable.load(ExampleArgs, self.root)
+        by_dir = lambda a: a.output_dir
+        self.assertEqual(sorted(loaded.iter_args(), key=by_dir), sorted(self.args[:6], key=by_dir))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=0)
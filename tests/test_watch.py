@@ -0,0 +1,88 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import shutil, tempfile, threading, unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from multisource_args.args import *
+from multisource_args import watch
+from multisource_args.watch import ArgsWatcher, Change
+
+@dataclass
+class ModelArgs(BaseArgs):
+    num_layers:    int = 2
+    width:         int = 64
+
+@dataclass
+class ExampleArgs(BaseArgs):
+    output_dir:    str = dataclasses.field(metadata={'immutable': True})
+    lr:          float = 0.1
+    name:          str = 'example'
+    model:   ModelArgs = dataclasses.field(default_factory=ModelArgs)
+    frozen:  ModelArgs = dataclasses.field(default_factory=ModelArgs, metadata={'immutable': True})
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.path = self.root / 'args.json'
+        self.args = ExampleArgs(output_dir=str(self.root))
+        self.args.to_file(self.path)
+
+    def tearDown(self): shutil.rmtree(self.root)
+
+    def edit(self, **changes):
+        dataclasses.replace(self.args, **changes).to_file(self.path)
+
+    def test_check_applies_diff(self):
+        seen = []
+        watcher = ArgsWatcher(self.args, self.path, callback=seen.append)
+        self.assertIsNone(watcher.check())
+
+        self.edit(lr=0.01, model=ModelArgs(num_layers=4))
+        expected = {'lr': Change(0.1, 0.01), 'model.num_layers': Change(2, 4)}
+        self.assertEqual(watcher.check(), expected)
+        self.assertEqual(seen, [expected])
+        self.assertEqual((self.args.lr, self.args.model.num_layers), (0.01, 4))
+        self.assertIsNone(watcher.check())
+
+    def test_unchanged_content_is_not_reparsed(self):
+        watcher = ArgsWatcher(self.args, self.path)
+        self.args.to_file(self.path) # New inode and mtime, same bytes.
+        with patch.object(ExampleArgs, 'from_bytes') as from_bytes:
+            self.assertIsNone(watcher.check())
+            self.assertIsNone(watcher.check(force=True))
+        from_bytes.assert_not_called()
+
+    def test_immutable_fields_reject_edit(self):
+        watcher = ArgsWatcher(self.args, self.path)
+        for changes in ({'output_dir': '/elsewhere'}, {'frozen': ModelArgs(width=8)}):
+            self.edit(lr=0.5, **changes)
+            with self.assertLogs(watch.logger, 'WARNING'): self.assertIsNone(watcher.check())
+            self.assertEqual(self.args, ExampleArgs(output_dir=str(self.root)))
+
+        self.edit(lr=0.5)
+        self.assertEqual(watcher.check(), {'lr': Change(0.1, 0.5)})
+
+    def test_unparsable_edit_is_skipped(self):
+        watcher = ArgsWatcher(self.args, self.path)
+        self.path.write_text('{"output_dir": ')
+        with self.assertLogs(watch.logger, 'WARNING'): self.assertIsNone(watcher.check())
+        self.edit(name='fixed')
+        self.assertEqual(watcher.check(), {'name': Change('example', 'fixed')})
+
+    def _check_background(self, backend):
+        changed = threading.Event()
+        with self.args.watch(lambda diff: changed.set(), interval=0.01, backend=backend) as watcher:
+            self.assertEqual(watcher.filepath, self.path)
+            self.edit(lr=0.25)
+            self.assertTrue(changed.wait(5))
+        self.assertEqual(self.args.lr, 0.25)
+        self.assertIsNone(watcher._thread)
+
+    def test_poll(self): self._check_background(watch.POLL)
+
+    @unittest.skipIf(watch._inotify() is None, "inotify isn't available")
+    def test_inotify(self): self._check_background(watch.INOTIFY)
+
+if __name__ == '__main__': unittest.main()